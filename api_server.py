@@ -7,16 +7,25 @@ import os
 import sys
 import json
 import yaml
+import time
 import logging
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
 from zendesk_client import ZendeskClient
-from translation_service import TranslationService
+from translation_service import TranslationService, translate_articles_multilang
+from translation_cache import TranslationCache
+from glossary import GlossaryStore, CompiledGlossary
+from rate_limiter import RateLimitScheduler, scheduler_from_config
+from http_session import session_from_config
+from http_cache import HttpCache
+from sync_cursor import SyncCursorStore
+from run_journal import RunJournal
 
 # Load environment variables
 load_dotenv()
@@ -34,6 +43,16 @@ CORS(app)
 # Global state for batches
 batches = []
 batch_counter = 0
+translation_cache = None
+glossary_stores = {}
+translation_services = {}
+translation_services_lock = threading.Lock()
+scheduler = None
+http_session = None
+sync_cursors = None
+http_cache = None
+batch_journal_dir = None
+app_config = None
 
 
 def load_config(config_file: str = "config.yaml") -> Dict:
@@ -47,35 +66,241 @@ def load_config(config_file: str = "config.yaml") -> Dict:
         return {}
 
 
-def load_glossary(glossary_file: str) -> List[Dict[str, str]]:
-    """Load glossary/translation memory from YAML file"""
-    try:
-        with open(glossary_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-        terms = data.get("terms", [])
-        return terms
-    except Exception as e:
-        logger.warning(f"Error loading glossary: {e}")
-        return []
+def get_app_config() -> Dict:
+    """Return the server configuration, loaded from config.yaml once per process"""
+    global app_config
+    if app_config is None:
+        app_config = load_config()
+    return app_config
 
 
-def get_translation_service():
-    """Initialize and return translation service"""
-    config = load_config()
-    glossary_file = config.get("glossary_file", "glossary.yaml")
-    glossary = load_glossary(glossary_file)
+def get_scheduler(config: Dict) -> RateLimitScheduler:
+    """Return the rate-limit scheduler shared by all requests, creating it on first use"""
+    global scheduler
+    if scheduler is None:
+        scheduler = scheduler_from_config(config)
+    return scheduler
+
+
+def get_http_session(config: Dict):
+    """Return the pooled HTTP session and timeouts shared by all requests, creating them on first use"""
+    global http_session
+    if http_session is None:
+        http_session = session_from_config(config)
+    return http_session
+
+
+def get_glossary_store(config: Dict, glossary_file: Optional[str] = None) -> GlossaryStore:
+    """Return the shared store for a glossary file (default: the configured glossary)"""
+    glossary_file = glossary_file or config.get("glossary_file", "glossary.yaml")
+    if glossary_file not in glossary_stores:
+        glossary_stores[glossary_file] = GlossaryStore(glossary_file)
+    return glossary_stores[glossary_file]
+
+
+def get_language_glossary(config: Dict, target_language: str):
+    """
+    Return the compiled glossary for a target language
     
-    target_language = os.getenv("TARGET_LANGUAGE", 
-                                config.get("translation", {}).get("target_language", "Japanese"))
+    The configured glossary applies to the default target language. Other
+    languages use the glossary_file of their entry under translation.targets,
+    or no glossary.
+    """
+    translation_config = config.get("translation", {})
+    default_language = os.getenv("TARGET_LANGUAGE", translation_config.get("target_language", "Japanese"))
+    if target_language == default_language:
+        return get_glossary_store(config).get()
+    for target in translation_config.get("targets") or []:
+        if target.get("language") == target_language and target.get("glossary_file"):
+            return get_glossary_store(config, target["glossary_file"]).get()
+    return CompiledGlossary()
+
+
+def get_target_locale(config: Dict, target_language: str) -> Optional[str]:
+    """
+    Return the Zendesk locale translations into a language are published to
+    
+    The locale of the language's entry under translation.targets, the
+    publish locale for the default target language, or None if unknown.
+    """
+    translation_config = config.get("translation", {})
+    for target in translation_config.get("targets") or []:
+        if target.get("language") == target_language and target.get("locale"):
+            return target["locale"]
+    default_language = os.getenv("TARGET_LANGUAGE", translation_config.get("target_language", "Japanese"))
+    if target_language == default_language:
+        return config.get("publish", {}).get("locale", "ja")
+    return None
+
+
+def get_translation_cache(config: Dict) -> Optional[TranslationCache]:
+    """Return the shared translation cache, opening it on first use"""
+    global translation_cache
+    cache_config = config.get("cache", {})
+    if not cache_config.get("enabled", True):
+        return None
+    if translation_cache is None:
+        try:
+            translation_cache = TranslationCache(
+                db_path=cache_config.get("path", ".cache/translations.db"),
+                max_size_mb=cache_config.get("max_size_mb", 256)
+            )
+        except Exception as e:
+            logger.warning(f"Error opening translation cache: {e}")
+            return None
+    return translation_cache
+
+
+def get_translation_service(target_language: Optional[str] = None):
+    """
+    Return a translation service for the current settings
+    
+    Services are reused across requests and rebuilt only when the glossary
+    version or translation settings change.
+    
+    Args:
+        target_language: Target language (default: the configured one)
+    """
+    config = get_app_config()
+    
+    target_language = target_language or os.getenv(
+        "TARGET_LANGUAGE", config.get("translation", {}).get("target_language", "Japanese"))
     use_azure = os.getenv("USE_AZURE", "false").lower() == "true"
     model = os.getenv("OPENAI_MODEL", "gpt-4")
+    glossary = get_language_glossary(config, target_language)
     
-    return TranslationService(
-        target_language=target_language,
-        glossary=glossary,
-        use_azure=use_azure,
-        model=model
-    )
+    key = (target_language, use_azure, model)
+    # Flask serves requests from several threads
+    with translation_services_lock:
+        service = translation_services.get(key)
+        if service is None or service.glossary_version != glossary.version:
+            service = TranslationService(
+                target_language=target_language,
+                glossary=glossary,
+                use_azure=use_azure,
+                model=model,
+                cache=get_translation_cache(config),
+                max_concurrency=config.get("translation", {}).get("max_concurrency", 8),
+                max_chunk_tokens=config.get("translation", {}).get("max_chunk_tokens", 2000),
+                max_batch_items=config.get("translation", {}).get("max_batch_items", 40),
+                scheduler=get_scheduler(config)
+            )
+            translation_services[key] = service
+    return service
+
+
+def get_http_cache(config: Dict) -> Optional[HttpCache]:
+    """Return the shared conditional-GET cache, or None if disabled"""
+    global http_cache
+    http_config = config.get("http", {})
+    if http_cache is None and http_config.get("cache_enabled", True):
+        try:
+            http_cache = HttpCache(http_config.get("cache_path", ".cache/http_cache.db"))
+        except Exception as e:
+            logger.warning(f"Error opening HTTP cache: {e}. Continuing without it.")
+    return http_cache
+
+
+def get_sync_cursors(config: Dict) -> SyncCursorStore:
+    """Return the incremental-sync cursor store, opening it on first use"""
+    global sync_cursors
+    if sync_cursors is None:
+        sync_cursors = SyncCursorStore(config.get("sync", {}).get("cursor_file", ".cache/sync_cursors.json"))
+    return sync_cursors
+
+
+def get_batch_journal_dir() -> Path:
+    """Return the directory batches are checkpointed to"""
+    global batch_journal_dir
+    if batch_journal_dir is None:
+        batch_journal_dir = get_app_config().get("batches", {}).get("journal_dir", ".cache/batches")
+    return Path(batch_journal_dir)
+
+
+def get_batch_journal(batch_id: int) -> RunJournal:
+    """Return the journal a batch is checkpointed to"""
+    return RunJournal(str(get_batch_journal_dir() / f"batch_{batch_id}.jsonl"))
+
+
+def save_batch(batch: Dict):
+    """Checkpoint a whole batch, compacting its journal into one snapshot record"""
+    try:
+        get_batch_journal(batch["id"]).replace([{"type": "batch", "batch": batch}])
+    except Exception as e:
+        logger.warning(f"Error saving batch {batch['id']}: {e}")
+
+
+def restore_batches():
+    """
+    Load the batches checkpointed before a restart
+    
+    Each journal's last snapshot is replayed together with the articles
+    translated after it. Batches that were being translated go back to
+    pending, so starting them again only translates the remaining articles.
+    """
+    global batch_counter
+    for path in sorted(get_batch_journal_dir().glob("batch_*.jsonl"), key=lambda p: int(p.stem.split("_")[1])):
+        batch = None
+        for record in RunJournal(str(path)).records():
+            if record.get("type") == "batch":
+                batch = record["batch"]
+                continue
+            if batch is None:
+                continue
+            for index, article in enumerate(batch["articles"]):
+                if article.get("id") != record.get("id"):
+                    continue
+                if record.get("type") == "article":
+                    batch["articles"][index] = record["article"]
+                elif record.get("type") == "translation":
+                    article.setdefault("translations", {})[record["language"]] = record["translation"]
+                    if all(article["translations"].get(language, {}).get("translation_status") == "completed"
+                           for language in batch.get("target_languages", [])):
+                        article["translation_status"] = "completed"
+        if batch is None:
+            continue
+        if batch["status"] == "processing":
+            batch["status"] = "pending"
+        batch["translated_articles"] = sum(
+            1 for a in batch["articles"] if a.get("translation_status") == "completed"
+        )
+        batches.append(batch)
+        batch_counter = max(batch_counter, batch["id"])
+        logger.info(f"Restored batch {batch['id']} ({batch['translated_articles']}/"
+                    f"{len(batch['articles'])} articles translated)")
+
+
+def merge_articles(batch: Dict, updated: List[Dict]) -> int:
+    """
+    Merge updated articles into a batch
+    
+    Changed articles replace their previous version (dropping any stale
+    translation), new articles are appended, and the batch goes back to
+    pending so the changes get translated.
+    
+    Returns:
+        Number of articles added or changed
+    """
+    positions = {article.get("id"): index for index, article in enumerate(batch["articles"])}
+    changed = 0
+    for article in updated:
+        index = positions.get(article.get("id"))
+        if index is None:
+            positions[article.get("id")] = len(batch["articles"])
+            batch["articles"].append(article)
+        elif batch["articles"][index].get("updated_at") != article.get("updated_at"):
+            batch["articles"][index] = article
+        else:
+            continue
+        changed += 1
+    
+    if changed:
+        batch["status"] = "pending"
+        batch["total_articles"] = len(batch["articles"])
+        batch["translated_articles"] = sum(
+            1 for a in batch["articles"] if a.get("translation_status") == "completed"
+        )
+    return changed
 
 
 def get_zendesk_client():
@@ -87,7 +312,12 @@ def get_zendesk_client():
     if not all([subdomain, email, token]):
         raise ValueError("Missing Zendesk credentials")
     
-    return ZendeskClient(subdomain, email, token)
+    config = get_app_config()
+    session, timeout = get_http_session(config)
+    return ZendeskClient(subdomain, email, token, scheduler=get_scheduler(config),
+                         session=session, timeout=timeout,
+                         max_workers=config.get("zendesk", {}).get("list_workers", 4),
+                         http_cache=get_http_cache(config))
 
 
 @app.route('/')
@@ -105,7 +335,7 @@ def health_check():
 @app.route('/api/config')
 def get_config():
     """Get current configuration"""
-    config = load_config()
+    config = get_app_config()
     return jsonify({
         "target_language": os.getenv("TARGET_LANGUAGE", config.get("translation", {}).get("target_language")),
         "use_azure": os.getenv("USE_AZURE", "false").lower() == "true",
@@ -113,13 +343,18 @@ def get_config():
     })
 
 
+@app.route('/api/rate-limits')
+def get_rate_limits():
+    """Get rate-limit queue-wait and retry statistics"""
+    return jsonify({"rate_limits": get_scheduler(get_app_config()).stats()})
+
+
 @app.route('/api/glossary')
 def get_glossary():
     """Get glossary terms"""
-    config = load_config()
-    glossary_file = config.get("glossary_file", "glossary.yaml")
-    glossary = load_glossary(glossary_file)
-    return jsonify({"terms": glossary})
+    config = get_app_config()
+    glossary = get_glossary_store(config).get()
+    return jsonify({"terms": glossary.terms})
 
 
 @app.route('/api/glossary', methods=['POST'])
@@ -132,7 +367,7 @@ def add_glossary_term():
     if not source or not target:
         return jsonify({"error": "Both source and target are required"}), 400
     
-    config = load_config()
+    config = get_app_config()
     glossary_file = config.get("glossary_file", "glossary.yaml")
     
     try:
@@ -147,6 +382,7 @@ def add_glossary_term():
         # Save updated glossary
         with open(glossary_file, 'w', encoding='utf-8') as f:
             yaml.dump(data, f, allow_unicode=True)
+        get_glossary_store(config).invalidate()
         
         return jsonify({"success": True, "term": {"source": source, "target": target}})
     except Exception as e:
@@ -167,26 +403,55 @@ def create_batch():
     
     data = request.json
     locale = data.get('locale', 'en-us')
+    incremental = data.get('incremental', False)
     
     try:
         zendesk = get_zendesk_client()
-        articles = zendesk.get_articles(locale=locale)
+        cursors = get_sync_cursors(get_app_config())
+        cursor_key = f"{zendesk.subdomain}/{locale}"
+        last_sync = cursors.get(cursor_key)
+        incremental = bool(incremental and last_sync is not None)
         
         batch_counter += 1
         batch = {
             "id": batch_counter,
             "locale": locale,
             "created_at": datetime.now().isoformat(),
-            "status": "pending",
-            "total_articles": len(articles),
+            "status": "listing",
+            "total_articles": 0,
             "translated_articles": 0,
-            "articles": articles
+            "incremental": incremental,
+            "articles": []
         }
+        # The batch is visible (GET /api/batches/<id>) while its pages are still arriving
         batches.append(batch)
+    except Exception as e:
+        logger.error(f"Error creating batch: {e}")
+        return jsonify({"error": "Failed to create batch"}), 500
+    
+    try:
+        if incremental:
+            # Only the articles changed since the last sync
+            articles, sync_time = zendesk.get_updated_articles(last_sync, locale=locale)
+            pages = [articles]
+        else:
+            sync_time = int(time.time())
+            pages = zendesk.iter_article_pages(locale=locale)
         
-        logger.info(f"Created batch {batch_counter} with {len(articles)} articles")
+        for page in pages:
+            batch["articles"].extend(page)
+            batch["total_articles"] = len(batch["articles"])
+        # Each batch syncs from its own cursor; the shared store only seeds
+        # the next incremental batch
+        batch["sync_cursor"] = sync_time
+        cursors.set(cursor_key, sync_time)
+        batch["status"] = "pending"
+        save_batch(batch)
+        
+        logger.info(f"Created batch {batch['id']} with {batch['total_articles']} articles")
         return jsonify({"success": True, "batch": batch})
     except Exception as e:
+        batches.remove(batch)
         logger.error(f"Error creating batch: {e}")
         return jsonify({"error": "Failed to create batch"}), 500
 
@@ -200,6 +465,36 @@ def get_batch(batch_id):
     return jsonify({"batch": batch})
 
 
+@app.route('/api/batches/<int:batch_id>/sync', methods=['POST'])
+def sync_batch(batch_id):
+    """Merge the articles updated since the last sync into a batch"""
+    batch = next((b for b in batches if b["id"] == batch_id), None)
+    if not batch:
+        return jsonify({"error": "Batch not found"}), 404
+    
+    if batch["status"] == "processing":
+        return jsonify({"error": "Batch is being processed"}), 400
+    
+    try:
+        zendesk = get_zendesk_client()
+        last_sync = batch.get("sync_cursor")
+        if last_sync is None:
+            # Never synced: fall back to the batch's creation time
+            last_sync = int(datetime.fromisoformat(batch["created_at"]).timestamp())
+        
+        updated, sync_time = zendesk.get_updated_articles(last_sync, locale=batch["locale"])
+        changed = merge_articles(batch, updated)
+        batch["sync_cursor"] = sync_time
+        batch["synced_at"] = datetime.now().isoformat()
+        save_batch(batch)
+        
+        logger.info(f"Synced batch {batch_id}: {changed} article(s) added or changed")
+        return jsonify({"success": True, "changed_articles": changed, "batch": batch})
+    except Exception as e:
+        logger.error(f"Error syncing batch {batch_id}: {e}")
+        return jsonify({"error": "Failed to sync batch"}), 500
+
+
 @app.route('/api/batches/<int:batch_id>/start', methods=['POST'])
 def start_batch(batch_id):
     """Start translating a batch"""
@@ -210,27 +505,96 @@ def start_batch(batch_id):
     if batch["status"] != "pending":
         return jsonify({"error": "Batch already started or completed"}), 400
     
+    data = request.get_json(silent=True) or {}
+    target_languages = data.get('target_languages')
+    journal = get_batch_journal(batch_id)
+    
     try:
-        translator = get_translation_service()
         batch["status"] = "processing"
         batch["started_at"] = datetime.now().isoformat()
+        if target_languages:
+            batch["target_languages"] = target_languages
+        # Articles are journaled as they complete, so a restart resumes from here
+        save_batch(batch)
+        
+        if target_languages:
+            # Fan out: every article was fetched once and is translated into all languages
+            translators = {language: get_translation_service(language) for language in target_languages}
+            pending = [a for a in batch["articles"] if a.get("translation_status") != "completed"]
+            # Languages finished per pending article; an article counts once all are done
+            finished_languages = {}
+            progress_lock = threading.Lock()
+            
+            def checkpoint_translation(language, index, translated):
+                if not isinstance(translated, Exception):
+                    journal.append({"type": "translation", "id": pending[index].get("id"), "language": language,
+                                    "translation": {"title": translated.get("title"),
+                                                    "body": translated.get("body"),
+                                                    "translation_status": "completed"}})
+                    with progress_lock:
+                        finished_languages[index] = finished_languages.get(index, 0) + 1
+                        if finished_languages[index] == len(target_languages):
+                            batch["translated_articles"] += 1
+            
+            results = translate_articles_multilang(translators, pending, on_result=checkpoint_translation)
+            for index, article in enumerate(pending):
+                translations = article.setdefault("translations", {})
+                for language, language_results in results.items():
+                    translated = language_results[index]
+                    if isinstance(translated, Exception):
+                        logger.error(f"Error translating article {article.get('id')} "
+                                     f"into {language}: {translated}")
+                        translations[language] = {"translation_status": "failed", "error": str(translated)}
+                    else:
+                        translations[language] = {
+                            "title": translated.get("title"),
+                            "body": translated.get("body"),
+                            "translation_status": "completed"
+                        }
+                failed = any(t["translation_status"] == "failed" for t in translations.values())
+                article["translation_status"] = "failed" if failed else "completed"
+            batch["translated_articles"] = sum(
+                1 for a in batch["articles"] if a["translation_status"] == "completed"
+            )
+            batch["status"] = "completed"
+            batch["completed_at"] = datetime.now().isoformat()
+            save_batch(batch)
+            return jsonify({"success": True, "batch": batch})
         
+        translator = get_translation_service()
+        batch["target_language"] = translator.target_language
         translated_articles = []
-        for i, article in enumerate(batch["articles"]):
-            try:
-                translated = translator.translate_article(article)
-                translated["translation_status"] = "completed"
-                translated_articles.append(translated)
-                batch["translated_articles"] = len(translated_articles)
-            except Exception as e:
-                logger.error(f"Error translating article {article.get('id')}: {e}")
+        # Articles completed before a sync or a restart keep their translation
+        pending = [a for a in batch["articles"] if a.get("translation_status") != "completed"]
+        
+        def checkpoint_article(index, translated):
+            if not isinstance(translated, Exception):
+                journal.append({"type": "article", "id": pending[index].get("id"),
+                                "article": dict(translated, translation_status="completed")})
+                batch["translated_articles"] += 1
+        
+        results = iter(translator.translate_articles(pending, on_result=checkpoint_article))
+        for article in batch["articles"]:
+            if article.get("translation_status") == "completed":
+                translated_articles.append(article)
+                continue
+            translated = next(results)
+            if isinstance(translated, Exception):
+                logger.error(f"Error translating article {article.get('id')}: {translated}")
                 article["translation_status"] = "failed"
-                article["error"] = str(e)
+                article["error"] = str(translated)
                 translated_articles.append(article)
+            else:
+                translated["translation_status"] = "completed"
+                translated_articles.append(translated)
+        batch["translated_articles"] = sum(
+            1 for a in translated_articles if a["translation_status"] == "completed"
+        )
         
         batch["articles"] = translated_articles
         batch["status"] = "completed"
         batch["completed_at"] = datetime.now().isoformat()
+        save_batch(batch)
         
         return jsonify({"success": True, "batch": batch})
     except Exception as e:
@@ -238,6 +602,74 @@ def start_batch(batch_id):
         batch["error"] = str(e)
         logger.error(f"Error processing batch {batch_id}: {e}")
         return jsonify({"error": "Failed to process batch"}), 500
+    finally:
+        journal.close()
+
+
+@app.route('/api/batches/<int:batch_id>/publish', methods=['POST'])
+def publish_batch(batch_id):
+    """Create the batch's translations in Zendesk (updating existing ones only with overwrite)"""
+    batch = next((b for b in batches if b["id"] == batch_id), None)
+    if not batch:
+        return jsonify({"error": "Batch not found"}), 404
+    
+    if batch["status"] != "completed":
+        return jsonify({"error": "Batch has not been translated yet"}), 400
+    
+    config = get_app_config()
+    publish_config = config.get("publish", {})
+    data = request.get_json(silent=True) or {}
+    # Single-language batches publish to the locale of the language they were translated into
+    locale = data.get('locale') or get_target_locale(
+        config, batch.get("target_language") or config.get("translation", {}).get("target_language", "Japanese"))
+    # Fan-out batches: map each target language to its Zendesk locale
+    language_locales = data.get('locales') or {
+        language: get_target_locale(config, language) for language in batch.get("target_languages", [])
+        if get_target_locale(config, language)
+    }
+    if not batch.get("target_languages") and not locale:
+        return jsonify({"error": f"No Zendesk locale known for {batch.get('target_language')}; "
+                                 f"pass 'locale'"}), 400
+    
+    translations = []
+    for article in batch["articles"]:
+        if article.get("translations"):
+            for language, translated in article["translations"].items():
+                if translated.get("translation_status") == "completed" and language in language_locales:
+                    translations.append({"article_id": article["id"], "locale": language_locales[language],
+                                         "title": translated["title"], "body": translated["body"]})
+        elif article.get("translation_status") == "completed":
+            translations.append({"article_id": article["id"], "locale": locale,
+                                 "title": article["title"], "body": article["body"]})
+    
+    try:
+        zendesk = get_zendesk_client()
+        results = zendesk.publish_translations(
+            translations,
+            draft=data.get('draft', publish_config.get('draft', True)),
+            max_workers=publish_config.get('max_workers', 4),
+            result_log=publish_config.get('result_log', 'output/publish_log.jsonl'),
+            # Existing translations (possibly written by people) are kept unless asked for
+            overwrite=data.get('overwrite', publish_config.get('overwrite', False))
+        )
+        # Per article (fan-out batches publish several locales): failed > published > skipped
+        rank = ["skipped", "published", "failed"]
+        statuses = {}
+        for r in results:
+            status = "published" if r["status"] in ("created", "updated") else r["status"]
+            if rank.index(status) >= rank.index(statuses.get(r["article_id"], "skipped")):
+                statuses[r["article_id"]] = status
+        for article in batch["articles"]:
+            if article["id"] in statuses:
+                article["publish_status"] = statuses[article["id"]]
+        batch["published_at"] = datetime.now().isoformat()
+        batch["published_articles"] = sum(1 for r in results if r["status"] in ("created", "updated"))
+        save_batch(batch)
+        
+        return jsonify({"success": True, "results": results, "batch": batch})
+    except Exception as e:
+        logger.error(f"Error publishing batch {batch_id}: {e}")
+        return jsonify({"error": "Failed to publish batch"}), 500
 
 
 @app.route('/api/articles/<int:article_id>/translate', methods=['POST'])
@@ -258,6 +690,42 @@ def translate_article(article_id):
         return jsonify({"error": "Failed to translate article"}), 500
 
 
+@app.route('/api/articles/<int:article_id>/translate/stream', methods=['POST'])
+def translate_article_stream(article_id):
+    """
+    Translate a single article, streaming the output as it is generated
+    
+    The response is newline-delimited JSON: {"field": ..., "delta": ...}
+    events, followed by {"done": true, "article": {...}} or {"error": ...}.
+    """
+    data = request.json
+    article = data.get('article')
+    
+    if not article:
+        return jsonify({"error": "Article data is required"}), 400
+    
+    translator = get_translation_service()
+    
+    def generate():
+        translated = {"title": "", "body": ""}
+        try:
+            for event in translator.translate_article_stream(article):
+                translated[event["field"]] += event["delta"]
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+            result = dict(article)
+            result.update({k: v for k, v in translated.items() if article.get(k)})
+            yield json.dumps({"done": True, "article": result}, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"Error streaming translation for article {article_id}: {e}")
+            yield json.dumps({"error": "Failed to translate article"}) + "\n"
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.route('/api/articles/<int:article_id>', methods=['PUT'])
 def update_article(article_id):
     """Update a translated article"""
@@ -273,6 +741,7 @@ def update_article(article_id):
                 if "body" in data:
                     article["body"] = data["body"]
                 article["last_modified"] = datetime.now().isoformat()
+                save_batch(batch)
                 return jsonify({"success": True, "article": article})
     
     return jsonify({"error": "Article not found"}), 404
@@ -281,19 +750,24 @@ def update_article(article_id):
 @app.route('/api/output/list')
 def list_output_files():
     """List all output files"""
-    config = load_config()
+    config = get_app_config()
     output_dir = Path(config.get("output", {}).get("directory", "output"))
     
     if not output_dir.exists():
         return jsonify({"files": []})
     
     files = []
-    for file_path in output_dir.glob("*.json"):
-        files.append({
-            "name": file_path.name,
-            "size": file_path.stat().st_size,
-            "modified": datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
-        })
+    with os.scandir(output_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            # One stat per file (scandir caches it for the entry)
+            stat = entry.stat()
+            files.append({
+                "name": entry.name,
+                "size": stat.st_size,
+                "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
+            })
     
     return jsonify({"files": files})
 
@@ -310,7 +784,7 @@ def get_output_file(filename):
     if not filename.endswith('.json'):
         return jsonify({"error": "Only JSON files are allowed"}), 400
     
-    config = load_config()
+    config = get_app_config()
     output_dir = Path(config.get("output", {}).get("directory", "output"))
     # Safe: filename is validated above, no path traversal possible
     file_path = output_dir / filename
@@ -339,10 +813,13 @@ def get_output_file(filename):
 
 if __name__ == '__main__':
     # Create output directory if it doesn't exist
-    config = load_config()
+    config = get_app_config()
     output_dir = Path(config.get("output", {}).get("directory", "output"))
     output_dir.mkdir(exist_ok=True)
     
+    # Pick up batches checkpointed before the last shutdown
+    restore_batches()
+    
     # Run the server
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'false').lower() == 'true'
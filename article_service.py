@@ -5,9 +5,20 @@ Handles the workflow of fetching articles, checking translations, and saving the
 import os
 import logging
 from pathlib import Path
-from typing import List, Dict, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, List, Dict, Optional, Set, Tuple
+import requests
 from zendesk_scraper import ZendeskScraper
+from zendesk_client import ZendeskClient
 from translation_service import TranslationService
+from rate_limiter import RateLimitScheduler
+from http_session import DEFAULT_TIMEOUT
+from http_cache import HttpCache
+from page_archive import PageArchive
+from translation_manifest import TranslationManifest
+from pipeline import StagedPipeline
+from output_store import OutputStore
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +29,19 @@ class ArticleTranslationService:
     def __init__(self, 
                  base_url: str,
                  translator: TranslationService,
-                 output_dir: str = "output"):
+                 output_dir: str = "output",
+                 scheduler: Optional[RateLimitScheduler] = None,
+                 session: Optional[requests.Session] = None,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 http_cache: Optional[HttpCache] = None,
+                 zendesk_client: Optional[ZendeskClient] = None,
+                 max_workers: int = 1,
+                 archive: Optional[PageArchive] = None,
+                 offline: bool = False,
+                 stage_workers: Optional[Dict[str, int]] = None,
+                 queue_size: int = 8,
+                 output_store: Optional[OutputStore] = None,
+                 manifest_path: str = ".cache/manifest.json"):
         """
         Initialize the article translation service
         
@@ -26,11 +49,42 @@ class ArticleTranslationService:
             base_url: Base URL of the Zendesk Help Center
             translator: Translation service instance
             output_dir: Directory to save output files
+            scheduler: Optional shared rate-limit scheduler for scraping
+            session: Optional shared pooled HTTP session for scraping
+            timeout: (connect, read) timeouts in seconds for scraping
+            http_cache: Optional conditional-GET cache for scraped pages
+            zendesk_client: Optional API client; when given, existing translations
+                are detected in bulk up front and only articles lacking the
+                target locale are scraped and translated
+            max_workers: Articles processed at once by process_articles()
+                (1 processes them one after another)
+            archive: Optional raw page archive scraped pages are appended to
+            offline: Scrape from the page archive instead of the network
+            stage_workers: Optional worker counts of the 'fetch', 'translate'
+                and 'write' stages; when given, process_articles() runs them as
+                a pipeline so scraping overlaps translation (missing or empty
+                counts default to max_workers, and 1 for 'write')
+            queue_size: Articles waiting in front of each pipeline stage
+            output_store: Optional SQLite store the markdown is written to
+                instead of one file per locale per article in output_dir
+            manifest_path: JSON file recording the inputs of every translated
+                file; kept out of output_dir so it is not listed as a result
         """
-        self.scraper = ZendeskScraper(base_url=base_url)
+        self.scraper = ZendeskScraper(base_url=base_url, scheduler=scheduler,
+                                      session=session, timeout=timeout, http_cache=http_cache,
+                                      archive=archive, offline=offline)
         self.translator = translator
+        self.zendesk_client = zendesk_client
+        self.max_workers = max(1, max_workers)
+        self.stage_workers = stage_workers
+        self.queue_size = queue_size
+        # Per-stage statistics of the last pipelined run
+        self.stage_stats: Dict[str, Dict] = {}
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.output_store = output_store
+        # Inputs of every translated file, so unchanged articles are not translated again
+        self.manifest = TranslationManifest(manifest_path)
         
     def _save_markdown(self, content: str, filename: str) -> str:
         """
@@ -49,60 +103,217 @@ class ArticleTranslationService:
         logger.info(f"Saved markdown to {filepath}")
         return str(filepath)
     
-    def _translate_markdown(self, markdown_content: str, title: str = "") -> str:
+    def _save_article(self, article_id: str, locale: str, content: str,
+                      source_hash: Optional[str] = None) -> str:
+        """
+        Save the markdown of an article in one locale to the configured output
+        
+        Args:
+            article_id: Article ID
+            locale: Locale suffix of the document (e.g. 'en', 'ja')
+            content: Markdown content to save
+            source_hash: Optional hash of the source a translation was made from
+            
+        Returns:
+            Path to the saved file, or its location in the output store
+        """
+        if self.output_store is not None:
+            return self.output_store.put(article_id, locale, content, source_hash)
+        return self._save_markdown(content, f"article_{article_id}_{locale}")
+    
+    def output_exists(self, location: str) -> bool:
+        """
+        Whether a saved file or output store location holds its document
+        
+        Args:
+            location: Path or output store location returned when saving
+            
+        Returns:
+            True if the document was written (committed, for the output store)
+        """
+        if self.output_store is not None:
+            return self.output_store.exists(location)
+        return os.path.exists(location)
+    
+    def _translate_markdown(self, markdown_content: str, title: str = "",
+                            translator: Optional[TranslationService] = None,
+                            segments: Optional[List[Dict]] = None) -> str:
         """
         Translate markdown content using OpenAI
         
         Args:
             markdown_content: Markdown content to translate
             title: Optional title to translate and prepend
+            translator: Translation service to use (default: self.translator)
+            segments: Optional pre-split segments of markdown_content
             
         Returns:
             Translated markdown content
         """
+        translator = translator or self.translator
+        
         # Build the content to translate
         content_to_translate = markdown_content
         
-        # Translate the content
-        translated_body = self.translator.translate_text(content_to_translate)
+        # Translate the content, reusing unchanged segments from the translation memory
+        translated_body = translator.translate_document(content_to_translate, "markdown", segments)
         
         # If title was provided, translate it separately and prepend
         if title:
-            translated_title = self.translator.translate_text(title)
+            translated_title = translator.translate_text(title)
             return f"# {translated_title}\n\n{translated_body}"
         
         return translated_body
     
-    def process_article(self, article_id: str) -> Dict:
+    def _translation_inputs(self, article: Dict, translator: Optional[TranslationService] = None) -> Dict:
         """
-        Process a single article: fetch English, check for Japanese, translate if needed
+        Describe what a translation of an article would be produced from
+        
+        Args:
+            article: Scraped English article
+            translator: Translation service to use (default: self.translator)
+            
+        Returns:
+            Dictionary with source_hash, glossary_version and model
+        """
+        translator = translator or self.translator
+        return {
+            "source_hash": TranslationManifest.source_hash(article['title'], article['body']),
+            "glossary_version": translator.glossary_version,
+            "model": translator.model_name
+        }
+    
+    def _detect_translations(self, article_ids: Iterable[str], locales: List[str]) -> Optional[Dict[str, Set[str]]]:
+        """
+        Look up the published locales of many articles at once through the API
+        
+        Args:
+            article_ids: Article IDs; a lazy iterator means "every article"
+            locales: Locales to check
+            
+        Returns:
+            Mapping of article ID to its published locales, or None when no
+            API client is configured or the lookup failed
+        """
+        if self.zendesk_client is None:
+            return None
+        try:
+            ids = list(article_ids) if hasattr(article_ids, "__len__") else None
+            return self.zendesk_client.get_translation_locales(locales, ids)
+        except Exception as e:
+            logger.warning(f"Could not detect existing translations: {e}. Checking each article instead.")
+            return None
+    
+    def _fetch_article(self, article_id: str, has_translation: Optional[bool] = None) -> Dict:
+        """
+        Fetch stage: scrape an article and decide whether it needs translating
         
         Args:
             article_id: The article ID to process
+            has_translation: Whether a Japanese translation is known to be
+                published; None checks by scraping the Japanese page
             
         Returns:
-            Dictionary with processing results
+            Job dictionary for the later stages; it already holds the final
+            'result' when there is nothing to translate or write
         """
         logger.info(f"Processing article {article_id}")
+        job = {"article_id": article_id}
         
-        # Fetch both English and Japanese versions
-        article_pair = self.scraper.get_article_pair(article_id)
+        if has_translation:
+            logger.info(f"Japanese translation already published for article {article_id}, skipping")
+            job["result"] = {
+                "article_id": article_id,
+                "status": "existing_translation",
+                "translation_source": "zendesk"
+            }
+            return job
         
-        english_article = article_pair.get('english')
-        japanese_article = article_pair.get('japanese')
+        if has_translation is None:
+            # Fetch both English and Japanese versions
+            article_pair = self.scraper.get_article_pair(article_id)
+            english_article = article_pair.get('english')
+            japanese_article = article_pair.get('japanese')
+        else:
+            # Known to be missing: only the English page is needed
+            english_article = self.scraper.get_article(article_id, locale="en-us")
+            japanese_article = None
         
         if not english_article:
             logger.error(f"Could not fetch English article {article_id}")
-            return {
+            job["result"] = {
                 "article_id": article_id,
                 "status": "error",
                 "message": "English article not found"
             }
+            return job
+        
+        job["english"] = english_article
+        if japanese_article:
+            logger.info(f"Japanese translation found for article {article_id}")
+            job["japanese"] = japanese_article
+            return job
+        
+        # Skip articles translated last time from the same source, glossary and model
+        job["inputs"] = self._translation_inputs(english_article)
+        if self.manifest.is_up_to_date(article_id, "ja", output_exists=self.output_exists, **job["inputs"]):
+            logger.info(f"Article {article_id} is unchanged since it was last translated, skipping")
+            job["result"] = {
+                "article_id": article_id,
+                "status": "up_to_date",
+                "english_url": english_article['url'],
+                "english_title": english_article['title'],
+                "japanese_file": self.manifest.get(article_id, "ja")["output_path"],
+                "translation_source": "openai"
+            }
+        return job
+    
+    def _translate_article(self, job: Dict) -> Dict:
+        """
+        Translate stage: translate the English article when no translation exists
+        
+        Args:
+            job: Job dictionary from _fetch_article()
+            
+        Returns:
+            The job, with the translated markdown under 'translated' or the
+            failure under 'error'
+        """
+        if "result" in job or "japanese" in job:
+            return job
+        
+        article_id = job["article_id"]
+        english_article = job["english"]
+        logger.info(f"No Japanese translation found for article {article_id}, translating with OpenAI...")
+        try:
+            job["translated"] = self._translate_markdown(
+                english_article['body'],
+                english_article['title']
+            )
+        except Exception as e:
+            logger.error(f"Error translating article {article_id}: {e}")
+            job["error"] = str(e)
+        return job
+    
+    def _write_article(self, job: Dict) -> Dict:
+        """
+        Write stage: save the markdown files of an article
+        
+        Args:
+            job: Job dictionary from _translate_article()
+            
+        Returns:
+            Dictionary with processing results
+        """
+        if "result" in job:
+            return job["result"]
+        
+        article_id = job["article_id"]
+        english_article = job["english"]
         
         # Save English version
-        english_filename = f"article_{article_id}_en"
         english_content = f"# {english_article['title']}\n\n{english_article['body']}"
-        english_path = self._save_markdown(english_content, english_filename)
+        english_path = self._save_article(article_id, "en", english_content)
         
         result = {
             "article_id": article_id,
@@ -111,13 +322,11 @@ class ArticleTranslationService:
             "english_title": english_article['title']
         }
         
-        # Check if Japanese version exists
+        japanese_article = job.get("japanese")
         if japanese_article:
             # Japanese version exists, save it
-            logger.info(f"Japanese translation found for article {article_id}")
-            japanese_filename = f"article_{article_id}_ja"
             japanese_content = f"# {japanese_article['title']}\n\n{japanese_article['body']}"
-            japanese_path = self._save_markdown(japanese_content, japanese_filename)
+            japanese_path = self._save_article(article_id, "ja", japanese_content)
             
             result.update({
                 "status": "existing_translation",
@@ -126,52 +335,359 @@ class ArticleTranslationService:
                 "japanese_title": japanese_article['title'],
                 "translation_source": "zendesk"
             })
+        elif "error" in job:
+            result.update({
+                "status": "translation_error",
+                "error": job["error"]
+            })
+        else:
+            # Save translated version
+            japanese_path = self._save_article(article_id, "ja", job["translated"],
+                                               job["inputs"]["source_hash"])
+            self.manifest.record(article_id, "ja", output_path=japanese_path, **job["inputs"])
+            
+            result.update({
+                "status": "translated",
+                "japanese_file": japanese_path,
+                "translation_source": "openai"
+            })
+            
+            logger.info(f"Successfully translated article {article_id}")
+        
+        return result
+    
+    def process_article(self, article_id: str, has_translation: Optional[bool] = None) -> Dict:
+        """
+        Process a single article: fetch English, check for Japanese, translate if needed
+        
+        Args:
+            article_id: The article ID to process
+            has_translation: Whether a Japanese translation is known to be
+                published (from bulk detection); None checks by scraping the
+                Japanese page
+            
+        Returns:
+            Dictionary with processing results
+        """
+        job = self._fetch_article(article_id, has_translation)
+        return self._write_article(self._translate_article(job))
+    
+    def _map_articles(self, process: Callable[[str], Dict], article_ids: Iterable[str],
+                      on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Run process on every article ID, on a worker pool if max_workers > 1
+        
+        At most a small window of articles is queued ahead of the workers, so
+        lazily streamed IDs are not all pulled in up front. Results are
+        returned in input order, and passed to on_result (in the calling
+        thread) as soon as they are collected.
+        """
+        total = len(article_ids) if hasattr(article_ids, "__len__") else "?"
+        
+        def run(index, article_id):
+            logger.info(f"Processing article {index}/{total}: {article_id}")
+            return process(article_id)
+        
+        results = []
+        
+        def collect(result):
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        
+        if self.max_workers == 1:
+            for i, article_id in enumerate(article_ids, 1):
+                collect(run(i, article_id))
+            return results
+        
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for i, article_id in enumerate(article_ids, 1):
+                pending.append(executor.submit(run, i, article_id))
+                if len(pending) >= self.max_workers * 2:
+                    collect(pending.popleft().result())
+            while pending:
+                collect(pending.popleft().result())
+        return results
+    
+    def _run_stages(self, stages: List[Tuple[str, Callable]], article_ids: Iterable[str],
+                    on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Run articles through the fetch, translate and write stages as a pipeline
+        
+        Each stage has its own workers (from stage_workers), so scraping and
+        translation of different articles overlap. Per-stage statistics of
+        the run are kept in self.stage_stats.
+        """
+        pipeline = StagedPipeline(
+            [(name, func, self.stage_workers.get(name) or (1 if name == "write" else self.max_workers))
+             for name, func in stages],
+            queue_size=self.queue_size
+        )
+        try:
+            return pipeline.run(article_ids, on_result)
+        finally:
+            self.stage_stats = pipeline.stats()
+    
+    def process_articles(self, article_ids: Iterable[str],
+                         on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Process multiple articles
+        
+        Articles whose English source, glossary version and model match the
+        manifest entry of their existing translation are reported as
+        'up_to_date' without being translated again.
+        
+        Args:
+            article_ids: Article IDs to process; may be a lazy iterator
+                (e.g. streamed from ZendeskClient.iter_articles)
+            on_result: Optional callback receiving each result, in order, as
+                soon as it is available
+            
+        Returns:
+            List of processing results
+        """
+        available = self._detect_translations(article_ids, ["ja"])
+        
+        def has_translation(article_id):
+            return "ja" in available.get(str(article_id), ()) if available is not None else None
+        
+        try:
+            if self.stage_workers is not None:
+                return self._run_stages([
+                    ("fetch", lambda article_id: self._fetch_article(article_id, has_translation(article_id))),
+                    ("translate", self._translate_article),
+                    ("write", self._write_article)
+                ], article_ids, on_result)
+            return self._map_articles(
+                lambda article_id: self.process_article(article_id, has_translation(article_id)),
+                article_ids, on_result
+            )
+        finally:
+            if self.output_store is not None:
+                self.output_store.flush()
+            self.manifest.flush()
+    
+    def _fetch_article_multilang(self, article_id: str,
+                                 translators: Dict[str, TranslationService],
+                                 published_locales: Optional[Set[str]] = None) -> Dict:
+        """
+        Fetch stage for several locales: scrape the English article and the
+        existing version of every target locale in parallel
+        
+        Args:
+            article_id: The article ID to process
+            translators: Mapping of Zendesk locale to translation service
+            published_locales: Locales known to be published already
+            
+        Returns:
+            Job dictionary for the later stages, with the locales still to be
+            translated under 'missing'
+        """
+        logger.info(f"Processing article {article_id} for locales: {', '.join(translators)}")
+        job = {"article_id": article_id, "translators": translators,
+               "published": published_locales or set(), "inputs": {}, "missing": []}
+        
+        if published_locales is None:
+            locales = ["en-us"] + [locale for locale in translators if locale != "en-us"]
         else:
-            # No Japanese version, translate using OpenAI
-            logger.info(f"No Japanese translation found for article {article_id}, translating with OpenAI...")
+            locales = ["en-us"]
+        with ThreadPoolExecutor(max_workers=len(locales)) as executor:
+            fetched = dict(zip(locales, executor.map(
+                lambda locale: self.scraper.get_article(article_id, locale=locale), locales
+            )))
+        
+        english_article = fetched["en-us"]
+        if not english_article:
+            logger.error(f"Could not fetch English article {article_id}")
+            job["result"] = {
+                "article_id": article_id,
+                "status": "error",
+                "message": "English article not found"
+            }
+            return job
+        
+        job["english"] = english_article
+        job["fetched"] = fetched
+        for locale in translators:
+            if locale in job["published"] or fetched.get(locale):
+                continue
+            job["inputs"][locale] = self._translation_inputs(english_article, translators[locale])
+            if not self.manifest.is_up_to_date(article_id, locale, output_exists=self.output_exists,
+                                               **job["inputs"][locale]):
+                job["missing"].append(locale)
+        return job
+    
+    def _translate_article_multilang(self, job: Dict) -> Dict:
+        """
+        Translate stage for several locales: translate the missing locales concurrently
+        
+        Args:
+            job: Job dictionary from _fetch_article_multilang()
+            
+        Returns:
+            The job, with the translated markdown (or the exception) of every
+            missing locale under 'translated'
+        """
+        missing = job["missing"]
+        if "result" in job or not missing:
+            return job
+        
+        article_id = job["article_id"]
+        english_article = job["english"]
+        translators = job["translators"]
+        
+        # Parse the English body once and share the segments between languages
+        # (translators sharing a token budget can reuse the same split)
+        splitter = min((translators[locale] for locale in missing), key=lambda t: t.max_chunk_tokens)
+        segments = splitter.split_document(english_article['body'], "markdown")
+        
+        def translate(locale):
+            translator = translators[locale]
+            shared = segments if translator.max_chunk_tokens == splitter.max_chunk_tokens else None
+            return self._translate_markdown(
+                english_article['body'], english_article['title'], translator, shared
+            )
+        
+        logger.info(f"Translating article {article_id} into {', '.join(missing)} with OpenAI...")
+        with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+            futures = {locale: executor.submit(translate, locale) for locale in missing}
+        
+        job["translated"] = {}
+        for locale, future in futures.items():
             try:
-                # Translate the markdown content
-                translated_content = self._translate_markdown(
-                    english_article['body'],
-                    english_article['title']
-                )
-                
-                # Save translated version
-                japanese_filename = f"article_{article_id}_ja"
-                japanese_path = self._save_markdown(translated_content, japanese_filename)
-                
-                result.update({
-                    "status": "translated",
-                    "japanese_file": japanese_path,
-                    "translation_source": "openai"
-                })
-                
-                logger.info(f"Successfully translated article {article_id}")
-                
+                job["translated"][locale] = future.result()
             except Exception as e:
-                logger.error(f"Error translating article {article_id}: {e}")
-                result.update({
+                job["translated"][locale] = e
+        return job
+    
+    def _write_article_multilang(self, job: Dict) -> Dict:
+        """
+        Write stage for several locales: save the markdown files of an article
+        
+        Args:
+            job: Job dictionary from _translate_article_multilang()
+            
+        Returns:
+            Dictionary with processing results, with per-locale results under 'translations'
+        """
+        if "result" in job:
+            return job["result"]
+        
+        article_id = job["article_id"]
+        english_article = job["english"]
+        english_content = f"# {english_article['title']}\n\n{english_article['body']}"
+        english_path = self._save_article(article_id, "en", english_content)
+        result = {
+            "article_id": article_id,
+            "status": "completed",
+            "english_url": english_article['url'],
+            "english_file": english_path,
+            "english_title": english_article['title'],
+            "translations": {}
+        }
+        
+        for locale in job["translators"]:
+            existing = job["fetched"].get(locale)
+            if locale in job["published"]:
+                logger.info(f"{locale} translation already published for article {article_id}, skipping")
+                result["translations"][locale] = {
+                    "status": "existing_translation",
+                    "translation_source": "zendesk"
+                }
+            elif existing:
+                logger.info(f"{locale} translation found for article {article_id}")
+                content = f"# {existing['title']}\n\n{existing['body']}"
+                result["translations"][locale] = {
+                    "status": "existing_translation",
+                    "url": existing['url'],
+                    "file": self._save_article(article_id, locale, content),
+                    "title": existing['title'],
+                    "translation_source": "zendesk"
+                }
+            elif locale not in job["missing"]:
+                logger.info(f"{locale} translation of article {article_id} is up to date, skipping")
+                result["translations"][locale] = {
+                    "status": "up_to_date",
+                    "file": self.manifest.get(article_id, locale)["output_path"],
+                    "translation_source": "openai"
+                }
+            elif isinstance(job["translated"][locale], Exception):
+                error = job["translated"][locale]
+                logger.error(f"Error translating article {article_id} into {locale}: {error}")
+                result["translations"][locale] = {
                     "status": "translation_error",
-                    "error": str(e)
-                })
+                    "error": str(error)
+                }
+                result["status"] = "translation_error"
+            else:
+                path = self._save_article(article_id, locale, job["translated"][locale],
+                                          job["inputs"][locale]["source_hash"])
+                self.manifest.record(article_id, locale, output_path=path, **job["inputs"][locale])
+                result["translations"][locale] = {
+                    "status": "translated",
+                    "file": path,
+                    "translation_source": "openai"
+                }
         
         return result
     
-    def process_articles(self, article_ids: List[str]) -> List[Dict]:
+    def process_article_multilang(self, article_id: str,
+                                  translators: Dict[str, TranslationService],
+                                  published_locales: Optional[Set[str]] = None) -> Dict:
         """
-        Process multiple articles
+        Process a single article for several target locales at once
+        
+        The English article and the existing version for every target locale
+        are fetched in parallel, the English body is parsed once, and the
+        missing locales are translated concurrently.
         
         Args:
-            article_ids: List of article IDs to process
+            article_id: The article ID to process
+            translators: Mapping of Zendesk locale (e.g. 'ja', 'ko') to the
+                translation service for that locale's language
+            published_locales: Locales known to be published already (from bulk
+                detection); those are neither fetched nor translated. When
+                given, locales not in it are known to be missing.
+            
+        Returns:
+            Dictionary with processing results, with per-locale results under 'translations'
+        """
+        job = self._fetch_article_multilang(article_id, translators, published_locales)
+        return self._write_article_multilang(self._translate_article_multilang(job))
+    
+    def process_articles_multilang(self, article_ids: Iterable[str],
+                                   translators: Dict[str, TranslationService],
+                                   on_result: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """
+        Process multiple articles for several target locales
+        
+        Args:
+            article_ids: Article IDs to process; may be a lazy iterator
+            translators: Mapping of Zendesk locale to translation service
+            on_result: Optional callback receiving each result, in order
             
         Returns:
             List of processing results
         """
-        results = []
+        available = self._detect_translations(article_ids, list(translators))
         
-        for i, article_id in enumerate(article_ids, 1):
-            logger.info(f"Processing article {i}/{len(article_ids)}: {article_id}")
-            result = self.process_article(article_id)
-            results.append(result)
+        def published(article_id):
+            return available.get(str(article_id), set()) if available is not None else None
         
-        return results
+        try:
+            if self.stage_workers is not None:
+                return self._run_stages([
+                    ("fetch", lambda article_id: self._fetch_article_multilang(
+                        article_id, translators, published(article_id))),
+                    ("translate", self._translate_article_multilang),
+                    ("write", self._write_article_multilang)
+                ], article_ids, on_result)
+            return self._map_articles(
+                lambda article_id: self.process_article_multilang(article_id, translators, published(article_id)),
+                article_ids, on_result
+            )
+        finally:
+            if self.output_store is not None:
+                self.output_store.flush()
+            self.manifest.flush()
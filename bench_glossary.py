@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for per-document glossary filtering
+
+Compares the size of the system prompt with the full glossary against the
+prompt that only includes terms found in the source text, and reports the
+cost of building and running the glossary matcher.
+
+Usage:
+    python bench_glossary.py [--terms 3000] [--docs 200]
+"""
+import argparse
+import random
+import time
+
+from glossary import GlossaryMatcher
+from translation_service import TranslationService
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def make_glossary(count: int, rng: random.Random):
+    """Generate a synthetic glossary of multi-word product terms"""
+    words = ["account", "guide", "visitor", "segment", "report", "metric", "page",
+             "feature", "event", "poll", "dashboard", "resource", "center", "tag",
+             "workflow", "theme", "launcher", "badge", "filter", "integration"]
+    terms = []
+    for index in range(count):
+        source = f"{rng.choice(words).title()} {rng.choice(words).title()} {index}"
+        terms.append({"source": source, "target": f"用語{index}"})
+    return terms
+
+
+def make_document(glossary, rng: random.Random, paragraphs: int = 20) -> str:
+    """Generate a synthetic article body mentioning a handful of glossary terms"""
+    filler = "This article explains how to configure the product for your team. "
+    parts = []
+    for _ in range(paragraphs):
+        mention = rng.choice(glossary)["source"] if rng.random() < 0.4 else "settings"
+        parts.append(f"<p>{filler * 3}Open {mention} to continue.</p>")
+    return "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--terms", type=int, default=3000, help="Number of glossary terms")
+    parser.add_argument("--docs", type=int, default=200, help="Number of documents to match")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    glossary = make_glossary(args.terms, rng)
+    documents = [make_document(glossary, rng) for _ in range(args.docs)]
+
+    start = time.perf_counter()
+    matcher = GlossaryMatcher(term["source"] for term in glossary)
+    build_seconds = time.perf_counter() - start
+
+    service = TranslationService(target_language="Japanese", glossary=glossary)
+
+    full_tokens = estimate_tokens(service._build_system_prompt())
+    filtered_tokens = 0
+    matched_terms = 0
+    match_seconds = 0.0
+    for document in documents:
+        start = time.perf_counter()
+        matched = matcher.filter_terms(glossary, document)
+        match_seconds += time.perf_counter() - start
+        matched_terms += len(matched)
+        filtered_tokens += estimate_tokens(service._build_system_prompt(document))
+
+    doc_chars = sum(len(d) for d in documents) / len(documents)
+    avg_filtered = filtered_tokens / len(documents)
+
+    print(f"Glossary terms:            {len(glossary)}")
+    print(f"Automaton states:          {matcher.size}")
+    print(f"Matcher build time:        {build_seconds * 1000:.1f} ms")
+    print(f"Documents:                 {len(documents)} (avg {doc_chars:.0f} chars)")
+    print(f"Match time per document:   {match_seconds / len(documents) * 1000:.3f} ms")
+    print(f"Terms matched per doc:     {matched_terms / len(documents):.1f}")
+    print(f"Prompt tokens (full):      {full_tokens}")
+    print(f"Prompt tokens (filtered):  {avg_filtered:.0f}")
+    print(f"Prompt tokens saved/call:  {full_tokens - avg_filtered:.0f} "
+          f"({(1 - avg_filtered / full_tokens) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark for pooled keep-alive HTTP sessions
+
+Serves a gzip-encoded Help Center style page from a local server and compares
+one-off requests.get() calls (a new connection per request) with a shared
+pooled session, sequentially and with several worker threads. A delay can be
+added to every new connection to stand in for the TCP/TLS handshake of a
+remote host.
+
+Usage:
+    python bench_http.py [--requests 200] [--workers 8] [--connect-delay 0.02]
+"""
+import argparse
+import gzip
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+
+from http_session import create_session, DEFAULT_TIMEOUT
+
+PAGE = gzip.compress(
+    b"<html><body><article><h1 class='article-title'>Title</h1><div class='article-body'>"
+    + b"<p>This article explains how to configure the product for your team.</p>" * 300
+    + b"</div></article></body></html>"
+)
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves the same gzip-encoded page over HTTP/1.1 keep-alive connections"""
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; avoid Nagle/delayed-ACK stalls on reused connections
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        with self.server.lock:
+            self.server.connections += 1
+        time.sleep(self.server.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(fetch, url: str, count: int, workers: int) -> float:
+    """Fetch the URL count times with the given number of threads; return seconds"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(lambda _: fetch(url).content, range(count)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--workers", type=int, default=8, help="Threads for the concurrent scenario")
+    parser.add_argument("--connect-delay", type=float, default=0.02,
+                        help="Seconds added to every new connection (simulated handshake)")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    server.connect_delay = args.connect_delay
+    server.connections = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/hc/en-us/articles/1"
+
+    print(f"{args.requests} requests, {len(PAGE)} byte gzip page, "
+          f"{args.connect_delay * 1000:.0f} ms per new connection")
+    print(f"{'scenario':<32}{'seconds':>10}{'req/s':>10}{'connections':>13}")
+    for workers in (1, args.workers):
+        session = create_session(pool_size=workers)
+        scenarios = [
+            ("requests.get", lambda u: requests.get(u, timeout=DEFAULT_TIMEOUT)),
+            ("pooled session", lambda u: session.get(u, timeout=DEFAULT_TIMEOUT)),
+        ]
+        for name, fetch in scenarios:
+            server.connections = 0
+            seconds = run(fetch, url, args.requests, workers)
+            print(f"{name + f' ({workers} worker(s))':<32}{seconds:>10.2f}"
+                  f"{args.requests / seconds:>10.0f}{server.connections:>13}")
+        session.close()
+
+    server.shutdown()
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark for scraper page parsing
+
+Compares the per-page parse time of a full html.parser parse (the previous
+approach) with the restricted parse used by ZendeskScraper, on saved Help
+Center pages or on a generated page with realistic navigation, scripts and
+footer.
+
+Usage:
+    python bench_scraper.py [--pages saved_pages/] [--repeat 50]
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+import zendesk_scraper
+from zendesk_scraper import ZendeskScraper
+
+
+def make_page(paragraphs: int = 40) -> bytes:
+    """Generate a Help Center style page with a large chrome around the article"""
+    nav = "".join(f'<li class="nav-item"><a href="/hc/en-us/categories/{i}">Category {i}</a></li>'
+                  for i in range(150))
+    sidebar = "".join(f'<li><a href="/hc/en-us/articles/{i}">Related article {i}</a></li>'
+                      for i in range(80))
+    script = "<script>" + "window.HelpCenter = window.HelpCenter || {};" * 400 + "</script>"
+    body = "".join(f"<p>Paragraph {i} explains how to configure <strong>Guides</strong> "
+                   f"for your <a href='/hc/en-us/articles/{i}'>visitors</a>.</p>" for i in range(paragraphs))
+    return (
+        "<!DOCTYPE html><html><head><title>Article</title>" + script + "</head><body>"
+        f'<header class="header"><nav><ul>{nav}</ul></nav></header>'
+        '<main><div class="container"><article class="article">'
+        '<h1 class="article-title" title="Article">Configuring Guides</h1>'
+        f'<div class="article-body">{body}</div></article>'
+        f'<aside class="article-sidebar"><ul>{sidebar}</ul></aside></div></main>'
+        f'<footer class="footer"><ul>{nav}</ul></footer>{script}</body></html>'
+    ).encode("utf-8")
+
+
+def full_parse(content: bytes, converter):
+    """The previous approach: parse the whole page, then search it with fresh regexes"""
+    soup = BeautifulSoup(content, "html.parser")
+    title = soup.find("h1", class_=re.compile(r"article.*title|title")) or soup.find("h1")
+    body = soup.find("div", class_=re.compile(r"article.*body|article-body")) or soup.find("article")
+    return title.get_text(strip=True), converter.handle(str(body))
+
+
+def measure(func, pages, repeat: int) -> float:
+    """Return the mean milliseconds per page"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages:
+            func(page)
+    return (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--pages", help="Directory of saved .html pages (default: a generated page)")
+    parser.add_argument("--repeat", type=int, default=50, help="Parses per page")
+    args = parser.parse_args()
+
+    if args.pages:
+        pages = [path.read_bytes() for path in sorted(Path(args.pages).glob("*.html"))]
+    else:
+        pages = [make_page()]
+    if not pages:
+        parser.error(f"No .html files in {args.pages}")
+
+    scraper = ZendeskScraper(base_url="https://support.example.com")
+    print(f"{len(pages)} page(s), {sum(map(len, pages)) // len(pages)} bytes on average, "
+          f"{args.repeat} parses each")
+    print(f"{'method':<40}{'ms/page':>10}")
+    ms = measure(lambda page: BeautifulSoup(page, "html.parser"), pages, args.repeat)
+    print(f"{'full parse (html.parser)':<40}{ms:>10.2f}")
+    ms = measure(lambda page: full_parse(page, scraper.html_converter), pages, args.repeat)
+    print(f"{'  + title/body extraction + markdown':<40}{ms:>10.2f}")
+
+    # The restricted parse, with every available parser
+    default_parser = zendesk_scraper.HTML_PARSER
+    for name in ("html.parser", "lxml"):
+        try:
+            BeautifulSoup(b"<p></p>", name)
+        except Exception:
+            continue
+        zendesk_scraper.HTML_PARSER = name
+        ms = measure(lambda page: BeautifulSoup(page, name, parse_only=scraper._strainer), pages, args.repeat)
+        print(f"{'restricted parse (' + name + ')':<40}{ms:>10.2f}")
+        ms = measure(scraper._parse_article, pages, args.repeat)
+        print(f"{'  + title/body extraction + markdown':<40}{ms:>10.2f}")
+    zendesk_scraper.HTML_PARSER = default_parser
+
+
+if __name__ == "__main__":
+    main()
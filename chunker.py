@@ -0,0 +1,161 @@
+"""
+Chunker
+Splits large documents into token-budgeted chunks at safe block boundaries
+"""
+import re
+import logging
+from typing import List, Dict, Iterator
+
+from segmenter import split_segments, split_html, make_segment, append_text
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken is optional
+    _ENCODING = None
+
+logger = logging.getLogger(__name__)
+
+_ELEMENT_RE = re.compile(r"^(<([a-zA-Z][a-zA-Z0-9]*)\b[^>]*>)(.*)(</\2\s*>)$", re.DOTALL)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text
+
+    Uses tiktoken when it is installed, otherwise a conservative estimate of
+    one token per three characters.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Estimated token count
+    """
+    if not text:
+        return 0
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text, disallowed_special=()))
+    return len(text) // 3 + 1
+
+
+def _split_oversized(segment: Dict, content_format: str, max_tokens: int) -> Iterator[Dict]:
+    """
+    Break a segment that exceeds the token budget into smaller segments
+
+    HTML elements are opened up: the opening and closing tags become
+    passthrough segments and the element's children are segmented in turn,
+    so every translatable piece stays tag-balanced. Markdown blocks are split
+    at line boundaries. Segments that cannot be split are returned as-is.
+    """
+    text = segment["text"]
+    if content_format == "html":
+        match = _ELEMENT_RE.match(text)
+        if match:
+            children = split_html(match.group(3))
+            translatable = [child for child in children if child["translatable"]]
+            if len(translatable) > 1 or (translatable and _ELEMENT_RE.match(translatable[0]["text"])):
+                yield make_segment(match.group(1), translatable=False)
+                yield from _bound(children, content_format, max_tokens)
+                yield make_segment(match.group(4), translatable=False)
+                return
+    elif content_format == "markdown":
+        lines = text.splitlines(keepends=True)
+        if len(lines) > 1:
+            pieces = []
+            for line in lines:
+                append_text(pieces, line)
+            yield from pieces
+            return
+
+    logger.warning(f"Segment of ~{estimate_tokens(text)} tokens cannot be split "
+                   f"below the {max_tokens} token budget")
+    yield segment
+
+
+def _bound(segments: List[Dict], content_format: str, max_tokens: int) -> Iterator[Dict]:
+    for segment in segments:
+        if segment["translatable"] and estimate_tokens(segment["text"]) > max_tokens:
+            yield from _split_oversized(segment, content_format, max_tokens)
+        else:
+            yield segment
+
+
+def bounded_segments(text: str, content_format: str, max_tokens: int) -> List[Dict]:
+    """
+    Split a document into block segments that each fit the token budget
+
+    Args:
+        text: Document text
+        content_format: Either 'html' or 'markdown'
+        max_tokens: Maximum estimated tokens per translatable segment
+
+    Returns:
+        List of segment dictionaries; joining them reproduces the input
+    """
+    return list(_bound(split_segments(text, content_format), content_format, max_tokens))
+
+
+def chunk_document(text: str, content_format: str, max_tokens: int) -> List[Dict]:
+    """
+    Split a document and group its segments into chunks under a token budget
+
+    Args:
+        text: Document text
+        content_format: Either 'html' or 'markdown'
+        max_tokens: Maximum estimated tokens per chunk
+
+    Returns:
+        List of segment dictionaries where translatable entries are chunks;
+        joining them reproduces the input
+    """
+    return chunk_segments(bounded_segments(text, content_format, max_tokens), max_tokens)
+
+
+def chunk_segments(segments: List[Dict], max_tokens: int) -> List[Dict]:
+    """
+    Group segments into chunks under a token budget
+
+    Consecutive segments are packed into one chunk until the next segment
+    would exceed the budget. Chunks only end at block boundaries, so HTML
+    tags stay balanced within each chunk. Structural passthrough segments
+    (such as the wrapper tags of an element that had to be opened up) are
+    kept outside the chunks.
+
+    Args:
+        segments: Segments from bounded_segments()
+        max_tokens: Maximum estimated tokens per chunk
+
+    Returns:
+        List of segment dictionaries where translatable entries are chunks;
+        joining them reproduces the input
+    """
+    parts = []
+    current = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current_tokens
+        if current:
+            append_text(parts, "".join(current))
+            current.clear()
+            current_tokens = 0
+
+    for segment in segments:
+        segment_text = segment["text"]
+        if not segment["translatable"]:
+            if current and not segment_text.strip():
+                current.append(segment_text)
+            else:
+                flush()
+                parts.append(segment)
+            continue
+
+        tokens = estimate_tokens(segment_text)
+        if current and current_tokens + tokens > max_tokens:
+            flush()
+        current.append(segment_text)
+        current_tokens += tokens
+
+    flush()
+    return parts
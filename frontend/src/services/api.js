@@ -42,8 +42,15 @@ export default {
     return api.get(`/batches/${batchId}`);
   },
 
-  startBatch(batchId) {
-    return api.post(`/batches/${batchId}/start`);
+  // Pass several target languages to fan out from a single fetch of the batch
+  startBatch(batchId, targetLanguages = null) {
+    return api.post(`/batches/${batchId}/start`,
+      targetLanguages ? { target_languages: targetLanguages } : {});
+  },
+
+  // Creates or updates the batch's translations in Zendesk
+  publishBatch(batchId, options = {}) {
+    return api.post(`/batches/${batchId}/publish`, options);
   },
 
   // Articles
@@ -51,6 +58,33 @@ export default {
     return api.post(`/articles/${articleId}/translate`, { article });
   },
 
+  // Streams newline-delimited JSON events ({field, delta}, then {done, article})
+  async translateArticleStream(articleId, article, onEvent) {
+    const response = await fetch(`${API_BASE_URL}/articles/${articleId}/translate/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ article })
+    });
+    if (!response.ok) {
+      throw new Error(`Request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      const lines = buffer.split('\n');
+      buffer = lines.pop();
+      for (const line of lines) {
+        if (line.trim()) onEvent(JSON.parse(line));
+      }
+    }
+    if (buffer.trim()) onEvent(JSON.parse(buffer));
+  },
+
   updateArticle(articleId, data) {
     return api.put(`/articles/${articleId}`, data);
   },
@@ -0,0 +1,225 @@
+"""
+Glossary
+Compiled glossaries and multi-pattern matching of glossary terms against source text
+"""
+import os
+import json
+import hashlib
+import threading
+import logging
+from collections import deque
+from typing import List, Dict, Iterable, Set, Optional, Tuple
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+class GlossaryMatcher:
+    """Aho-Corasick automaton that finds which glossary terms occur in a text"""
+
+    def __init__(self, terms: Iterable[str]):
+        """
+        Compile the matcher
+
+        Matching is case-insensitive and does not require word boundaries,
+        so a term is reported whenever its text occurs anywhere in the input.
+
+        Args:
+            terms: Source-language glossary terms; the position of each term
+                in this sequence is the index reported by find()
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+
+        for index, term in enumerate(terms):
+            term = (term or "").lower()
+            if not term:
+                continue
+            node = 0
+            for char in term:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append(index)
+
+        self._build_failure_links()
+
+    def _build_failure_links(self):
+        """Compute failure links breadth-first and merge output sets"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    @property
+    def size(self) -> int:
+        """Number of states in the automaton"""
+        return len(self._goto)
+
+    def find(self, text: str) -> Set[int]:
+        """
+        Find the glossary terms present in a text
+
+        Args:
+            text: Source text to scan
+
+        Returns:
+            Set of indexes of the terms that occur in the text
+        """
+        found = set()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        node = 0
+        for char in text.lower():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+    def filter_terms(self, terms: List[dict], text: str) -> List[dict]:
+        """
+        Select the glossary entries whose source term occurs in a text
+
+        Args:
+            terms: The glossary entries the matcher was built from
+            text: Source text to scan
+
+        Returns:
+            Matching entries in glossary order
+        """
+        found = self.find(text)
+        return [term for index, term in enumerate(terms) if index in found]
+
+
+class CompiledGlossary:
+    """Immutable, versioned glossary with a prebuilt matcher and prompt lines"""
+
+    __slots__ = ("_terms", "_lines", "_matcher", "_version")
+
+    def __init__(self, terms: Optional[List[Dict[str, str]]] = None):
+        """
+        Compile a glossary
+
+        Args:
+            terms: List of term dictionaries with 'source' and 'target' keys
+        """
+        terms = tuple(dict(term) for term in (terms or []))
+        usable = [term for term in terms if term.get("source") and term.get("target")]
+        payload = json.dumps(list(terms), ensure_ascii=False, sort_keys=True)
+
+        object.__setattr__(self, "_terms", terms)
+        object.__setattr__(self, "_version", hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16])
+        object.__setattr__(self, "_lines", tuple(
+            f"- '{term['source']}' should be translated as '{term['target']}'\n" for term in usable
+        ))
+        object.__setattr__(self, "_matcher", GlossaryMatcher(term["source"] for term in usable))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CompiledGlossary is immutable")
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    @property
+    def terms(self) -> List[Dict[str, str]]:
+        """Copy of the glossary entries"""
+        return [dict(term) for term in self._terms]
+
+    @property
+    def version(self) -> str:
+        """Short content hash identifying this glossary"""
+        return self._version
+
+    @property
+    def matcher(self) -> GlossaryMatcher:
+        """Matcher over the usable source terms"""
+        return self._matcher
+
+    def prompt_section(self, text: Optional[str] = None) -> str:
+        """
+        Build the glossary section of the system prompt
+
+        Args:
+            text: Optional source text; when given, only terms that occur in
+                it are included
+
+        Returns:
+            Prompt section, or an empty string if no terms apply
+        """
+        if text is None:
+            lines = self._lines
+        else:
+            found = self._matcher.find(text)
+            lines = [line for index, line in enumerate(self._lines) if index in found]
+        if not lines:
+            return ""
+        return "Use the following glossary for consistent terminology:\n" + "".join(lines) + "\n"
+
+
+class GlossaryStore:
+    """Loads a glossary file and recompiles it only when the file changes"""
+
+    def __init__(self, glossary_file: str):
+        """
+        Initialize glossary store
+
+        Args:
+            glossary_file: Path to the glossary YAML file
+        """
+        self.glossary_file = glossary_file
+        self._compiled = None
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _file_stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.glossary_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self) -> CompiledGlossary:
+        """
+        Get the compiled glossary, reloading it if the file has changed
+
+        Returns:
+            CompiledGlossary instance (empty if the file cannot be loaded)
+        """
+        stamp = self._file_stamp()
+        with self._lock:
+            if self._compiled is None or stamp != self._stamp:
+                self._compiled = CompiledGlossary(self._load_terms())
+                self._stamp = stamp
+                logger.info(f"Compiled {len(self._compiled)} glossary terms "
+                            f"from {self.glossary_file} (version {self._compiled.version})")
+            return self._compiled
+
+    def invalidate(self):
+        """Force the glossary to be reloaded on the next get()"""
+        with self._lock:
+            self._compiled = None
+
+    def _load_terms(self) -> List[Dict[str, str]]:
+        try:
+            with open(self.glossary_file, 'r', encoding='utf-8') as f:
+                data = yaml.safe_load(f) or {}
+            return data.get("terms", []) or []
+        except Exception as e:
+            logger.warning(f"Error loading glossary: {e}")
+            return []
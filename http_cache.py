@@ -0,0 +1,140 @@
+"""
+HTTP Cache
+Stores ETag/Last-Modified validators and the parsed result for each fetched URL,
+tagged with the version of the parser that produced it
+"""
+import json
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class HttpCache:
+    """Validator cache for conditional GETs, backed by SQLite"""
+
+    def __init__(self, db_path: str = ".cache/http_cache.db"):
+        """
+        Initialize HTTP cache
+
+        Args:
+            db_path: Path to the SQLite database file (":memory:" for a throwaway cache)
+        """
+        self.db_path = db_path
+        self.not_modified = 0
+        self.fetched = 0
+        self._lock = threading.Lock()
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(responses)")]
+        if columns and "version" not in columns:
+            # Results cached before parser versions were recorded cannot be trusted
+            self._conn.execute("DROP TABLE responses")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, "
+            "etag TEXT, "
+            "last_modified TEXT, "
+            "result TEXT NOT NULL, "
+            "version TEXT NOT NULL DEFAULT '', "
+            "updated REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def conditional_headers(self, url: str, version: str = "") -> Dict[str, str]:
+        """
+        Build the If-None-Match/If-Modified-Since headers for a URL
+
+        Args:
+            url: Request URL
+            version: Version of the parser the result must have been produced with
+
+        Returns:
+            Request headers (empty if the URL has not been cached with this version)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ? AND version = ?", (url, version)
+            ).fetchone()
+        headers = {}
+        if row is not None:
+            if row[0]:
+                headers["If-None-Match"] = row[0]
+            if row[1]:
+                headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def get(self, url: str, version: str = "") -> Optional[Any]:
+        """
+        Get the parsed result stored for a URL after a 304 response
+
+        Args:
+            url: Request URL
+            version: Version of the parser the result must have been produced with
+
+        Returns:
+            The stored result, or None if nothing is cached with this version
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result FROM responses WHERE url = ? AND version = ?", (url, version)
+            ).fetchone()
+            if row is None:
+                return None
+            self.not_modified += 1
+        return json.loads(row[0])
+
+    def set(self, url: str, response, result: Any, version: str = ""):
+        """
+        Store a response's validators with its parsed result
+
+        Nothing is stored when the response carries neither an ETag nor a
+        Last-Modified header.
+
+        Args:
+            url: Request URL
+            response: The 200 response
+            result: JSON-serializable parsed result
+            version: Version of the parser that produced the result
+        """
+        with self._lock:
+            self.fetched += 1
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        etag = etag if isinstance(etag, str) else None
+        last_modified = last_modified if isinstance(last_modified, str) else None
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, result, version, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, json.dumps(result, ensure_ascii=False), version, time.time())
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with 304 and full-download counters and the entry count
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "not_modified": self.not_modified,
+            "fetched": self.fetched,
+            "entries": entries
+        }
+
+    def close(self):
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
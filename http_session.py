@@ -0,0 +1,59 @@
+"""
+HTTP Session
+Shared, pooled HTTP sessions for the Zendesk client and scraper
+"""
+from typing import Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 30)
+
+
+def create_session(pool_size: int = 10, user_agent: Optional[str] = None) -> requests.Session:
+    """
+    Create a pooled session with keep-alive and compression
+
+    Connections are kept alive and reused per host. At most pool_size
+    connections are open to a host at once; further requests wait for a
+    free connection. Responses are requested with gzip/deflate, plus
+    brotli when a brotli decoder is installed.
+
+    Args:
+        pool_size: Maximum connections per host (match it to the worker count)
+        user_agent: Optional User-Agent header
+
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # urllib3 only advertises "br" when it can decode it
+    session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    return session
+
+
+def session_from_config(config: Dict, workers: int = 1) -> Tuple[requests.Session, Tuple[float, float]]:
+    """
+    Build the shared session and timeouts from the 'http' configuration section
+
+    Args:
+        config: Full configuration dictionary
+        workers: Number of concurrent workers that will share the session;
+            the pool is never smaller than this
+
+    Returns:
+        Tuple of (session, (connect timeout, read timeout))
+    """
+    http_config = config.get("http", {}) or {}
+    pool_size = max(http_config.get("pool_size", 10), workers)
+    timeout = (
+        http_config.get("connect_timeout", DEFAULT_TIMEOUT[0]),
+        http_config.get("read_timeout", DEFAULT_TIMEOUT[1])
+    )
+    return create_session(pool_size, http_config.get("user_agent")), timeout
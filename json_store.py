@@ -0,0 +1,69 @@
+"""
+JSON Store
+Small dictionary persisted to a JSON file that is replaced atomically
+"""
+import os
+import json
+import threading
+import logging
+from pathlib import Path
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class JsonFileStore:
+    """
+    Base class for state kept in memory and written to a JSON file
+
+    Subclasses update self._data under self._lock and call _updated(); the
+    file is rewritten through a temporary file and os.replace() once
+    flush_every updates are pending, and on flush().
+    """
+
+    # Logged after the reason when an existing file cannot be read
+    unreadable_message = "Starting empty."
+
+    def __init__(self, path: str, flush_every: int = 1):
+        """
+        Initialize the store
+
+        Args:
+            path: Path to the JSON file
+            flush_every: Write the file after this many updates (and on flush())
+        """
+        self.path = Path(path)
+        self.flush_every = max(1, flush_every)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._data: Dict = self._load()
+
+    def _load(self) -> Dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Error reading {self.path}: {e}. {self.unreadable_message}")
+            return {}
+
+    def _updated(self):
+        """Count an update of self._data (call with self._lock held)"""
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._write()
+
+    def flush(self):
+        """Write pending updates to disk"""
+        with self._lock:
+            if self._pending:
+                self._write()
+
+    def _write(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._pending = 0
@@ -10,12 +10,23 @@ import sys
 import json
 import yaml
 import logging
+import argparse
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 from dotenv import load_dotenv
 
 from article_service import ArticleTranslationService
 from translation_service import TranslationService
+from translation_cache import TranslationCache
+from glossary import CompiledGlossary
+from zendesk_client import ZendeskClient
+from rate_limiter import scheduler_from_config
+from http_session import session_from_config
+from http_cache import HttpCache
+from sync_cursor import LastModifiedStore
+from page_archive import PageArchive
+from run_journal import RunJournal
+from output_store import OutputStore
 
 
 # Configure logging
@@ -53,7 +64,7 @@ def load_config(config_file: str = "config.yaml") -> Dict:
 def load_glossary(glossary_file: str) -> List[Dict[str, str]]:
     """
     Load glossary/translation memory from YAML file
-    
+        
     Args:
         glossary_file: Path to glossary file
         
@@ -71,17 +82,114 @@ def load_glossary(glossary_file: str) -> List[Dict[str, str]]:
         return []
 
 
+def build_target_translators(translator: TranslationService, targets: List[Dict]) -> Dict[str, TranslationService]:
+    """
+    Create a translation service per fan-out target
+        
+    The default target language keeps the main glossary. Other languages use
+    their own glossary_file, or no glossary at all, so terms written for one
+    language never reach another language's prompts.
+        
+    Args:
+        translator: Translation service of the default target language
+        targets: Entries of translation.targets (locale, language, optional glossary_file)
+        
+    Returns:
+        Mapping of Zendesk locale to translation service
+    """
+    translators = {}
+    for target in targets:
+        if target.get("glossary_file"):
+            target_glossary = CompiledGlossary(load_glossary(target["glossary_file"]))
+        elif target["language"] == translator.target_language:
+            target_glossary = translator.compiled_glossary
+        else:
+            target_glossary = CompiledGlossary()
+        translators[target["locale"]] = translator.for_language(target["language"], target_glossary)
+    return translators
+
+
+def load_translation_cache(config: Dict) -> Optional[TranslationCache]:
+    """
+    Open the persistent translation cache if enabled in configuration
+        
+    Args:
+        config: Configuration dictionary
+        
+    Returns:
+        TranslationCache instance, or None if caching is disabled
+    """
+    cache_config = config.get("cache", {})
+    if not cache_config.get("enabled", True):
+        return None
+    try:
+        cache = TranslationCache(
+            db_path=cache_config.get("path", ".cache/translations.db"),
+            max_size_mb=cache_config.get("max_size_mb", 256)
+        )
+        logger.info(f"Using translation cache at {cache.db_path}")
+        return cache
+    except Exception as e:
+        logger.warning(f"Error opening translation cache: {e}. Continuing without cache.")
+        return None
+
+
+def load_http_cache(config: Dict) -> Optional[HttpCache]:
+    """
+    Open the conditional-GET cache if enabled in configuration
+        
+    Args:
+        config: Configuration dictionary
+        
+    Returns:
+        HttpCache instance, or None if disabled
+    """
+    http_config = config.get("http", {})
+    if not http_config.get("cache_enabled", True):
+        return None
+    try:
+        return HttpCache(http_config.get("cache_path", ".cache/http_cache.db"))
+    except Exception as e:
+        logger.warning(f"Error opening HTTP cache: {e}. Continuing without it.")
+        return None
+
+
+def get_zendesk_client(config: Dict, scheduler, session, timeout,
+                       http_cache: Optional[HttpCache] = None) -> Optional[ZendeskClient]:
+    """
+    Create a Zendesk API client from environment variables
+        
+    Args:
+        config: Configuration dictionary
+        scheduler: Shared rate-limit scheduler
+        session: Shared pooled HTTP session
+        timeout: (connect, read) timeouts in seconds
+        http_cache: Optional conditional-GET cache
+        
+    Returns:
+        ZendeskClient instance, or None if API credentials are not configured
+    """
+    subdomain = os.getenv("ZENDESK_SUBDOMAIN") or config.get("zendesk", {}).get("subdomain")
+    email = os.getenv("ZENDESK_EMAIL")
+    token = os.getenv("ZENDESK_API_TOKEN")
+    if not all([subdomain, email, token]):
+        return None
+    return ZendeskClient(subdomain, email, token, scheduler=scheduler, session=session, timeout=timeout,
+                         max_workers=config.get("zendesk", {}).get("list_workers", 4),
+                         http_cache=http_cache)
+
+
 def save_results(results: List[Dict], output_dir: str = "output"):
     """
     Save processing results to a JSON summary file
-    
+        
     Args:
         results: List of processing result dictionaries
         output_dir: Directory to save output files
     """
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
-    
+        
     # Save summary of all processed articles
     summary_file = output_path / "processing_summary.json"
     with open(summary_file, 'w', encoding='utf-8') as f:
@@ -89,97 +197,307 @@ def save_results(results: List[Dict], output_dir: str = "output"):
     logger.info(f"Saved processing summary to {summary_file}")
 
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments
+        
+    Args:
+        argv: Arguments to parse (default: sys.argv)
+        
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Translate Zendesk Help Center articles")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run: articles completed in the journal "
+                             "are not processed again")
+    parser.add_argument("--export-markdown", metavar="DIR",
+                        help="Write every article in the SQLite output store as a markdown file "
+                             "into DIR, then exit")
+    return parser.parse_args(argv)
+
+
+def load_output_store(config: Dict) -> Optional[OutputStore]:
+    """
+    Open the SQLite output store if it is the configured output backend
+        
+    Args:
+        config: Configuration dictionary
+        
+    Returns:
+        OutputStore instance, or None when markdown files are written directly
+    """
+    output_config = config.get("output", {})
+    if output_config.get("backend", "files") != "sqlite":
+        return None
+    db_path = output_config.get("db_path", os.path.join(output_config.get("directory", "output"), "articles.db"))
+    logger.info(f"Writing output to {db_path}")
+    return OutputStore(db_path, batch_size=output_config.get("batch_size", 200))
+
+
+def main(argv: Optional[List[str]] = None):
     """Main execution function"""
+    args = parse_args(argv)
     logger.info("Starting Zendesk KB Translation Program")
-    
+        
     # Load environment variables
     load_dotenv()
-    
+        
     # Load configuration
     config = load_config()
-    
+        
+    if args.export_markdown:
+        output_store = load_output_store(config)
+        if output_store is None:
+            logger.error("--export-markdown needs output.backend: sqlite in config.yaml")
+            sys.exit(1)
+        output_store.export_markdown(args.export_markdown)
+        output_store.close()
+        return
+        
     # Get Zendesk base URL from environment or config
     base_url = os.getenv("ZENDESK_BASE_URL")
     if not base_url:
         base_url = config.get("zendesk", {}).get("base_url", "https://support.pendo.io")
-    
+        
     logger.info(f"Using Zendesk base URL: {base_url}")
-    
+        
     # Get translation settings
     target_language = os.getenv("TARGET_LANGUAGE", 
                                 config.get("translation", {}).get("target_language", "Japanese"))
     use_azure = os.getenv("USE_AZURE", "false").lower() == "true"
     model = os.getenv("OPENAI_MODEL", "gpt-4")
-    
+        
     # Load glossary
     glossary_file = config.get("glossary_file", "glossary.yaml")
     glossary = load_glossary(glossary_file)
-    
+        
+    # Rate limits are shared by the translator and the scraper
+    scheduler = scheduler_from_config(config)
+        
     # Initialize translation service
     logger.info("Initializing translation service...")
     translator = TranslationService(
         target_language=target_language,
         glossary=glossary,
         use_azure=use_azure,
-        model=model
-    )
-    
-    # Get output directory
-    output_dir = config.get("output", {}).get("directory", "output")
-    
-    # Initialize article service
-    logger.info("Initializing article service...")
-    article_service = ArticleTranslationService(
-        base_url=base_url,
-        translator=translator,
-        output_dir=output_dir
+        model=model,
+        cache=load_translation_cache(config),
+        max_concurrency=config.get("translation", {}).get("max_concurrency", 8),
+        max_chunk_tokens=config.get("translation", {}).get("max_chunk_tokens", 2000),
+        max_batch_items=config.get("translation", {}).get("max_batch_items", 40),
+        scheduler=scheduler
     )
-    
-    # Get article IDs to process
-    # You can modify this to read from a file or command line arguments
-    article_ids_input = os.getenv("ARTICLE_IDS", "")
-    if article_ids_input:
-        article_ids = [aid.strip() for aid in article_ids_input.split(",") if aid.strip()]
-    else:
-        # Example article IDs - replace with your actual article IDs
-        logger.warning("No ARTICLE_IDS environment variable set. Using example article ID.")
-        article_ids = ["27240321140763"]  # Example from the problem statement
-    
-    logger.info(f"Processing {len(article_ids)} article(s): {', '.join(article_ids)}")
-    
-    # Process articles
-    results = article_service.process_articles(article_ids)
-    
-    # Save results summary
-    logger.info("Saving results summary...")
-    save_results(results, output_dir)
-    
-    # Print summary
-    logger.info("\n" + "="*60)
-    logger.info("Processing Summary:")
-    logger.info("="*60)
-    
-    for result in results:
-        article_id = result.get('article_id')
-        status = result.get('status')
-        logger.info(f"\nArticle {article_id}: {status}")
-        
-        if status == "existing_translation":
-            logger.info(f"  - Found existing Japanese translation")
-            logger.info(f"  - English: {result.get('english_file')}")
-            logger.info(f"  - Japanese: {result.get('japanese_file')}")
-        elif status == "translated":
-            logger.info(f"  - Translated using OpenAI")
-            logger.info(f"  - English: {result.get('english_file')}")
-            logger.info(f"  - Japanese: {result.get('japanese_file')}")
-        elif status == "error" or status == "translation_error":
-            logger.error(f"  - Error: {result.get('message', result.get('error'))}")
-    
-    logger.info("\n" + "="*60)
-    logger.info("Translation program completed!")
-    logger.info(f"Results saved to: {output_dir}")
-    logger.info("="*60)
+        
+    # Caches buffer writes, so they are closed however the run ends
+    http_cache = None
+    try:
+        # Get output directory
+        output_dir = config.get("output", {}).get("directory", "output")
+        output_store = load_output_store(config)
+        
+        # Articles processed at once; each worker fetches two pages at a time
+        max_workers = int(os.getenv("MAX_WORKERS", config.get("processing", {}).get("max_workers", 1)))
+        # Optional pipeline: separate fetch/translate/write workers with bounded queues between them
+        stage_workers = config.get("processing", {}).get("stages")
+        fetch_workers = (stage_workers or {}).get("fetch") or max_workers
+        
+        # One pooled keep-alive session is reused for every page fetch
+        session, timeout = session_from_config(
+            config, max(config.get("zendesk", {}).get("list_workers", 4), max_workers * 2, fetch_workers * 2)
+        )
+        http_cache = load_http_cache(config)
+        
+        # Raw page archive; OFFLINE=true re-derives articles from it without network access
+        archive_config = config.get("archive", {})
+        offline = os.getenv("OFFLINE", "false").lower() == "true"
+        archive = None
+        if archive_config.get("enabled", False) or offline:
+            archive = PageArchive(archive_config.get("directory", ".cache/archive"))
+            logger.info(f"{'Reading pages from' if offline else 'Archiving pages to'} {archive.directory}")
+        
+        # With API credentials, existing translations are detected in bulk instead of scraped
+        zendesk = None if offline else get_zendesk_client(config, scheduler, session, timeout, http_cache)
+        if zendesk is None and not offline:
+            logger.info("No Zendesk API credentials; checking translations by scraping each article")
+        
+        # Initialize article service
+        logger.info("Initializing article service...")
+        article_service = ArticleTranslationService(
+            base_url=base_url,
+            translator=translator,
+            output_dir=output_dir,
+            scheduler=scheduler,
+            session=session,
+            timeout=timeout,
+            http_cache=http_cache,
+            zendesk_client=zendesk,
+            max_workers=max_workers,
+            archive=archive,
+            offline=offline,
+            stage_workers=stage_workers,
+            queue_size=config.get("processing", {}).get("queue_size", 8),
+            output_store=output_store,
+            manifest_path=config.get("output", {}).get("manifest_file", ".cache/manifest.json")
+        )
+        
+        # Get article IDs to process
+        # You can modify this to read from a file or command line arguments
+        article_ids_input = os.getenv("ARTICLE_IDS", "")
+        on_result = None
+        discovery_state = None
+        if article_ids_input.strip().lower() == "discover":
+            # Crawl the help center sitemap (or categories/sections) and queue only
+            # new or changed articles; progress is saved as articles complete, so an
+            # interrupted crawl resumes where it stopped
+            discovery_config = config.get("discovery", {})
+            discovery_state = LastModifiedStore(
+                discovery_config.get("state_file", ".cache/discovered_articles.json")
+            )
+            locale = os.getenv("ARTICLE_LOCALE", "en-us")
+            lastmods = {}
+        
+            def changed_article_ids():
+                for article_id, lastmod in article_service.scraper.discover_articles(
+                        locale=locale, max_workers=discovery_config.get("max_workers", 4)):
+                    if discovery_state.is_changed(article_id, lastmod):
+                        lastmods[article_id] = lastmod
+                        yield article_id
+        
+            def on_result(result):
+                if result.get("status") not in ("error", "translation_error"):
+                    discovery_state.mark(result["article_id"], lastmods.get(result["article_id"]))
+        
+            article_ids = changed_article_ids()
+            logger.info(f"Discovering new or changed {locale} articles from {base_url}")
+        elif article_ids_input.strip().lower() == "all":
+            # Stream IDs from the Zendesk API; articles are processed while later pages are fetched
+            if zendesk is None:
+                raise ValueError("ZENDESK_SUBDOMAIN, ZENDESK_EMAIL and ZENDESK_API_TOKEN are required "
+                                 "when ARTICLE_IDS=all")
+            locale = os.getenv("ARTICLE_LOCALE", "en-us")
+            article_ids = (str(article["id"]) for article in zendesk.iter_articles(locale=locale))
+            logger.info(f"Processing all {locale} articles from {zendesk.subdomain}")
+        elif article_ids_input:
+            article_ids = [aid.strip() for aid in article_ids_input.split(",") if aid.strip()]
+            logger.info(f"Processing {len(article_ids)} article(s): {', '.join(article_ids)}")
+        else:
+            # Example article IDs - replace with your actual article IDs
+            logger.warning("No ARTICLE_IDS environment variable set. Using example article ID.")
+            article_ids = ["27240321140763"]  # Example from the problem statement
+            logger.info(f"Processing {len(article_ids)} article(s): {', '.join(article_ids)}")
+        
+        # Every result is checkpointed as soon as its article completes; --resume
+        # replays the journal and skips the articles that already succeeded
+        journal = RunJournal(config.get("processing", {}).get(
+            "journal_file", os.path.join(output_dir, "journal.jsonl")))
+        replayed = {}
+        if args.resume:
+            # Results whose output never reached disk (e.g. still buffered in the
+            # SQLite output store when the run died) are processed again
+            replayed = journal.completed(article_service.output_exists)
+            logger.info(f"Resuming: {len(replayed)} article(s) already completed in {journal.path}")
+            if isinstance(article_ids, list):
+                article_ids = [aid for aid in article_ids if str(aid) not in replayed]
+            else:
+                article_ids = (aid for aid in article_ids if str(aid) not in replayed)
+        else:
+            journal.reset()
+        
+        checkpoint = on_result
+        
+        def on_result(result):
+            journal.append(result)
+            if checkpoint is not None:
+                checkpoint(result)
+        
+        # Process articles, fanning out to several languages if targets are configured
+        targets = config.get("translation", {}).get("targets")
+        if targets:
+            translators = build_target_translators(translator, targets)
+            logger.info(f"Fanning out to {len(translators)} locale(s): {', '.join(translators)}")
+            results = article_service.process_articles_multilang(article_ids, translators, on_result)
+        else:
+            results = article_service.process_articles(article_ids, on_result)
+        
+        journal.close()
+        results = list(replayed.values()) + results
+        if discovery_state is not None:
+            discovery_state.flush()
+        
+        # Save results summary
+        logger.info("Saving results summary...")
+        save_results(results, output_dir)
+        
+        # Print summary
+        logger.info("\n" + "="*60)
+        logger.info("Processing Summary:")
+        logger.info("="*60)
+        
+        for result in results:
+            article_id = result.get('article_id')
+            status = result.get('status')
+            logger.info(f"\nArticle {article_id}: {status}")
+        
+            if status == "existing_translation":
+                logger.info(f"  - Found existing Japanese translation")
+                if result.get('english_file'):
+                    logger.info(f"  - English: {result.get('english_file')}")
+                    logger.info(f"  - Japanese: {result.get('japanese_file')}")
+            elif status == "translated":
+                logger.info(f"  - Translated using OpenAI")
+                logger.info(f"  - English: {result.get('english_file')}")
+                logger.info(f"  - Japanese: {result.get('japanese_file')}")
+            elif status == "up_to_date":
+                logger.info(f"  - Unchanged since last translation")
+                logger.info(f"  - Japanese: {result.get('japanese_file')}")
+            elif status == "error" or status == "translation_error":
+                logger.error(f"  - Error: {result.get('message', result.get('error'))}")
+        
+            for locale, translation in result.get('translations', {}).items():
+                detail = translation.get('file') or translation.get('error')
+                logger.info(f"  - {locale}: {translation.get('status')} ({detail})")
+        
+        for name, stage in article_service.stage_stats.items():
+            logger.info(f"Stage {name}: {stage['items']} articles on {stage['workers']} worker(s), "
+                        f"{stage['utilization']:.0%} utilized ({stage['busy_seconds']:.1f}s busy)")
+        
+        if translator.cache is not None:
+            stats = translator.cache.stats()
+            logger.info(f"\nTranslation cache: {stats['hits']} hits, {stats['misses']} misses, "
+                        f"{stats['entries']} entries ({stats['size_bytes']} bytes)")
+        
+        if archive is not None:
+            archive.close()
+        
+        if output_store is not None:
+            stats = output_store.stats()
+            logger.info(f"Output store: {stats['written']} documents written, "
+                        f"{stats['unchanged']} unchanged, {stats['documents']} stored")
+            output_store.close()
+        
+        if http_cache is not None:
+            stats = http_cache.stats()
+            logger.info(f"HTTP cache: {stats['not_modified']} unchanged (304), "
+                        f"{stats['fetched']} downloaded")
+        
+        stats = scheduler.stats()
+        logger.info(f"Rate limiting: {stats['retries']} retries")
+        for name, bucket in stats.items():
+            if isinstance(bucket, dict) and bucket["acquired"]:
+                logger.info(f"  - {name}: {bucket['acquired']} requests, "
+                            f"{bucket['wait_seconds']:.1f}s total queue wait "
+                            f"(max {bucket['max_wait_seconds']:.1f}s)")
+        
+        logger.info("\n" + "="*60)
+        logger.info("Translation program completed!")
+        logger.info(f"Results saved to: {output_dir}")
+        logger.info("="*60)
+    finally:
+        if translator.cache is not None:
+            translator.cache.close()
+        if http_cache is not None:
+            http_cache.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,224 @@
+"""
+Output Store
+Single-file SQLite store for the markdown of every article and locale, as an
+alternative to one file per locale per article in the output directory
+"""
+import zlib
+import sqlite3
+import hashlib
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class OutputStore:
+    """
+    Markdown output indexed by article ID and locale, with zlib-compressed bodies
+
+    Writes are buffered and committed in batches of batch_size documents (and
+    on flush()), so storing thousands of articles costs a few transactions.
+    Buffered documents are visible to get() and exists() before they are
+    committed.
+    """
+
+    def __init__(self, db_path: str = "output/articles.db", batch_size: int = 200):
+        """
+        Initialize the output store
+
+        Args:
+            db_path: Path to the SQLite database file
+            batch_size: Documents written per transaction
+        """
+        self.db_path = db_path
+        self.batch_size = max(1, batch_size)
+        self.written = 0
+        self.unchanged = 0
+        self._lock = threading.Lock()
+        # (article_id, locale) -> row values waiting to be committed
+        self._pending: Dict[Tuple[str, str], Tuple] = {}
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents ("
+            "article_id TEXT NOT NULL, "
+            "locale TEXT NOT NULL, "
+            "content_hash TEXT NOT NULL, "
+            "source_hash TEXT, "
+            "body BLOB NOT NULL, "
+            "updated REAL NOT NULL, "
+            "PRIMARY KEY (article_id, locale))"
+        )
+        self._conn.commit()
+
+    def location(self, article_id: str, locale: str) -> str:
+        """
+        Describe where a document is stored (used in results and the manifest)
+
+        Args:
+            article_id: Article ID
+            locale: Locale of the document
+
+        Returns:
+            '<db path>#<article ID>/<locale>'
+        """
+        return f"{self.db_path}#{article_id}/{locale}"
+
+    def put(self, article_id: str, locale: str, content: str, source_hash: Optional[str] = None) -> str:
+        """
+        Store the markdown of an article in one locale
+
+        Args:
+            article_id: Article ID
+            locale: Locale of the document (e.g. 'en', 'ja')
+            content: Markdown content
+            source_hash: Optional hash of the source the content was produced from
+
+        Returns:
+            Location of the document (see location())
+        """
+        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        key = (str(article_id), locale)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                current = pending[2]
+            else:
+                row = self._conn.execute(
+                    "SELECT content_hash FROM documents WHERE article_id = ? AND locale = ?", key
+                ).fetchone()
+                current = row[0] if row else None
+            if current == content_hash:
+                self.unchanged += 1
+            else:
+                self._pending[key] = (key[0], locale, content_hash, source_hash,
+                                      zlib.compress(content.encode('utf-8')), time.time())
+                if len(self._pending) >= self.batch_size:
+                    self._commit()
+        return self.location(article_id, locale)
+
+    def get(self, article_id: str, locale: str) -> Optional[str]:
+        """
+        Read the markdown of an article in one locale
+
+        Args:
+            article_id: Article ID
+            locale: Locale of the document
+
+        Returns:
+            Markdown content, or None if it was never stored
+        """
+        key = (str(article_id), locale)
+        with self._lock:
+            pending = self._pending.get(key)
+            if pending is not None:
+                body = pending[4]
+            else:
+                row = self._conn.execute(
+                    "SELECT body FROM documents WHERE article_id = ? AND locale = ?", key
+                ).fetchone()
+                if row is None:
+                    return None
+                body = row[0]
+        return zlib.decompress(body).decode('utf-8')
+
+    def exists(self, location: str) -> bool:
+        """
+        Whether a location returned by put() holds a document
+
+        Args:
+            location: Document location
+
+        Returns:
+            True if the document is stored
+        """
+        prefix = f"{self.db_path}#"
+        if not location.startswith(prefix) or "/" not in location[len(prefix):]:
+            return False
+        article_id, locale = location[len(prefix):].rsplit("/", 1)
+        key = (article_id, locale)
+        with self._lock:
+            if key in self._pending:
+                return True
+            return self._conn.execute(
+                "SELECT 1 FROM documents WHERE article_id = ? AND locale = ?", key
+            ).fetchone() is not None
+
+    def _commit(self):
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO documents "
+            "(article_id, locale, content_hash, source_hash, body, updated) VALUES (?, ?, ?, ?, ?, ?)",
+            list(self._pending.values())
+        )
+        self._conn.commit()
+        self.written += len(self._pending)
+        self._pending.clear()
+
+    def flush(self):
+        """Commit buffered documents"""
+        with self._lock:
+            if self._pending:
+                self._commit()
+
+    def iter_documents(self) -> Iterator[Tuple[str, str, str]]:
+        """
+        Iterate over every committed document
+
+        Yields:
+            Tuples of (article ID, locale, markdown content)
+        """
+        self.flush()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT article_id, locale FROM documents ORDER BY article_id, locale"
+            ).fetchall()
+        for article_id, locale in rows:
+            content = self.get(article_id, locale)
+            if content is not None:
+                yield article_id, locale, content
+
+    def export_markdown(self, directory: str) -> int:
+        """
+        Write every document as 'article_<id>_<locale>.md' into a directory
+
+        Args:
+            directory: Target directory (created if missing)
+
+        Returns:
+            Number of files written
+        """
+        target = Path(directory)
+        target.mkdir(parents=True, exist_ok=True)
+        count = 0
+        for article_id, locale, content in self.iter_documents():
+            with open(target / f"article_{article_id}_{locale}.md", 'w', encoding='utf-8') as f:
+                f.write(content)
+            count += 1
+        logger.info(f"Exported {count} markdown files from {self.db_path} to {target}")
+        return count
+
+    def stats(self) -> Dict:
+        """
+        Get store statistics
+
+        Returns:
+            Dictionary with written and unchanged counters and the document count
+        """
+        with self._lock:
+            documents = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+        return {
+            "written": self.written,
+            "unchanged": self.unchanged,
+            "documents": documents
+        }
+
+    def close(self):
+        """Commit buffered documents and close the database connection"""
+        self.flush()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,118 @@
+"""
+Page Archive
+Append-only, compressed archive of fetched Help Center pages with an offset index
+"""
+import json
+import zlib
+import threading
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PageArchive:
+    """
+    Archive of raw page HTML, one data file and one index file per crawl
+
+    Each page is appended to '<crawl>.pages' as a separately zlib-compressed
+    record, and a JSON line with its URL, offset, length and status is
+    appended to '<crawl>.index'. Lookups return the most recent copy of a URL
+    across all crawls in the directory.
+    """
+
+    def __init__(self, directory: str = ".cache/archive", crawl_id: Optional[str] = None):
+        """
+        Initialize the archive
+
+        Args:
+            directory: Directory holding the crawl files
+            crawl_id: Name of the crawl pages are written to (default: a timestamp)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.crawl_id = crawl_id or datetime.now().strftime("crawl-%Y%m%d-%H%M%S")
+        self._lock = threading.Lock()
+        self._data_file = None
+        self._index_file = None
+        # url -> (data file path, offset, length, status)
+        self._index: Dict[str, Tuple[Path, int, int, int]] = {}
+        self._load_index()
+
+    def _load_index(self):
+        """Read the index of every crawl, oldest first so later copies win"""
+        for index_path in sorted(self.directory.glob("*.index")):
+            data_path = index_path.with_suffix(".pages")
+            with open(index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A crawl that was killed mid-write can leave a partial last line
+                        continue
+                    self._index[entry["url"]] = (data_path, entry["offset"], entry["length"], entry["status"])
+        if self._index:
+            logger.info(f"Loaded page archive index with {len(self._index)} URLs from {self.directory}")
+
+    def add(self, url: str, status: int, content: bytes):
+        """
+        Append a fetched page to the current crawl
+
+        Args:
+            url: Page URL
+            status: HTTP status code (pages that were not found are archived
+                with status 404 and no content)
+            content: Raw page content
+        """
+        record = zlib.compress(content or b"")
+        with self._lock:
+            if self._data_file is None:
+                data_path = self.directory / f"{self.crawl_id}.pages"
+                self._data_file = open(data_path, 'ab')
+                self._index_file = open(self.directory / f"{self.crawl_id}.index", 'a', encoding='utf-8')
+            offset = self._data_file.tell()
+            self._data_file.write(record)
+            self._data_file.flush()
+            self._index_file.write(json.dumps({
+                "url": url, "offset": offset, "length": len(record), "status": status,
+                "fetched_at": datetime.now().isoformat()
+            }) + "\n")
+            self._index_file.flush()
+            self._index[url] = (Path(self._data_file.name), offset, len(record), status)
+
+    def get(self, url: str) -> Optional[Tuple[int, bytes]]:
+        """
+        Read the most recent archived copy of a page
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Tuple of (status code, raw content), or None if the URL was never archived
+        """
+        with self._lock:
+            entry = self._index.get(url)
+        if entry is None:
+            return None
+        data_path, offset, length, status = entry
+        with open(data_path, 'rb') as f:
+            f.seek(offset)
+            return status, zlib.decompress(f.read(length))
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return url in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def close(self):
+        """Close the files of the current crawl"""
+        with self._lock:
+            if self._data_file is not None:
+                self._data_file.close()
+                self._index_file.close()
+                self._data_file = None
+                self._index_file = None
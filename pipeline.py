@@ -0,0 +1,178 @@
+"""
+Staged Pipeline
+Runs items through a chain of stages, each on its own worker threads, connected
+by bounded queues
+"""
+import time
+import queue
+import threading
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+# Error of items skipped after another item failed
+_CANCELLED = object()
+
+
+class StagedPipeline:
+    """
+    Chain of stages connected by bounded queues
+
+    Every stage has its own worker threads, so a slow stage (e.g. translation)
+    works through earlier items while the stage before it keeps going. A full
+    queue blocks the stage feeding it, which bounds the number of items in
+    flight. Results are returned in input order.
+    """
+
+    def __init__(self, stages: List[Tuple[str, Callable[[Any], Any], int]], queue_size: int = 8):
+        """
+        Initialize the pipeline
+
+        Args:
+            stages: (name, function, worker count) per stage, in order; each
+                function receives the previous stage's output
+            queue_size: Capacity of the queue in front of each stage
+        """
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = [(name, func, max(1, workers)) for name, func, workers in stages]
+        self.queue_size = max(1, queue_size)
+        self._lock = threading.Lock()
+        self._busy: Dict[str, float] = {}
+        self._items: Dict[str, int] = {}
+        self._elapsed = 0.0
+
+    def _work(self, name: str, func: Callable, inbox: queue.Queue, outbox: queue.Queue,
+              remaining: List[int], next_workers: int, stop: threading.Event):
+        """Worker loop of one stage; the last worker to finish closes the next queue"""
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            index, value, error = item
+            if error is None and stop.is_set():
+                error = _CANCELLED
+            if error is None:
+                start = time.perf_counter()
+                try:
+                    value = func(value)
+                except Exception as e:
+                    error = e
+                    stop.set()
+                with self._lock:
+                    self._busy[name] += time.perf_counter() - start
+                    self._items[name] += 1
+            outbox.put((index, value, error))
+        with self._lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            for _ in range(next_workers):
+                outbox.put(_DONE)
+
+    def _feed(self, items: Iterable, inbox: queue.Queue, workers: int, stop: threading.Event):
+        """Put the input items on the first queue"""
+        try:
+            for index, item in enumerate(items):
+                if stop.is_set():
+                    break
+                inbox.put((index, item, None))
+        except Exception as e:
+            stop.set()
+            inbox.put((-1, None, e))
+        for _ in range(workers):
+            inbox.put(_DONE)
+
+    def run(self, items: Iterable, on_result: Optional[Callable[[Any], None]] = None) -> List:
+        """
+        Run every item through all stages
+
+        Args:
+            items: Input items; may be a lazy iterator, which is consumed on a
+                separate thread as the first stage has room
+            on_result: Optional callback receiving each result, in order, in
+                the calling thread as soon as it is available
+
+        Returns:
+            List of results in input order
+
+        Raises:
+            The first exception raised by a stage, the input iterator or
+            on_result; no new items are started once one has been raised
+        """
+        self._busy = {name: 0.0 for name, _, _ in self.stages}
+        self._items = {name: 0 for name, _, _ in self.stages}
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        started = time.perf_counter()
+
+        threads = [threading.Thread(target=self._feed, name="pipeline-feed", daemon=True,
+                                    args=(items, queues[0], self.stages[0][2], stop))]
+        for i, (name, func, workers) in enumerate(self.stages):
+            next_workers = self.stages[i + 1][2] if i + 1 < len(self.stages) else 1
+            remaining = [workers]
+            for n in range(workers):
+                threads.append(threading.Thread(
+                    target=self._work, name=f"pipeline-{name}-{n}", daemon=True,
+                    args=(name, func, queues[i], queues[i + 1], remaining, next_workers, stop)
+                ))
+        for thread in threads:
+            thread.start()
+
+        results = []
+        first_error = None
+        waiting = {}
+        next_index = 0
+        while True:
+            item = queues[-1].get()
+            if item is _DONE:
+                break
+            index, value, error = item
+            if error is not None:
+                if error is not _CANCELLED:
+                    first_error = first_error or error
+                continue
+            waiting[index] = value
+            # Release results in input order
+            while next_index in waiting:
+                result = waiting.pop(next_index)
+                next_index += 1
+                if first_error is not None:
+                    continue
+                results.append(result)
+                if on_result is not None:
+                    try:
+                        on_result(result)
+                    except Exception as e:
+                        first_error = e
+                        stop.set()
+        for thread in threads:
+            thread.join()
+        self._elapsed = time.perf_counter() - started
+
+        if first_error is not None:
+            raise first_error
+        return results
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Per-stage statistics of the last run
+
+        Returns:
+            Mapping of stage name to its worker count, items processed, busy
+            seconds and utilization (busy time over worker time, 0 to 1)
+        """
+        with self._lock:
+            return {
+                name: {
+                    "workers": workers,
+                    "items": self._items.get(name, 0),
+                    "busy_seconds": self._busy.get(name, 0.0),
+                    "utilization": (self._busy.get(name, 0.0) / (workers * self._elapsed)
+                                    if self._elapsed else 0.0)
+                }
+                for name, _, workers in self.stages
+            }
@@ -0,0 +1,308 @@
+"""
+Rate Limiter
+Token-bucket request scheduling with Retry-After aware retries for the LLM and Zendesk APIs
+"""
+import time
+import random
+import asyncio
+import threading
+import logging
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Callable, Any
+import requests
+
+try:
+    from openai import APIConnectionError  # also covers APITimeoutError
+    _OPENAI_TRANSIENT = (APIConnectionError,)
+except ImportError:
+    _OPENAI_TRANSIENT = ()
+
+logger = logging.getLogger(__name__)
+
+# Status codes that are retried with backoff
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Errors without a response (connection resets, timeouts) that are retried with backoff
+TRANSIENT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout) + _OPENAI_TRANSIENT
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate"""
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize token bucket
+
+        Args:
+            rate_per_minute: Tokens added per minute
+            capacity: Maximum burst size (default: one minute's worth)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        """
+        Take tokens from the bucket, going into debt if necessary
+
+        Args:
+            amount: Number of tokens to take
+
+        Returns:
+            Seconds the caller must wait before using the reservation
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out tokens for a while (e.g. after a Retry-After response)
+
+        Args:
+            seconds: Pause duration in seconds
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """
+    Extract the Retry-After delay from an HTTP error, if any
+
+    Supports 'retry-after-ms', and 'Retry-After' in seconds or HTTP-date form.
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """Get the HTTP status code carried by a requests or OpenAI error"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+class RateLimitScheduler:
+    """Shared scheduler with named token buckets and retry/backoff handling"""
+
+    def __init__(self,
+                 limits: Optional[Dict[str, float]] = None,
+                 max_retries: int = 5,
+                 base_delay: float = 1.0,
+                 max_delay: float = 60.0):
+        """
+        Initialize the scheduler
+
+        Args:
+            limits: Mapping of bucket name to rate per minute
+                (e.g. {"llm_requests": 500, "llm_tokens": 150000, "zendesk": 400,
+                "zendesk_web": 600})
+            max_retries: Maximum retries for a rate-limited or transiently failing call
+            base_delay: Base delay in seconds for exponential backoff
+            max_delay: Upper bound for a single backoff delay
+        """
+        self.buckets = {}
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._stats_lock = threading.Lock()
+        self._stats = {"retries": 0}
+        for name, rate in (limits or {}).items():
+            self.add_bucket(name, rate)
+
+    def add_bucket(self, name: str, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Register a token bucket
+
+        Args:
+            name: Bucket name
+            rate_per_minute: Refill rate per minute (falsy values disable the bucket)
+            capacity: Optional burst size
+        """
+        if rate_per_minute:
+            self.buckets[name] = TokenBucket(rate_per_minute, capacity)
+            self._stats[name] = {"acquired": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+    def _reserve(self, amounts: Dict[str, float]) -> float:
+        wait = 0.0
+        for name, amount in amounts.items():
+            bucket = self.buckets.get(name)
+            if bucket is not None:
+                wait = max(wait, bucket.reserve(amount))
+        with self._stats_lock:
+            for name in amounts:
+                if name in self.buckets:
+                    stats = self._stats[name]
+                    stats["acquired"] += 1
+                    stats["wait_seconds"] += wait
+                    stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait)
+        return wait
+
+    def acquire(self, amounts: Dict[str, float]) -> float:
+        """
+        Block until the requested amounts are available in every bucket
+
+        Args:
+            amounts: Mapping of bucket name to amount (unknown buckets are ignored)
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        wait = self._reserve(amounts)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def aacquire(self, amounts: Dict[str, float]) -> float:
+        """
+        Wait without blocking the event loop until the requested amounts are available
+
+        Args:
+            amounts: Mapping of bucket name to amount
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        wait = self._reserve(amounts)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def backoff_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """
+        Compute the delay before the next retry
+
+        Honours Retry-After when the error carries one, otherwise uses
+        exponential backoff with jitter.
+
+        Args:
+            attempt: Zero-based retry attempt
+            error: The error that triggered the retry
+
+        Returns:
+            Delay in seconds
+        """
+        retry_after = _retry_after_seconds(error) if error is not None else None
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.base_delay / 2)
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return random.uniform(delay / 2, delay)
+
+    def _should_retry(self, error: Exception, attempt: int, amounts: Dict[str, float]) -> Optional[float]:
+        status = _status_code(error)
+        transient = status in RETRY_STATUS_CODES or (status is None and isinstance(error, TRANSIENT_ERRORS))
+        if not transient or attempt >= self.max_retries:
+            return None
+        delay = self.backoff_delay(attempt, error)
+        if _retry_after_seconds(error) is not None:
+            # Everyone sharing these buckets has to back off, not just this caller
+            for name in amounts:
+                if name in self.buckets:
+                    self.buckets[name].pause(delay)
+        with self._stats_lock:
+            self._stats["retries"] += 1
+        reason = "Rate limited" if status in (429, 503) else "Transient error"
+        logger.warning(f"{reason} ({status or type(error).__name__}), retrying in {delay:.1f}s "
+                       f"(attempt {attempt + 1}/{self.max_retries})")
+        return delay
+
+    def call(self, func: Callable[[], Any], amounts: Dict[str, float]) -> Any:
+        """
+        Run a call under the rate limits, retrying on 429/5xx and connection errors
+
+        Args:
+            func: Zero-argument callable performing the request
+            amounts: Mapping of bucket name to amount consumed per attempt
+
+        Returns:
+            The callable's return value
+        """
+        attempt = 0
+        while True:
+            self.acquire(amounts)
+            try:
+                return func()
+            except Exception as e:
+                delay = self._should_retry(e, attempt, amounts)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    async def acall(self, func: Callable[[], Any], amounts: Dict[str, float]) -> Any:
+        """
+        Await a coroutine factory under the rate limits, retrying on 429/5xx and connection errors
+
+        Args:
+            func: Zero-argument callable returning an awaitable
+            amounts: Mapping of bucket name to amount consumed per attempt
+
+        Returns:
+            The awaited result
+        """
+        attempt = 0
+        while True:
+            await self.aacquire(amounts)
+            try:
+                return await func()
+            except Exception as e:
+                delay = self._should_retry(e, attempt, amounts)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    def stats(self) -> Dict:
+        """
+        Get queue-wait and retry statistics
+
+        Returns:
+            Dictionary with per-bucket acquisition counts and wait times, and
+            the total number of retries
+        """
+        with self._stats_lock:
+            return {name: dict(value) if isinstance(value, dict) else value
+                    for name, value in self._stats.items()}
+
+
+def scheduler_from_config(config: Dict) -> RateLimitScheduler:
+    """
+    Build the shared scheduler from the 'rate_limits' configuration section
+
+    Args:
+        config: Full configuration dictionary
+
+    Returns:
+        RateLimitScheduler instance
+    """
+    limits = config.get("rate_limits", {}) or {}
+    return RateLimitScheduler(
+        limits={
+            "llm_requests": limits.get("llm_requests_per_minute", 500),
+            "llm_tokens": limits.get("llm_tokens_per_minute", 150000),
+            "zendesk": limits.get("zendesk_requests_per_minute", 400),
+            "zendesk_web": limits.get("zendesk_web_requests_per_minute", 600)
+        },
+        max_retries=limits.get("max_retries", 5)
+    )
@@ -0,0 +1,144 @@
+"""
+Run Journal
+Append-only JSON-lines checkpoint of per-article results, so an interrupted
+run can resume where it stopped
+"""
+import os
+import json
+import threading
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Result statuses that are retried when a run is resumed
+FAILED_STATUSES = {"error", "translation_error", "failed"}
+
+
+def result_outputs(result: Dict) -> List[str]:
+    """
+    List the output locations referenced by a processing result
+
+    Args:
+        result: Result of ArticleTranslationService.process_article() or
+            process_article_multilang()
+
+    Returns:
+        Saved file paths or output store locations
+    """
+    outputs = [result[key] for key in ("english_file", "japanese_file") if result.get(key)]
+    outputs.extend(translation["file"] for translation in result.get("translations", {}).values()
+                   if translation.get("file"))
+    return outputs
+
+
+class RunJournal:
+    """
+    Journal file with one JSON record per line
+
+    Every record is flushed and synced to disk as soon as it is appended, so
+    a crash loses at most the record being written; a partial last line is
+    ignored when the journal is read back.
+    """
+
+    def __init__(self, path: str = "output/journal.jsonl"):
+        """
+        Initialize the journal
+
+        Args:
+            path: Path to the JSON-lines file
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._file = None
+
+    def append(self, record: Dict):
+        """
+        Append a record and sync it to disk
+
+        Args:
+            record: JSON-serializable record
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def records(self) -> List[Dict]:
+        """
+        Read every record in the journal
+
+        Returns:
+            Records in the order they were appended
+        """
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # A run that was killed mid-write can leave a partial last line
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def completed(self, output_exists: Optional[Callable[[str], bool]] = None) -> Dict[str, Dict]:
+        """
+        Replay the journal into the latest successful result of each article
+
+        Args:
+            output_exists: Optional check that an output location in a result
+                was really written; results with a missing output (e.g. still
+                buffered in an output store when the run was killed) are not
+                treated as completed
+
+        Returns:
+            Mapping of article ID to its result, for articles whose latest
+            result did not fail
+        """
+        results = {}
+        for record in self.records():
+            if "article_id" in record:
+                results[str(record["article_id"])] = record
+        return {article_id: result for article_id, result in results.items()
+                if result.get("status") not in FAILED_STATUSES
+                and (output_exists is None or all(map(output_exists, result_outputs(result))))}
+
+    def replace(self, records: Iterable[Dict]):
+        """
+        Replace the whole journal atomically (e.g. with a compacted snapshot)
+
+        Args:
+            records: Records of the new journal
+        """
+        with self._lock:
+            self._close()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def reset(self):
+        """Start an empty journal"""
+        self.replace([])
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """Close the journal file"""
+        with self._lock:
+            self._close()
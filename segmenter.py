@@ -0,0 +1,219 @@
+"""
+Segmenter
+Splits HTML and markdown article bodies into block-level segments
+"""
+import re
+from typing import List, Dict
+
+# Elements that start a new block when they appear at the top level of a body
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "details", "dialog", "dd", "div",
+    "dl", "dt", "fieldset", "figcaption", "figure", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "iframe", "li", "main",
+    "nav", "ol", "p", "pre", "section", "table", "tbody", "tfoot", "thead", "tr",
+    "ul", "video"
+}
+
+# Elements that never have a closing tag
+VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "source", "track", "wbr"
+}
+
+_TOKEN_RE = re.compile(r"<!--.*?-->|<[^>]+>", re.DOTALL)
+_TAG_NAME_RE = re.compile(r"<\s*(/?)\s*([a-zA-Z][a-zA-Z0-9]*)")
+_FENCE_RE = re.compile(r"^\s*(```|~~~)")
+
+
+def make_segment(text: str, translatable: bool = True) -> Dict:
+    """
+    Create a segment dictionary
+
+    Args:
+        text: Segment text
+        translatable: Whether the segment is sent for translation
+
+    Returns:
+        Segment dictionary with 'text' and 'translatable' keys
+    """
+    return {"text": text, "translatable": translatable}
+
+
+def append_text(segments: List[Dict], text: str):
+    """
+    Append a text segment, splitting off surrounding whitespace as passthrough
+
+    Args:
+        segments: Segment list to append to
+        text: Segment text
+    """
+    if not text:
+        return
+    stripped = text.strip()
+    if not stripped:
+        segments.append(make_segment(text, translatable=False))
+        return
+    start = text.index(stripped)
+    end = start + len(stripped)
+    if start:
+        segments.append(make_segment(text[:start], translatable=False))
+    segments.append(make_segment(stripped))
+    if end < len(text):
+        segments.append(make_segment(text[end:], translatable=False))
+
+
+def _parse_tag(token: str):
+    """
+    Parse a tag token
+
+    Returns:
+        Tuple of (tag name, is_closing, is_self_contained) or None for comments
+    """
+    if token.startswith("<!"):
+        return None
+    match = _TAG_NAME_RE.match(token)
+    if not match:
+        return None
+    name = match.group(2).lower()
+    closing = bool(match.group(1))
+    self_contained = name in VOID_TAGS or token.rstrip(">").rstrip().endswith("/")
+    return name, closing, self_contained
+
+
+def split_html(html: str) -> List[Dict]:
+    """
+    Split an HTML fragment into top-level block segments
+
+    Every top-level block element becomes one segment, and runs of inline
+    content between blocks are grouped into a single segment. Whitespace
+    between blocks is kept as passthrough segments so that joining all
+    segments reproduces the input exactly.
+
+    Args:
+        html: HTML fragment (e.g. an article body from the Zendesk API)
+
+    Returns:
+        List of segment dictionaries with 'text' and 'translatable' keys
+    """
+    segments = []
+    inline_start = 0
+    block_start = None
+    depth = 0
+    position = 0
+
+    for match in _TOKEN_RE.finditer(html):
+        parsed = _parse_tag(match.group(0))
+        position = match.end()
+        if parsed is None:
+            continue
+        name, closing, self_contained = parsed
+
+        if block_start is None:
+            if name in BLOCK_TAGS and not closing:
+                append_text(segments, html[inline_start:match.start()])
+                if self_contained:
+                    segments.append(make_segment(match.group(0), translatable=False))
+                    inline_start = position
+                else:
+                    block_start = match.start()
+                    depth = 1
+            continue
+
+        if self_contained:
+            continue
+        depth += -1 if closing else 1
+        if depth == 0:
+            append_text(segments, html[block_start:position])
+            block_start = None
+            inline_start = position
+
+    if block_start is not None:
+        append_text(segments, html[block_start:])
+    else:
+        append_text(segments, html[inline_start:])
+    return segments
+
+
+def split_markdown(markdown: str) -> List[Dict]:
+    """
+    Split markdown into paragraph-level segments
+
+    Blocks are separated by blank lines. Fenced code blocks are kept whole
+    and marked as not translatable.
+
+    Args:
+        markdown: Markdown text (e.g. a scraped article body)
+
+    Returns:
+        List of segment dictionaries with 'text' and 'translatable' keys
+    """
+    segments = []
+    block = []
+    in_fence = False
+
+    def flush(translatable: bool = True):
+        if block:
+            text = "".join(block)
+            if translatable:
+                append_text(segments, text)
+            else:
+                segments.append(make_segment(text, translatable=False))
+            block.clear()
+
+    for line in markdown.splitlines(keepends=True):
+        if in_fence:
+            block.append(line)
+            if _FENCE_RE.match(line):
+                in_fence = False
+                flush(translatable=False)
+            continue
+
+        if _FENCE_RE.match(line):
+            flush()
+            in_fence = True
+            block.append(line)
+            continue
+
+        if not line.strip():
+            flush()
+            if segments and not segments[-1]["translatable"] and not segments[-1]["text"].strip():
+                segments[-1]["text"] += line
+            else:
+                segments.append(make_segment(line, translatable=False))
+            continue
+
+        block.append(line)
+
+    flush(translatable=not in_fence)
+    return segments
+
+
+def split_segments(text: str, content_format: str = "html") -> List[Dict]:
+    """
+    Split a document into block-level segments
+
+    Args:
+        text: Document text
+        content_format: Either 'html' or 'markdown'
+
+    Returns:
+        List of segment dictionaries with 'text' and 'translatable' keys
+    """
+    if content_format == "markdown":
+        return split_markdown(text)
+    if content_format == "html":
+        return split_html(text)
+    raise ValueError(f"Unsupported content format: {content_format}")
+
+
+def join_segments(segments: List[Dict]) -> str:
+    """
+    Reassemble a document from its segments
+
+    Args:
+        segments: List of segment dictionaries
+
+    Returns:
+        Document text
+    """
+    return "".join(segment["text"] for segment in segments)
@@ -0,0 +1,95 @@
+"""
+Sync Cursor
+Persists incremental-sync state: API cursors per help center and locale, and
+the last-modified time of every processed article
+"""
+import logging
+from typing import Optional
+from json_store import JsonFileStore
+
+logger = logging.getLogger(__name__)
+
+
+class SyncCursorStore(JsonFileStore):
+    """JSON file mapping a sync key (e.g. 'subdomain/en-us') to the last sync time"""
+
+    unreadable_message = "Starting a full sync."
+
+    def __init__(self, path: str = ".cache/sync_cursors.json"):
+        """
+        Initialize the cursor store
+
+        Args:
+            path: Path to the JSON file holding the cursors
+        """
+        super().__init__(path)
+
+    def get(self, key: str) -> Optional[int]:
+        """
+        Get the stored cursor
+
+        Args:
+            key: Sync key
+
+        Returns:
+            Unix timestamp of the last sync, or None if never synced
+        """
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: str, value: int):
+        """
+        Store a cursor, replacing the file atomically
+
+        Args:
+            key: Sync key
+            value: Unix timestamp to resume from next time
+        """
+        with self._lock:
+            self._data[key] = int(value)
+            self._updated()
+
+
+class LastModifiedStore(JsonFileStore):
+    """JSON file mapping article IDs to the last-modified time they were processed at"""
+
+    unreadable_message = "Treating every article as new."
+
+    def __init__(self, path: str = ".cache/discovered_articles.json", flush_every: int = 50):
+        """
+        Initialize the store
+
+        Args:
+            path: Path to the JSON file
+            flush_every: Write the file after this many updates (and on flush())
+        """
+        super().__init__(path, flush_every)
+
+    def is_changed(self, article_id: str, lastmod: Optional[str]) -> bool:
+        """
+        Whether an article is new or changed since it was last processed
+
+        Args:
+            article_id: Article ID
+            lastmod: Current last-modified time, or None when unknown (then
+                only articles never processed count as changed)
+
+        Returns:
+            True if the article should be processed
+        """
+        with self._lock:
+            if article_id not in self._data:
+                return True
+            return lastmod is not None and self._data[article_id] != lastmod
+
+    def mark(self, article_id: str, lastmod: Optional[str]):
+        """
+        Record that an article was processed at the given last-modified time
+
+        Args:
+            article_id: Article ID
+            lastmod: Last-modified time the article was processed at
+        """
+        with self._lock:
+            self._data[article_id] = lastmod
+            self._updated()
@@ -4,8 +4,12 @@ Unit tests for the API server
 """
 import unittest
 import json
+import tempfile
+from pathlib import Path
 from unittest.mock import Mock, patch
-from api_server import app
+import api_server
+from api_server import app, get_translation_service
+from sync_cursor import SyncCursorStore
 
 
 class TestAPIServer(unittest.TestCase):
@@ -49,6 +53,187 @@ class TestAPIServer(unittest.TestCase):
         self.assertIn('batches', data)
         self.assertIsInstance(data['batches'], list)
 
+    
+    @patch('api_server.get_translation_service')
+    def test_translate_article_stream(self, mock_service):
+        """Test that the streaming endpoint emits NDJSON events"""
+        mock_service.return_value.translate_article_stream.return_value = iter([
+            {"field": "title", "delta": "タイ"},
+            {"field": "title", "delta": "トル"},
+            {"field": "body", "delta": "<p>本文</p>"}
+        ])
+        response = self.app.post('/api/articles/1/translate/stream',
+                                 json={"article": {"id": 1, "title": "Title", "body": "<p>Body</p>"}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        
+        events = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        self.assertEqual(events[0], {"field": "title", "delta": "タイ"})
+        self.assertTrue(events[-1]["done"])
+        self.assertEqual(events[-1]["article"]["title"], "タイトル")
+        self.assertEqual(events[-1]["article"]["body"], "<p>本文</p>")
+    
+    @patch('api_server.get_zendesk_client')
+    def test_incremental_batch_sync(self, mock_client):
+        """Test that a batch sync merges only changed articles and stores the cursor"""
+        with tempfile.TemporaryDirectory() as tmp:
+            api_server.sync_cursors = SyncCursorStore(str(Path(tmp) / "cursors.json"))
+            api_server.batch_journal_dir = tmp
+            zendesk = mock_client.return_value
+            zendesk.subdomain = "test"
+            zendesk.iter_article_pages.return_value = iter([
+                [{"id": 1, "title": "One", "updated_at": "2024-01-01T00:00:00Z"}],
+                [{"id": 2, "title": "Two", "updated_at": "2024-01-01T00:00:00Z"}]
+            ])
+            batch = json.loads(self.app.post('/api/batches', json={"locale": "en-us"}).data)["batch"]
+            self.assertIsNotNone(api_server.sync_cursors.get("test/en-us"))
+            
+            zendesk.get_updated_articles.return_value = ([
+                {"id": 2, "title": "Two (edited)", "updated_at": "2024-02-01T00:00:00Z"},
+                {"id": 3, "title": "Three", "updated_at": "2024-02-01T00:00:00Z"}
+            ], 1706745600)
+            response = self.app.post(f'/api/batches/{batch["id"]}/sync')
+            data = json.loads(response.data)
+            
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(data["changed_articles"], 2)
+            self.assertEqual([a["title"] for a in data["batch"]["articles"]],
+                             ["One", "Two (edited)", "Three"])
+            self.assertEqual(data["batch"]["sync_cursor"], 1706745600)
+            
+            # Another batch of the same locale still syncs from its own cursor
+            other = json.loads(self.app.post('/api/batches', json={"locale": "en-us"}).data)["batch"]
+            zendesk.get_updated_articles.return_value = ([], 1706832000)
+            self.app.post(f'/api/batches/{batch["id"]}/sync')
+            zendesk.get_updated_articles.return_value = ([], 1706918400)
+            self.app.post(f'/api/batches/{other["id"]}/sync')
+            self.assertEqual(zendesk.get_updated_articles.call_args_list[-2][0][0], 1706745600)
+            self.assertEqual(zendesk.get_updated_articles.call_args_list[-1][0][0], other["sync_cursor"])
+            # Syncing does not move the seed of new incremental batches
+            self.assertEqual(api_server.sync_cursors.get("test/en-us"), other["sync_cursor"])
+            api_server.sync_cursors = None
+            api_server.batch_journal_dir = None
+    
+    @patch('api_server.get_translation_service')
+    @patch('api_server.get_zendesk_client')
+    def test_batch_resumes_after_restart(self, mock_client, mock_service):
+        """Test that articles translated before a crash are not translated again after a restart"""
+        with tempfile.TemporaryDirectory() as tmp:
+            api_server.sync_cursors = SyncCursorStore(str(Path(tmp) / "cursors.json"))
+            api_server.batch_journal_dir = tmp
+            zendesk = mock_client.return_value
+            zendesk.subdomain = "test"
+            zendesk.iter_article_pages.return_value = iter([
+                [{"id": 1, "title": "One", "body": "1"}, {"id": 2, "title": "Two", "body": "2"}]
+            ])
+            batch = json.loads(self.app.post('/api/batches', json={"locale": "en-us"}).data)["batch"]
+            
+            def crash(articles, on_result=None):
+                on_result(0, {"id": 1, "title": "一", "body": "1"})
+                raise RuntimeError("server killed")
+            
+            mock_service.return_value.target_language = "Japanese"
+            mock_service.return_value.translate_articles.side_effect = crash
+            self.app.post(f'/api/batches/{batch["id"]}/start')
+            
+            # Restart: the in-memory batches are gone and are restored from the journal
+            saved_batches, saved_counter = api_server.batches[:], api_server.batch_counter
+            api_server.batches.clear()
+            api_server.restore_batches()
+            try:
+                restored = api_server.batches[-1]
+                self.assertEqual(restored["id"], batch["id"])
+                self.assertEqual(restored["status"], "pending")
+                self.assertEqual(restored["translated_articles"], 1)
+                
+                mock_service.return_value.translate_articles.side_effect = (
+                    lambda articles, on_result=None: [{"id": 2, "title": "二", "body": "2"}])
+                response = self.app.post(f'/api/batches/{batch["id"]}/start')
+                data = json.loads(response.data)
+                
+                translated = mock_service.return_value.translate_articles.call_args[0][0]
+                self.assertEqual([a["id"] for a in translated], [2])
+                self.assertEqual([a["title"] for a in data["batch"]["articles"]], ["一", "二"])
+                self.assertEqual(data["batch"]["translated_articles"], 2)
+            finally:
+                api_server.batches[:] = saved_batches
+                api_server.batch_counter = saved_counter
+                api_server.sync_cursors = None
+                api_server.batch_journal_dir = None
+    
+    @patch('api_server.get_translation_service')
+    @patch('api_server.translate_articles_multilang')
+    def test_fan_out_progress_is_reported_while_translating(self, mock_multilang, mock_service):
+        """Test that translated_articles grows as articles finish in every language"""
+        batch = {"id": 9002, "status": "pending", "created_at": "2024-02-01T00:00:00",
+                 "articles": [{"id": 1, "title": "One", "body": "1"}, {"id": 2, "title": "Two", "body": "2"}],
+                 "total_articles": 2, "translated_articles": 0}
+        progress = []
+
+        def translate(translators, articles, on_result=None):
+            results = {language: [] for language in translators}
+            for index, article in enumerate(articles):
+                for language in translators:
+                    translated = {"id": article["id"], "title": f"{language}:{article['title']}", "body": "b"}
+                    on_result(language, index, translated)
+                    progress.append(batch["translated_articles"])
+                    results[language].append(translated)
+            return results
+
+        mock_multilang.side_effect = translate
+        api_server.batches.append(batch)
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                api_server.batch_journal_dir = tmp
+                response = self.app.post('/api/batches/9002/start',
+                                         json={"target_languages": ["Japanese", "Korean"]})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(progress, [0, 1, 1, 2])
+            self.assertEqual(batch["translated_articles"], 2)
+        finally:
+            api_server.batches.remove(batch)
+            api_server.batch_journal_dir = None
+
+    @patch('api_server.save_batch')
+    @patch('api_server.get_zendesk_client')
+    def test_publish_uses_the_batch_target_locale(self, mock_client, mock_save):
+        """Test that a single-language batch publishes to its language's locale without overwriting"""
+        zendesk = mock_client.return_value
+        zendesk.publish_translations.return_value = [{"article_id": 1, "locale": "ja", "status": "skipped"}]
+        batch = {"id": 9001, "status": "completed", "target_language": "Japanese",
+                 "articles": [{"id": 1, "title": "一", "body": "1", "translation_status": "completed"}]}
+        api_server.batches.append(batch)
+        try:
+            data = json.loads(self.app.post('/api/batches/9001/publish', json={}).data)
+            translations = zendesk.publish_translations.call_args[0][0]
+            self.assertEqual(translations[0]["locale"], "ja")
+            self.assertFalse(zendesk.publish_translations.call_args[1]["overwrite"])
+            self.assertEqual(data["batch"]["articles"][0]["publish_status"], "skipped")
+            self.assertEqual(data["batch"]["published_articles"], 0)
+            
+            batch["target_language"] = "Klingon"
+            response = self.app.post('/api/batches/9001/publish', json={})
+            self.assertEqual(response.status_code, 400)
+        finally:
+            api_server.batches.remove(batch)
+    
+    def test_translation_service_is_reused(self):
+        """Test that the translation service is shared between requests"""
+        self.assertIs(get_translation_service(), get_translation_service())
+
+    def test_config_is_loaded_once(self):
+        """Test that requests reuse the configuration instead of parsing config.yaml again"""
+        saved_config = api_server.app_config
+        api_server.app_config = None
+        try:
+            with patch('api_server.load_config', return_value={}) as mock_load:
+                self.app.get('/api/config')
+                self.app.get('/api/config')
+                get_translation_service()
+            mock_load.assert_called_once()
+        finally:
+            api_server.app_config = saved_config
+
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the article translation workflow
+"""
+import os
+import time
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from article_service import ArticleTranslationService
+from translation_service import TranslationService
+from run_journal import RunJournal
+from output_store import OutputStore
+
+
+def make_article(article_id, locale, title, body):
+    """Build a scraped article dictionary"""
+    return {
+        "id": article_id,
+        "locale": locale,
+        "title": title,
+        "body": body,
+        "url": f"https://support.example.com/hc/{locale}/articles/{article_id}"
+    }
+
+
+class TestArticleTranslationService(unittest.TestCase):
+    """Test cases for ArticleTranslationService"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.translator = TranslationService(target_language="Japanese")
+        self.service = ArticleTranslationService(
+            base_url="https://support.example.com",
+            translator=self.translator,
+            output_dir=self.tmp.name,
+            manifest_path=os.path.join(self.tmp.name, ".cache", "manifest.json")
+        )
+        
+    def tearDown(self):
+        """Remove temporary output"""
+        self.tmp.cleanup()
+        
+    def test_process_article_multilang(self):
+        """Test that each locale is fetched once and missing locales are translated"""
+        pages = {
+            "en-us": make_article("1", "en-us", "Title", "Body text"),
+            "ja": make_article("1", "ja", "タイトル", "本文"),
+            "ko": None,
+            "de": None
+        }
+        fetch = Mock(side_effect=lambda article_id, locale: pages[locale])
+        translators = {
+            "ja": self.translator,
+            "ko": self.translator.for_language("Korean"),
+            "de": self.translator.for_language("German")
+        }
+        
+        def fake_translate(markdown, title, translator=None, segments=None):
+            return f"# {translator.target_language}: {title}\n\n{markdown}"
+        
+        with patch.object(self.service.scraper, 'get_article', fetch), \
+             patch.object(self.service, '_translate_markdown', side_effect=fake_translate):
+            result = self.service.process_article_multilang("1", translators)
+        
+        self.assertEqual(fetch.call_count, 4)
+        self.assertEqual(result["status"], "completed")
+        self.assertEqual(result["translations"]["ja"]["status"], "existing_translation")
+        self.assertEqual(result["translations"]["ko"]["status"], "translated")
+        self.assertEqual(result["translations"]["de"]["status"], "translated")
+        
+        with open(os.path.join(self.tmp.name, "article_1_de.md"), encoding='utf-8') as f:
+            self.assertTrue(f.read().startswith("# German: Title"))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "article_1_ko.md")))
+        self.assertTrue(os.path.exists(os.path.join(self.tmp.name, "article_1_ja.md")))
+        
+    def test_process_articles_skips_published_translations(self):
+        """Test that bulk detection avoids scraping articles that already have a translation"""
+        zendesk = Mock()
+        zendesk.get_translation_locales.return_value = {"1": {"ja"}, "2": set()}
+        self.service.zendesk_client = zendesk
+        fetch = Mock(side_effect=lambda article_id, locale: make_article(article_id, locale, "Title", "Body"))
+        
+        with patch.object(self.service.scraper, 'get_article', fetch), \
+             patch.object(self.service.scraper, 'get_article_pair') as pair, \
+             patch.object(self.service, '_translate_markdown', return_value="# タイトル\n\n本文"):
+            results = self.service.process_articles(["1", "2"])
+        
+        zendesk.get_translation_locales.assert_called_once_with(["ja"], ["1", "2"])
+        pair.assert_not_called()
+        fetch.assert_called_once_with("2", locale="en-us")
+        self.assertEqual(results[0]["status"], "existing_translation")
+        self.assertEqual(results[1]["status"], "translated")
+        
+    def test_process_articles_concurrently_in_order(self):
+        """Test that the worker pool runs articles at once and keeps the input order"""
+        self.service.max_workers = 4
+        running = []
+        peak = []
+        lock = threading.Lock()
+        
+        def process(article_id, has_translation=None):
+            with lock:
+                running.append(article_id)
+                peak.append(len(running))
+            # Later IDs finish first
+            time.sleep(0.02 * (10 - int(article_id)))
+            with lock:
+                running.remove(article_id)
+            return {"article_id": article_id, "status": "translated"}
+        
+        with patch.object(self.service, 'process_article', side_effect=process):
+            results = self.service.process_articles(iter([str(i) for i in range(8)]))
+        
+        self.assertEqual([r["article_id"] for r in results], [str(i) for i in range(8)])
+        self.assertEqual(max(peak), 4)
+        
+    def test_pipelined_stages_match_sequential_results(self):
+        """Test that the staged pipeline gives the same results and reports stage utilization"""
+        pages = {
+            "1": {"english": make_article("1", "en-us", "One", "Body 1"), "japanese": None},
+            "2": {"english": make_article("2", "en-us", "Two", "Body 2"),
+                  "japanese": make_article("2", "ja", "二", "本文")},
+            "3": {"english": None, "japanese": None}
+        }
+        self.service.stage_workers = {"fetch": 2, "translate": 2, "write": 1}
+        
+        with patch.object(self.service.scraper, 'get_article_pair', side_effect=pages.get), \
+             patch.object(self.service, '_translate_markdown', return_value="# 一\n\n本文"):
+            results = self.service.process_articles(["1", "2", "3"])
+        
+        self.assertEqual([r["status"] for r in results], ["translated", "existing_translation", "error"])
+        self.assertTrue(os.path.exists(results[0]["japanese_file"]))
+        self.assertEqual(set(self.service.stage_stats), {"fetch", "translate", "write"})
+        self.assertEqual(self.service.stage_stats["fetch"]["items"], 3)
+        self.assertEqual(self.service.stage_stats["translate"]["workers"], 2)
+
+    def test_unset_stage_counts_follow_max_workers(self):
+        """Test that an empty stages section sizes the stages from max_workers"""
+        pages = {"1": {"english": make_article("1", "en-us", "One", "Body 1"), "japanese": None}}
+        self.service.stage_workers = {"translate": None}
+        self.service.max_workers = 3
+
+        with patch.object(self.service.scraper, 'get_article_pair', side_effect=pages.get), \
+             patch.object(self.service, '_translate_markdown', return_value="# 一\n\n本文"):
+            self.service.process_articles(["1"])
+
+        self.assertEqual({name: stats["workers"] for name, stats in self.service.stage_stats.items()},
+                         {"fetch": 3, "translate": 3, "write": 1})
+
+    def test_unchanged_articles_are_up_to_date(self):
+        """Test that the manifest skips re-translating an unchanged source"""
+        article = make_article("1", "en-us", "Title", "Body text")
+        pair = {"english": article, "japanese": None}
+        translate = Mock(return_value="# タイトル\n\n本文")
+        
+        with patch.object(self.service.scraper, 'get_article_pair', return_value=pair), \
+             patch.object(self.service, '_translate_markdown', translate):
+            first = self.service.process_articles(["1"])
+            # A fresh service reads the manifest written by the first run
+            self.service = ArticleTranslationService(
+                base_url="https://support.example.com",
+                translator=self.translator,
+                output_dir=self.tmp.name,
+                manifest_path=os.path.join(self.tmp.name, ".cache", "manifest.json")
+            )
+            with patch.object(self.service.scraper, 'get_article_pair', return_value=pair), \
+                 patch.object(self.service, '_translate_markdown', translate):
+                second = self.service.process_articles(["1"])
+                article["body"] = "Edited body"
+                third = self.service.process_articles(["1"])
+        
+        self.assertEqual(first[0]["status"], "translated")
+        self.assertEqual(second[0]["status"], "up_to_date")
+        self.assertEqual(second[0]["japanese_file"], first[0]["japanese_file"])
+        self.assertEqual(third[0]["status"], "translated")
+        self.assertEqual(translate.call_count, 2)
+        # The manifest is kept out of the output directory listed by the UI
+        self.assertTrue(os.path.exists(self.service.manifest.path))
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, "manifest.json")))
+        
+        # A new glossary version invalidates the entry as well
+        self.translator.glossary_version = "other"
+        self.assertFalse(self.service.manifest.is_up_to_date(
+            "1", "ja", **self.service._translation_inputs(article)))
+        
+    def test_output_store_backend(self):
+        """Test that the SQLite output store replaces per-article files and exports markdown"""
+        store = OutputStore(os.path.join(self.tmp.name, "articles.db"), batch_size=2)
+        self.service.output_store = store
+        pairs = {str(i): {"english": make_article(str(i), "en-us", f"Title {i}", f"Body {i}"), "japanese": None}
+                 for i in range(3)}
+        translate = Mock(side_effect=lambda markdown, title: f"# 訳 {title}\n\n{markdown}")
+        
+        with patch.object(self.service.scraper, 'get_article_pair', side_effect=pairs.get), \
+             patch.object(self.service, '_translate_markdown', translate):
+            first = self.service.process_articles(["0", "1", "2"])
+            second = self.service.process_articles(["0", "1", "2"])
+        
+        self.assertEqual([r["status"] for r in first], ["translated"] * 3)
+        self.assertEqual([r["status"] for r in second], ["up_to_date"] * 3)
+        self.assertEqual(translate.call_count, 3)
+        self.assertFalse(any(name.endswith(".md") for name in os.listdir(self.tmp.name)))
+        self.assertEqual(store.stats()["documents"], 6)
+        self.assertEqual(store.get("1", "ja"), "# 訳 Title 1\n\nBody 1")
+        
+        exported = os.path.join(self.tmp.name, "markdown")
+        self.assertEqual(store.export_markdown(exported), 6)
+        with open(os.path.join(exported, "article_2_en.md"), encoding='utf-8') as f:
+            self.assertEqual(f.read(), "# Title 2\n\nBody 2")
+        store.close()
+        
+    def test_resume_after_crash_with_output_store(self):
+        """Test that journaled articles whose output was never committed are processed again"""
+        db_path = os.path.join(self.tmp.name, "articles.db")
+        journal = RunJournal(os.path.join(self.tmp.name, "journal.jsonl"))
+        store = OutputStore(db_path, batch_size=5)
+        self.service.output_store = store
+        pairs = {str(i): {"english": make_article(str(i), "en-us", f"Title {i}", f"Body {i}"), "japanese": None}
+                 for i in range(4)}
+        
+        # The process dies before the last batch is committed (no flush, no close)
+        with patch.object(self.service.scraper, 'get_article_pair', side_effect=pairs.get), \
+             patch.object(self.service, '_translate_markdown', return_value="# 訳\n\n本文"), \
+             patch.object(store, 'flush'):
+            self.service.process_articles(["0", "1", "2", "3"], on_result=journal.append)
+        journal.close()
+        self.assertEqual(len(RunJournal(str(journal.path)).completed()), 4)
+        
+        # Restart: only the first 5 documents (articles 0, 1 and half of 2) were committed
+        restarted = ArticleTranslationService(
+            base_url="https://support.example.com",
+            translator=self.translator,
+            output_dir=self.tmp.name,
+            manifest_path=os.path.join(self.tmp.name, ".cache", "manifest.json"),
+            output_store=OutputStore(db_path)
+        )
+        completed = RunJournal(str(journal.path)).completed(restarted.output_exists)
+        self.assertEqual(sorted(completed), ["0", "1"])
+        restarted.output_store.close()
+        
+    def test_journal_replays_completed_articles(self):
+        """Test that results journaled as articles complete can be replayed after a crash"""
+        journal = RunJournal(os.path.join(self.tmp.name, "journal.jsonl"))
+        with patch.object(self.service, 'process_article', side_effect=lambda article_id, has_translation=None: {
+                "article_id": article_id, "status": "error" if article_id == "2" else "translated"}):
+            self.service.process_articles(["1", "2", "3"], on_result=journal.append)
+        journal.close()
+        # A run killed mid-write leaves a partial last line
+        with open(journal.path, 'a', encoding='utf-8') as f:
+            f.write('{"article_id": "4", "sta')
+        
+        completed = RunJournal(str(journal.path)).completed()
+        self.assertEqual(sorted(completed), ["1", "3"])
+        self.assertEqual(completed["3"]["status"], "translated")
+        
+    def test_for_language_shares_resources(self):
+        """Test that per-language services share cache and scheduler"""
+        cache = Mock()
+        scheduler = Mock()
+        translator = TranslationService(target_language="Japanese", cache=cache, scheduler=scheduler)
+        korean = translator.for_language("Korean", glossary=[])
+        
+        self.assertEqual(korean.target_language, "Korean")
+        self.assertIs(korean.cache, cache)
+        self.assertIs(korean.scheduler, scheduler)
+        self.assertEqual(korean.glossary, [])
+
+    def test_for_language_does_not_inherit_glossary(self):
+        """Test that a per-language service only gets a glossary passed to it"""
+        glossary = [{"source": "Guide", "target": "ガイド"}]
+        translator = TranslationService(target_language="Japanese", glossary=glossary)
+        
+        self.assertEqual(translator.for_language("Korean").glossary, [])
+        self.assertNotIn("ガイド", translator.for_language("Korean")._full_prompt)
+        shared = translator.for_language("Japanese", translator.compiled_glossary)
+        self.assertEqual(shared.glossary, glossary)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Unit tests for token-aware chunking
+"""
+import re
+import unittest
+from chunker import chunk_document, estimate_tokens
+from segmenter import join_segments
+
+
+def tags_balanced(html):
+    """Check that every opened non-void tag is closed in order"""
+    stack = []
+    for closing, name in re.findall(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)[^>]*>", html):
+        if name.lower() in ("br", "hr", "img"):
+            continue
+        if closing:
+            if not stack or stack.pop() != name:
+                return False
+        else:
+            stack.append(name)
+    return not stack
+
+
+class TestChunker(unittest.TestCase):
+    """Test cases for chunk_document"""
+    
+    def test_small_document_is_one_chunk(self):
+        """Test that a document under budget stays in one chunk"""
+        html = "<p>One</p>\n<p>Two</p>"
+        chunks = [p for p in chunk_document(html, "html", 1000) if p["translatable"]]
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0]["text"], html)
+        
+    def test_chunks_respect_budget_and_order(self):
+        """Test that chunks fit the budget and reassemble in order"""
+        html = "\n".join(f"<p>Paragraph number {i} with some text.</p>" for i in range(50))
+        parts = chunk_document(html, "html", 60)
+        chunks = [p["text"] for p in parts if p["translatable"]]
+        
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 60)
+            self.assertTrue(tags_balanced(chunk))
+        self.assertEqual(join_segments(parts), html)
+        
+    def test_oversized_wrapper_is_opened_up(self):
+        """Test that a large wrapper element is split into balanced chunks"""
+        items = "".join(f"<li>Item {i} with a description</li>" for i in range(40))
+        html = f'<div class="wrapper"><ul>{items}</ul></div>'
+        parts = chunk_document(html, "html", 50)
+        chunks = [p["text"] for p in parts if p["translatable"]]
+        
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertTrue(tags_balanced(chunk))
+            self.assertNotIn("wrapper", chunk)
+        self.assertEqual(join_segments(parts), html)
+        
+    def test_markdown_long_block_split_by_lines(self):
+        """Test that a long markdown list is split at line boundaries"""
+        markdown = "Intro\n\n" + "".join(f"- list item number {i}\n" for i in range(60))
+        parts = chunk_document(markdown, "markdown", 40)
+        chunks = [p["text"] for p in parts if p["translatable"]]
+        
+        self.assertGreater(len(chunks), 2)
+        for chunk in chunks:
+            self.assertLessEqual(estimate_tokens(chunk), 40)
+        self.assertEqual(join_segments(parts), markdown)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Unit tests for glossary matching
+"""
+import os
+import tempfile
+import unittest
+from glossary import GlossaryMatcher, CompiledGlossary, GlossaryStore
+
+
+class TestGlossaryMatcher(unittest.TestCase):
+    """Test cases for GlossaryMatcher"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.terms = [
+            {"source": "Knowledge Base", "target": "ナレッジベース"},
+            {"source": "Support", "target": "サポート"},
+            {"source": "FAQ", "target": "よくある質問"},
+            {"source": "Base", "target": "ベース"}
+        ]
+        self.matcher = GlossaryMatcher(t["source"] for t in self.terms)
+        
+    def test_finds_present_terms(self):
+        """Test that only terms occurring in the text are reported"""
+        found = self.matcher.find("Contact support from the FAQ page.")
+        self.assertEqual(found, {1, 2})
+        
+    def test_overlapping_terms(self):
+        """Test that terms contained in other terms are both reported"""
+        found = self.matcher.find("Search the knowledge base")
+        self.assertEqual(found, {0, 3})
+        
+    def test_no_match(self):
+        """Test text without any glossary terms"""
+        self.assertEqual(self.matcher.find("Nothing relevant here"), set())
+        
+    def test_filter_terms_keeps_glossary_order(self):
+        """Test that filtered entries keep their glossary order"""
+        filtered = self.matcher.filter_terms(self.terms, "FAQ about the Knowledge Base")
+        self.assertEqual([t["source"] for t in filtered], ["Knowledge Base", "FAQ", "Base"])
+
+
+
+class TestCompiledGlossary(unittest.TestCase):
+    """Test cases for CompiledGlossary"""
+    
+    def test_version_tracks_contents(self):
+        """Test that the version changes only when the terms change"""
+        terms = [{"source": "Support", "target": "サポート"}]
+        self.assertEqual(CompiledGlossary(terms).version, CompiledGlossary(list(terms)).version)
+        changed = terms + [{"source": "FAQ", "target": "よくある質問"}]
+        self.assertNotEqual(CompiledGlossary(terms).version, CompiledGlossary(changed).version)
+        
+    def test_immutable(self):
+        """Test that compiled glossaries cannot be modified"""
+        glossary = CompiledGlossary([{"source": "Support", "target": "サポート"}])
+        with self.assertRaises(AttributeError):
+            glossary.version = "other"
+        glossary.terms.append({"source": "FAQ", "target": "よくある質問"})
+        self.assertEqual(len(glossary), 1)
+        
+    def test_prompt_section(self):
+        """Test full and filtered prompt sections"""
+        glossary = CompiledGlossary([
+            {"source": "Support", "target": "サポート"},
+            {"source": "FAQ", "target": "よくある質問"}
+        ])
+        self.assertIn("よくある質問", glossary.prompt_section())
+        self.assertNotIn("よくある質問", glossary.prompt_section("Contact support"))
+        self.assertEqual(glossary.prompt_section("Nothing"), "")
+
+
+class TestGlossaryStore(unittest.TestCase):
+    """Test cases for GlossaryStore"""
+    
+    def test_reloads_only_when_file_changes(self):
+        """Test that the glossary is recompiled only after the file changes"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "glossary.yaml")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('terms:\n  - source: "Support"\n    target: "サポート"\n')
+            store = GlossaryStore(path)
+            
+            first = store.get()
+            self.assertIs(store.get(), first)
+            
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('  - source: "FAQ"\n    target: "よくある質問"\n')
+            second = store.get()
+            self.assertIsNot(second, first)
+            self.assertEqual(len(second), 2)
+            
+    def test_missing_file(self):
+        """Test that a missing file yields an empty glossary"""
+        store = GlossaryStore("does-not-exist.yaml")
+        self.assertEqual(len(store.get()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the pooled HTTP session
+"""
+import gzip
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from http_session import create_session, session_from_config, DEFAULT_TIMEOUT
+
+PAGE = b"<html><body><article>" + b"<p>Hello world</p>" * 200 + b"</article></body></html>"
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """Serves a gzip-encoded page over keep-alive connections and records client ports"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.server.client_ports.add(self.client_address[1])
+        self.server.accept_encodings.append(self.headers.get("Accept-Encoding", ""))
+        body = gzip.compress(PAGE)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpSession(unittest.TestCase):
+    """Test cases for the pooled session"""
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+        self.server.client_ports = set()
+        self.server.accept_encodings = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hc/en-us/articles/1"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connections_are_reused(self):
+        """Test that sequential requests share one keep-alive connection"""
+        session = create_session(pool_size=2)
+        for _ in range(5):
+            response = session.get(self.url, timeout=DEFAULT_TIMEOUT)
+            self.assertEqual(response.content, PAGE)
+        self.assertEqual(len(self.server.client_ports), 1)
+        self.assertTrue(all("gzip" in value for value in self.server.accept_encodings))
+
+    def test_session_from_config(self):
+        """Test pool sizing and timeouts from configuration"""
+        session, timeout = session_from_config(
+            {"http": {"pool_size": 4, "connect_timeout": 2, "read_timeout": 10}}, workers=8
+        )
+        self.assertEqual(timeout, (2, 10))
+        self.assertEqual(session.get_adapter("https://example.com")._pool_maxsize, 8)
+
+        _, timeout = session_from_config({})
+        self.assertEqual(timeout, DEFAULT_TIMEOUT)
+
+
+if __name__ == '__main__':
+    unittest.main()
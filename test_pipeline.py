@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the staged pipeline
+"""
+import time
+import threading
+import unittest
+from pipeline import StagedPipeline
+
+
+class TestStagedPipeline(unittest.TestCase):
+    """Test cases for StagedPipeline"""
+    
+    def test_results_in_input_order(self):
+        """Test that results come back in input order although later items finish first"""
+        def slow_first(item):
+            time.sleep(0.01 * (5 - item))
+            return item * 10
+        
+        pipeline = StagedPipeline([("double", slow_first, 4), ("add", lambda item: item + 1, 2)])
+        seen = []
+        results = pipeline.run(iter(range(5)), on_result=seen.append)
+        
+        self.assertEqual(results, [1, 11, 21, 31, 41])
+        self.assertEqual(seen, results)
+        self.assertEqual(pipeline.stats()["double"]["items"], 5)
+        self.assertEqual(pipeline.stats()["add"]["workers"], 2)
+        
+    def test_stages_overlap_with_back_pressure(self):
+        """Test that the first stage keeps going while a slow stage works, up to the queue bound"""
+        fetched = []
+        lock = threading.Lock()
+        
+        def fetch(item):
+            with lock:
+                fetched.append(item)
+            return item
+        
+        release = threading.Event()
+        
+        def translate(item):
+            release.wait(1)
+            return item
+        
+        pipeline = StagedPipeline([("fetch", fetch, 1), ("translate", translate, 1)], queue_size=2)
+        runner = threading.Thread(target=pipeline.run, args=(range(20),))
+        runner.start()
+        time.sleep(0.1)
+        with lock:
+            ahead = len(fetched)
+        release.set()
+        runner.join()
+        
+        # One item being translated, two queued and one blocked in the fetch worker
+        self.assertGreater(ahead, 1)
+        self.assertLessEqual(ahead, 4)
+        self.assertEqual(len(fetched), 20)
+        
+    def test_stage_error_is_raised(self):
+        """Test that a failing stage stops the run and its exception is raised"""
+        def check(item):
+            if item == 3:
+                raise ValueError("bad item")
+            return item
+        
+        pipeline = StagedPipeline([("check", check, 2), ("pass", lambda item: item, 1)])
+        with self.assertRaises(ValueError):
+            pipeline.run(range(100))
+        self.assertLess(pipeline.stats()["check"]["items"], 100)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
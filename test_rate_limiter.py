@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the rate-limit scheduler
+"""
+import asyncio
+import unittest
+from unittest.mock import Mock, patch
+import requests
+from rate_limiter import TokenBucket, RateLimitScheduler
+
+
+def rate_limited_error(retry_after=None):
+    """Build a requests HTTPError for a 429 response"""
+    response = requests.Response()
+    response.status_code = 429
+    if retry_after is not None:
+        response.headers["Retry-After"] = retry_after
+    return requests.exceptions.HTTPError("429 Too Many Requests", response=response)
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for TokenBucket"""
+    
+    def test_burst_then_wait(self):
+        """Test that reservations beyond capacity must wait for refill"""
+        bucket = TokenBucket(rate_per_minute=60, capacity=2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 1.0, places=1)
+        self.assertAlmostEqual(bucket.reserve(), 2.0, places=1)
+        
+    def test_pause(self):
+        """Test that a paused bucket makes callers wait"""
+        bucket = TokenBucket(rate_per_minute=600)
+        bucket.pause(5)
+        self.assertGreater(bucket.reserve(), 4.9)
+
+
+class TestRateLimitScheduler(unittest.TestCase):
+    """Test cases for RateLimitScheduler"""
+    
+    @patch('rate_limiter.time.sleep')
+    def test_retries_with_retry_after(self, mock_sleep):
+        """Test that 429 responses are retried after the Retry-After delay"""
+        scheduler = RateLimitScheduler({"zendesk": 6000}, base_delay=0.1)
+        func = Mock(side_effect=[rate_limited_error("3"), "ok"])
+        
+        self.assertEqual(scheduler.call(func, {"zendesk": 1}), "ok")
+        self.assertEqual(func.call_count, 2)
+        delays = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertTrue(any(3.0 <= d <= 3.1 for d in delays))
+        self.assertEqual(scheduler.stats()["retries"], 1)
+        self.assertEqual(scheduler.stats()["zendesk"]["acquired"], 2)
+        
+    @patch('rate_limiter.time.sleep')
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        """Test that the error is raised once retries are exhausted"""
+        scheduler = RateLimitScheduler({"zendesk": 6000}, max_retries=2)
+        func = Mock(side_effect=rate_limited_error())
+        
+        with self.assertRaises(requests.exceptions.HTTPError):
+            scheduler.call(func, {"zendesk": 1})
+        self.assertEqual(func.call_count, 3)
+        
+    @patch('rate_limiter.time.sleep')
+    def test_transient_errors_are_retried(self, mock_sleep):
+        """Test that server errors, connection resets and timeouts are retried"""
+        import openai
+        server_error = requests.exceptions.HTTPError(response=Mock(status_code=500, headers={}))
+        request = Mock()
+        scheduler = RateLimitScheduler({"llm_requests": 6000})
+        func = Mock(side_effect=[server_error, requests.exceptions.ConnectionError("reset"),
+                                 openai.APITimeoutError(request=request),
+                                 openai.APIConnectionError(request=request), "ok"])
+        
+        self.assertEqual(scheduler.call(func, {"llm_requests": 1}), "ok")
+        self.assertEqual(scheduler.stats()["retries"], 4)
+        
+        bad_request = requests.exceptions.HTTPError(response=Mock(status_code=400, headers={}))
+        with self.assertRaises(requests.exceptions.HTTPError):
+            scheduler.call(Mock(side_effect=bad_request), {"llm_requests": 1})
+        
+    def test_other_errors_not_retried(self):
+        """Test that non rate-limit errors are raised immediately"""
+        scheduler = RateLimitScheduler({"zendesk": 6000})
+        func = Mock(side_effect=ValueError("boom"))
+        
+        with self.assertRaises(ValueError):
+            scheduler.call(func, {"zendesk": 1})
+        func.assert_called_once()
+        
+    def test_backoff_is_jittered_exponential(self):
+        """Test exponential backoff bounds without Retry-After"""
+        scheduler = RateLimitScheduler(base_delay=1.0, max_delay=8.0)
+        for attempt, upper in [(0, 1.0), (1, 2.0), (2, 4.0), (5, 8.0)]:
+            delay = scheduler.backoff_delay(attempt)
+            self.assertGreaterEqual(delay, upper / 2)
+            self.assertLessEqual(delay, upper)
+            
+    def test_async_call(self):
+        """Test the async variant retries rate-limited calls"""
+        scheduler = RateLimitScheduler({"llm_requests": 6000}, base_delay=0.01)
+        attempts = []
+        
+        async def func():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise rate_limited_error("0")
+            return "done"
+        
+        result = asyncio.run(scheduler.acall(func, {"llm_requests": 1}))
+        self.assertEqual(result, "done")
+        self.assertEqual(len(attempts), 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -2,9 +2,23 @@
 """
 Unit tests for the Zendesk scraper
 """
+import os
+import tempfile
 import unittest
 from unittest.mock import Mock, patch, MagicMock
+import zendesk_scraper
 from zendesk_scraper import ZendeskScraper
+from http_cache import HttpCache
+from sync_cursor import LastModifiedStore
+from page_archive import PageArchive
+
+
+def page_response(text, status_code=200):
+    """Build a mocked response for a discovery page"""
+    response = Mock()
+    response.status_code = status_code
+    response.text = text
+    return response
 
 
 class TestZendeskScraper(unittest.TestCase):
@@ -29,7 +43,7 @@ class TestZendeskScraper(unittest.TestCase):
         url = self.scraper._get_article_url("27240321140763", locale="ja")
         self.assertEqual(url, "https://support.pendo.io/hc/ja/articles/27240321140763")
         
-    @patch('zendesk_scraper.requests.get')
+    @patch('zendesk_scraper.requests.Session.get')
     def test_scrape_article_success(self, mock_get):
         """Test successful article scraping"""
         # Mock HTML response
@@ -59,7 +73,70 @@ class TestZendeskScraper(unittest.TestCase):
         self.assertIn("Test Article Title", article['title'])
         self.assertIn("article content", article['body'])
         
-    @patch('zendesk_scraper.requests.get')
+    def test_parse_article_ignores_page_chrome(self):
+        """Test that the restricted parse extracts the same article from a full page"""
+        page = b"""
+        <html><head><script>var nav = "Do not translate";</script></head>
+        <body>
+            <nav><h2>Menu</h2><div class="nav-body">Navigation text</div></nav>
+            <main><article class="article">
+                <h1 class="article-title">Configuring Guides</h1>
+                <div class="article-body"><p>Open <strong>Guides</strong> first.</p></div>
+            </article></main>
+            <footer><div class="footer-inner">Footer text</div></footer>
+        </body></html>
+        """
+        for parser in ("html.parser", zendesk_scraper.HTML_PARSER):
+            with patch('zendesk_scraper.HTML_PARSER', parser):
+                article = self.scraper._parse_article(page)
+            self.assertEqual(article["title"], "Configuring Guides")
+            self.assertEqual(article["body"], "Open **Guides** first.")
+        
+    @patch('zendesk_scraper.BeautifulSoup')
+    @patch('zendesk_scraper.requests.Session.get')
+    def test_not_modified_page_is_not_parsed(self, mock_get, mock_soup):
+        """Test that a 304 response returns the cached article without parsing"""
+        from bs4 import BeautifulSoup
+        mock_soup.side_effect = BeautifulSoup
+        
+        page = Mock()
+        page.status_code = 200
+        page.content = b'<h1>Cached Title</h1><div class="article-body"><p>Body</p></div>'
+        page.headers = {"ETag": '"v1"'}
+        page.raise_for_status = Mock()
+        not_modified = Mock()
+        not_modified.status_code = 304
+        mock_get.side_effect = [page, not_modified]
+        
+        scraper = ZendeskScraper(base_url="https://support.pendo.io", http_cache=HttpCache(":memory:"))
+        first = scraper.get_article("12345")
+        second = scraper.get_article("12345")
+        
+        self.assertEqual(second, first)
+        self.assertEqual(mock_soup.call_count, 1)
+        self.assertEqual(mock_get.call_args_list[1][1]["headers"], {"If-None-Match": '"v1"'})
+        self.assertEqual(scraper.http_cache.stats()["not_modified"], 1)
+
+    @patch('zendesk_scraper.requests.Session.get')
+    def test_parser_change_invalidates_cached_pages(self, mock_get):
+        """Test that results cached by another parser version are fetched and parsed again"""
+        page = Mock()
+        page.status_code = 200
+        page.content = b'<h1>Title</h1><div class="article-body"><p>New <em>body</em></p></div>'
+        page.headers = {"ETag": '"v1"'}
+        page.raise_for_status = Mock()
+        mock_get.return_value = page
+        url = "https://support.pendo.io/hc/en-us/articles/12345"
+
+        http_cache = HttpCache(":memory:")
+        http_cache.set(url, page, {"title": "Title", "body": "Old parse"}, version="0/old")
+        scraper = ZendeskScraper(base_url="https://support.pendo.io", http_cache=http_cache)
+
+        self.assertEqual(scraper.get_article("12345")["body"], "New _body_")
+        self.assertFalse(mock_get.call_args[1]["headers"])
+        self.assertEqual(http_cache.conditional_headers(url, scraper.parser_version), {"If-None-Match": '"v1"'})
+
+    @patch('zendesk_scraper.requests.Session.get')
     def test_scrape_article_not_found(self, mock_get):
         """Test handling of 404 not found"""
         mock_response = Mock()
@@ -70,7 +147,7 @@ class TestZendeskScraper(unittest.TestCase):
         
         self.assertIsNone(article)
         
-    @patch('zendesk_scraper.requests.get')
+    @patch('zendesk_scraper.requests.Session.get')
     def test_get_article_pair(self, mock_get):
         """Test fetching article pair (English and Japanese)"""
         # Mock English article
@@ -93,7 +170,7 @@ class TestZendeskScraper(unittest.TestCase):
         </html>
         """
         
-        def mock_get_response(url, timeout=30):
+        def mock_get_response(url, timeout=30, headers=None):
             mock_response = Mock()
             mock_response.status_code = 200
             mock_response.raise_for_status = Mock()
@@ -115,7 +192,7 @@ class TestZendeskScraper(unittest.TestCase):
         self.assertEqual(result['english']['id'], "12345")
         self.assertEqual(result['japanese']['id'], "12345")
         
-    @patch('zendesk_scraper.requests.get')
+    @patch('zendesk_scraper.requests.Session.get')
     def test_get_article_pair_no_japanese(self, mock_get):
         """Test fetching article pair when Japanese version doesn't exist"""
         english_html = """
@@ -127,7 +204,7 @@ class TestZendeskScraper(unittest.TestCase):
         </html>
         """
         
-        def mock_get_response(url, timeout=30):
+        def mock_get_response(url, timeout=30, headers=None):
             mock_response = Mock()
             
             if '/en-us/' in url:
@@ -147,6 +224,144 @@ class TestZendeskScraper(unittest.TestCase):
         self.assertIsNotNone(result['english'])
         self.assertIsNone(result['japanese'])
 
+    
+    @patch('zendesk_scraper.requests.Session.get')
+    def test_discover_articles_from_sitemap_index(self, mock_get):
+        """Test that articles and lastmods are read from the child sitemaps"""
+        pages = {
+            "https://support.pendo.io/hc/sitemap.xml": """<?xml version="1.0"?>
+                <sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+                  <sitemap><loc>https://support.pendo.io/hc/sitemap-1.xml</loc></sitemap>
+                  <sitemap><loc>https://support.pendo.io/hc/sitemap-2.xml</loc></sitemap>
+                </sitemapindex>""",
+            "https://support.pendo.io/hc/sitemap-1.xml": """<?xml version="1.0"?>
+                <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+                  <url><loc>https://support.pendo.io/hc/en-us/articles/1-First</loc>
+                       <lastmod>2024-01-01T00:00:00Z</lastmod></url>
+                  <url><loc>https://support.pendo.io/hc/ja/articles/1-First</loc></url>
+                  <url><loc>https://support.pendo.io/hc/en-us/sections/5-Section</loc></url>
+                </urlset>""",
+            "https://support.pendo.io/hc/sitemap-2.xml": """<?xml version="1.0"?>
+                <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+                  <url><loc>https://support.pendo.io/hc/en-us/articles/2-Second</loc>
+                       <lastmod>2024-02-01T00:00:00Z</lastmod></url>
+                  <url><loc>https://support.pendo.io/hc/en-us/articles/1-First</loc></url>
+                </urlset>"""
+        }
+        mock_get.side_effect = lambda url, timeout=30, headers=None: page_response(pages[url])
+        
+        discovered = list(self.scraper.discover_articles())
+        
+        self.assertEqual(discovered, [("1", "2024-01-01T00:00:00Z"), ("2", "2024-02-01T00:00:00Z")])
+    
+    @patch('zendesk_scraper.requests.Session.get')
+    def test_discover_articles_from_sections(self, mock_get):
+        """Test the category/section walk when there is no sitemap"""
+        base = "https://support.pendo.io/hc/en-us"
+        pages = {
+            base: '<a href="/hc/en-us/categories/10-Cat">Cat</a>',
+            f"{base}/categories/10": '<a href="/hc/en-us/sections/20-A">A</a><a href="/hc/en-us/sections/21-B">B</a>',
+            f"{base}/sections/20": '<a href="/hc/en-us/articles/1-One">1</a><a href="?page=2">Next</a>',
+            f"{base}/sections/20?page=2": '<a href="/hc/en-us/articles/2-Two">2</a>',
+            f"{base}/sections/21": '<a href="/hc/en-us/articles/3-Three">3</a><a href="/hc/en-us/articles/1-One">1</a>'
+        }
+        mock_get.side_effect = lambda url, timeout=30, headers=None: (
+            page_response(pages[url]) if url in pages else page_response("", 404)
+        )
+        
+        discovered = list(self.scraper.discover_articles())
+        
+        self.assertEqual(discovered, [("1", None), ("2", None), ("3", None)])
+    
+    @patch('zendesk_scraper.requests.Session.get')
+    def test_offline_mode_reads_the_archive(self, mock_get):
+        """Test that archived pages are re-parsed offline without any request"""
+        page = Mock()
+        page.status_code = 200
+        page.content = b'<h1 class="article-title">Archived</h1><div class="article-body"><p>Body</p></div>'
+        missing = Mock()
+        missing.status_code = 404
+        missing.content = b''
+        mock_get.side_effect = lambda url, timeout=30, headers=None: page if '/en-us/' in url else missing
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = PageArchive(tmp, crawl_id="crawl-1")
+            online = ZendeskScraper(base_url="https://support.pendo.io", archive=archive)
+            expected = online.get_article_pair("12345")
+            archive.close()
+            mock_get.reset_mock()
+            
+            offline = ZendeskScraper(base_url="https://support.pendo.io",
+                                     archive=PageArchive(tmp), offline=True)
+            pair = offline.get_article_pair("12345")
+            
+            self.assertEqual(pair, expected)
+            self.assertEqual(pair["english"]["title"], "Archived")
+            self.assertIsNone(pair["japanese"])
+            self.assertIsNone(offline.get_article("99999"))
+            mock_get.assert_not_called()
+
+    @patch('zendesk_scraper.requests.Session.get')
+    def test_cached_page_is_archived_in_full(self, mock_get):
+        """Test that pages known to the HTTP cache are fetched without validators until archived"""
+        page = Mock()
+        page.status_code = 200
+        page.content = b'<h1 class="article-title">Cached</h1><div class="article-body"><p>Body</p></div>'
+        page.headers = {"ETag": '"v1"'}
+        page.raise_for_status = Mock()
+        not_modified = Mock()
+        not_modified.status_code = 304
+        mock_get.side_effect = lambda url, timeout=30, headers=None: not_modified if headers else page
+
+        http_cache = HttpCache(":memory:")
+        ZendeskScraper(base_url="https://support.pendo.io", http_cache=http_cache).get_article("12345")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = PageArchive(tmp)
+            scraper = ZendeskScraper(base_url="https://support.pendo.io",
+                                     http_cache=http_cache, archive=archive)
+            url = "https://support.pendo.io/hc/en-us/articles/12345"
+
+            self.assertEqual(scraper.get_article("12345")["title"], "Cached")
+            self.assertIsNone(mock_get.call_args[1]["headers"])
+            self.assertEqual(archive.get(url), (200, page.content))
+
+            # Once archived, unchanged pages are validated again
+            self.assertEqual(scraper.get_article("12345")["title"], "Cached")
+            self.assertEqual(mock_get.call_args[1]["headers"], {"If-None-Match": '"v1"'})
+            archive.close()
+
+    def test_last_modified_store(self):
+        """Test that only new or changed articles are reported, and progress persists"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.json")
+            store = LastModifiedStore(path, flush_every=1)
+            self.assertTrue(store.is_changed("1", "2024-01-01"))
+            store.mark("1", "2024-01-01")
+            store.mark("2", None)
+            
+            reopened = LastModifiedStore(path)
+            self.assertFalse(reopened.is_changed("1", "2024-01-01"))
+            self.assertTrue(reopened.is_changed("1", "2024-02-01"))
+            self.assertFalse(reopened.is_changed("2", None))
+            self.assertTrue(reopened.is_changed("3", None))
+
+    def test_state_files_are_written_in_batches(self):
+        """Test that stores write after flush_every updates and ignore unreadable files"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.json")
+            store = LastModifiedStore(path, flush_every=2)
+            store.mark("1", "2024-01-01")
+            self.assertFalse(os.path.exists(path))
+            store.mark("2", "2024-01-01")
+            self.assertFalse(LastModifiedStore(path).is_changed("2", "2024-01-01"))
+            store.mark("3", "2024-01-01")
+            store.flush()
+            self.assertFalse(LastModifiedStore(path).is_changed("3", "2024-01-01"))
+
+            with open(path, 'w') as f:
+                f.write("{not json")
+            self.assertTrue(LastModifiedStore(path).is_changed("1", "2024-01-01"))
 
 if __name__ == '__main__':
     # Run tests with verbose output
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the block segmenter
+"""
+import unittest
+from segmenter import split_html, split_markdown, split_segments, join_segments
+
+
+class TestSegmenter(unittest.TestCase):
+    """Test cases for HTML and markdown segmentation"""
+    
+    def test_html_splits_top_level_blocks(self):
+        """Test that each top-level block element is one segment"""
+        html = "<h2>Intro</h2>\n<p>First <strong>para</strong>.</p>\n<ul><li>A</li><li>B</li></ul>"
+        segments = split_html(html)
+        translatable = [s["text"] for s in segments if s["translatable"]]
+        
+        self.assertEqual(translatable, [
+            "<h2>Intro</h2>",
+            "<p>First <strong>para</strong>.</p>",
+            "<ul><li>A</li><li>B</li></ul>"
+        ])
+        self.assertEqual(join_segments(segments), html)
+        
+    def test_html_groups_inline_content(self):
+        """Test that inline content between blocks forms one segment"""
+        html = "Some <em>inline</em> text<br>more<p>Block</p>"
+        segments = split_html(html)
+        translatable = [s["text"] for s in segments if s["translatable"]]
+        
+        self.assertEqual(translatable, ["Some <em>inline</em> text<br>more", "<p>Block</p>"])
+        self.assertEqual(join_segments(segments), html)
+        
+    def test_html_nested_blocks_stay_together(self):
+        """Test that nested blocks of the same tag are not split early"""
+        html = "<div><div>Inner</div><p>Text</p></div><hr/><p>After</p>"
+        segments = split_html(html)
+        translatable = [s["text"] for s in segments if s["translatable"]]
+        
+        self.assertEqual(translatable, ["<div><div>Inner</div><p>Text</p></div>", "<p>After</p>"])
+        self.assertEqual(join_segments(segments), html)
+        
+    def test_markdown_splits_paragraphs(self):
+        """Test that markdown is split on blank lines"""
+        markdown = "# Title\n\nFirst paragraph\nstill first.\n\n\n- item 1\n- item 2\n"
+        segments = split_markdown(markdown)
+        translatable = [s["text"] for s in segments if s["translatable"]]
+        
+        self.assertEqual(translatable, ["# Title", "First paragraph\nstill first.", "- item 1\n- item 2"])
+        self.assertEqual(join_segments(segments), markdown)
+        
+    def test_markdown_code_fence_not_translatable(self):
+        """Test that fenced code blocks are kept whole and passed through"""
+        markdown = "Run this:\n```\npip install x\n\nmore code\n```\nDone."
+        segments = split_markdown(markdown)
+        
+        fences = [s for s in segments if s["text"].startswith("```")]
+        self.assertEqual(len(fences), 1)
+        self.assertFalse(fences[0]["translatable"])
+        self.assertIn("more code", fences[0]["text"])
+        self.assertEqual(join_segments(segments), markdown)
+        
+    def test_unknown_format(self):
+        """Test that unsupported formats are rejected"""
+        with self.assertRaises(ValueError):
+            split_segments("text", "rst")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
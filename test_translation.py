@@ -4,10 +4,31 @@ Unit tests for the Zendesk KB translation system
 """
 import os
 import sys
+import json
+import asyncio
+import time
+import tempfile
+import threading
 import unittest
-from unittest.mock import Mock, patch, MagicMock
-from translation_service import TranslationService
+import requests
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest.mock import Mock, patch, MagicMock, AsyncMock
+from translation_service import TranslationService, translate_articles_multilang
 from zendesk_client import ZendeskClient
+from translation_cache import TranslationCache
+from rate_limiter import RateLimitScheduler
+
+
+def fake_packed_create(model, messages, temperature):
+    """Fake completion that prefixes 'JA:' to plain and packed JSON requests alike"""
+    content = messages[1]["content"]
+    if content.startswith('{"items"'):
+        items = json.loads(content)["items"]
+        content = json.dumps({"items": [{"id": item["id"], "translation": "JA:" + item["text"]}
+                                        for item in items]})
+    else:
+        content = "JA:" + content
+    return Mock(choices=[Mock(message=Mock(content=content))])
 
 
 class TestTranslationService(unittest.TestCase):
@@ -29,6 +50,14 @@ class TestTranslationService(unittest.TestCase):
         )
         self.assertEqual(service.target_language, "Japanese")
         self.assertEqual(len(service.glossary), 2)
+
+    def test_model_name(self):
+        """Test that the model name resolves the Azure deployment without creating a client"""
+        self.assertEqual(TranslationService(target_language="Japanese", model="gpt-4o").model_name, "gpt-4o")
+        with patch.dict(os.environ, {"AZURE_OPENAI_DEPLOYMENT": "kb-translator"}):
+            service = TranslationService(target_language="Japanese", use_azure=True)
+            self.assertEqual(service.model_name, "kb-translator")
+        self.assertIsNone(service._client)
     
     def test_system_prompt_includes_glossary(self):
         """Test that system prompt includes glossary terms"""
@@ -44,6 +73,20 @@ class TestTranslationService(unittest.TestCase):
         self.assertIn("Support", prompt)
         self.assertIn("サポート", prompt)
         
+    def test_system_prompt_filters_glossary_by_text(self):
+        """Test that only glossary terms found in the text are included"""
+        service = TranslationService(
+            target_language="Japanese",
+            glossary=self.glossary
+        )
+        prompt = service._build_system_prompt("Contact Support for help.")
+        
+        self.assertIn("サポート", prompt)
+        self.assertNotIn("ナレッジベース", prompt)
+        
+        prompt = service._build_system_prompt("No terms here.")
+        self.assertNotIn("glossary", prompt)
+        
     def test_system_prompt_preserves_formatting(self):
         """Test that system prompt mentions preserving HTML"""
         service = TranslationService(target_language="Japanese")
@@ -71,6 +114,313 @@ class TestTranslationService(unittest.TestCase):
         service._client.chat.completions.create.assert_not_called()
 
 
+    def test_translate_text_uses_cache(self):
+        """Test that repeated translations are served from the cache"""
+        cache = TranslationCache(db_path=":memory:")
+        service = TranslationService(target_language="Japanese", cache=cache)
+        service._client = Mock()
+        service.deployment = "gpt-4"
+        response = Mock()
+        response.choices = [Mock(message=Mock(content="こんにちは"))]
+        service._client.chat.completions.create.return_value = response
+        
+        self.assertEqual(service.translate_text("Hello"), "こんにちは")
+        self.assertEqual(service.translate_text("Hello"), "こんにちは")
+        
+        service._client.chat.completions.create.assert_called_once()
+        stats = cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    
+    def test_translate_document_only_sends_changed_segments(self):
+        """Test that unchanged segments are reused from the translation memory"""
+        cache = TranslationCache(db_path=":memory:")
+        service = TranslationService(target_language="Japanese", cache=cache)
+        service._client = Mock()
+        service.deployment = "gpt-4"
+        
+        service._client.chat.completions.create.side_effect = fake_packed_create
+        
+        original = "<p>One</p>\n<p>Two</p>\n<p>Three</p>"
+        translated = service.translate_document(original, "html")
+        self.assertEqual(translated, "JA:<p>One</p>\nJA:<p>Two</p>\nJA:<p>Three</p>")
+        self.assertEqual(service._client.chat.completions.create.call_count, 1)
+        
+        edited = "<p>One</p>\n<p>Two, revised</p>\n<p>Three</p>"
+        translated = service.translate_document(edited, "html")
+        self.assertEqual(translated, "JA:<p>One</p>\nJA:<p>Two, revised</p>\nJA:<p>Three</p>")
+        self.assertEqual(service._client.chat.completions.create.call_count, 2)
+    
+    def test_cold_document_is_packed_into_few_requests(self):
+        """Test that a document missing from the translation memory is not sent paragraph by paragraph"""
+        cache = TranslationCache(db_path=":memory:")
+        service = TranslationService(target_language="Japanese", cache=cache)
+        service._client = Mock()
+        service.deployment = "gpt-4"
+        service._client.chat.completions.create.side_effect = fake_packed_create
+        
+        body = "\n\n".join(f"Paragraph {i} of the article." for i in range(30))
+        translated = service.translate_document(body, "markdown")
+        
+        self.assertEqual(translated, "\n\n".join(f"JA:Paragraph {i} of the article." for i in range(30)))
+        self.assertEqual(service._client.chat.completions.create.call_count, 1)
+        self.assertEqual(cache.get(service._cache_key("Paragraph 7 of the article.")),
+                         "JA:Paragraph 7 of the article.")
+        
+        # The stream serves the cached paragraphs and packs the new one
+        edited = body.replace("Paragraph 29 of", "Last paragraph of")
+        streamed = "".join(service.translate_document_stream(edited, "markdown"))
+        self.assertEqual(streamed, translated.replace("JA:Paragraph 29 of", "JA:Last paragraph of"))
+        self.assertEqual(service._client.chat.completions.create.call_count, 2)
+
+    
+    def test_translate_document_chunks_large_body(self):
+        """Test that large bodies are translated in chunks and stitched in order"""
+        service = TranslationService(target_language="Japanese", max_chunk_tokens=30)
+        service._client = Mock()
+        service.deployment = "gpt-4"
+        
+        def fake_create(model, messages, temperature):
+            response = Mock()
+            response.choices = [Mock(message=Mock(content=messages[1]["content"].upper()))]
+            return response
+        service._client.chat.completions.create.side_effect = fake_create
+        
+        body = "\n".join(f"<p>paragraph {i} of the article body</p>" for i in range(12))
+        translated = service.translate_document(body, "html")
+        
+        self.assertGreater(service._client.chat.completions.create.call_count, 1)
+        self.assertEqual(translated, body.upper())
+        
+    def test_translate_batch_packs_short_texts(self):
+        """Test that short texts are packed into one request and mapped back by id"""
+        service = TranslationService(target_language="Japanese", max_batch_items=10)
+        service._client = Mock()
+        service.deployment = "gpt-4"
+        
+        def fake_create(model, messages, temperature):
+            items = json.loads(messages[1]["content"])["items"]
+            translated = [{"id": item["id"], "translation": "JA:" + item["text"]}
+                          for item in reversed(items)]
+            response = Mock()
+            response.choices = [Mock(message=Mock(content=json.dumps({"items": translated})))]
+            return response
+        service._client.chat.completions.create.side_effect = fake_create
+        
+        titles = [f"Title {i}" for i in range(25)] + ["Title 3"]
+        results = service.translate_batch(titles)
+        
+        self.assertEqual(results, [f"JA:{t}" for t in titles])
+        self.assertEqual(service._client.chat.completions.create.call_count, 3)
+        
+    def test_translate_batch_malformed_response_falls_back(self):
+        """Test that items missing from a malformed response are sent individually"""
+        service = TranslationService(target_language="Japanese")
+        service._client = Mock()
+        service.deployment = "gpt-4"
+        
+        def fake_create(model, messages, temperature):
+            content = messages[1]["content"]
+            response = Mock()
+            if content.startswith("{"):
+                response.choices = [Mock(message=Mock(
+                    content='```json\n{"items": [{"id": "0", "translation": "一"}]}\n```'
+                ))]
+            else:
+                response.choices = [Mock(message=Mock(content="JA:" + content))]
+            return response
+        service._client.chat.completions.create.side_effect = fake_create
+        
+        results = service.translate_batch(["One", "Two", "Three"])
+        
+        self.assertEqual(results, ["一", "JA:Two", "JA:Three"])
+        self.assertEqual(service._client.chat.completions.create.call_count, 3)
+        
+    def test_translate_text_stream(self):
+        """Test that streamed pieces are yielded and the result is cached"""
+        cache = TranslationCache(db_path=":memory:")
+        service = TranslationService(target_language="Japanese", cache=cache)
+        service._client = Mock()
+        service.deployment = "gpt-4"
+        
+        def chunk(content):
+            return Mock(choices=[Mock(delta=Mock(content=content))])
+        service._client.chat.completions.create.return_value = iter(
+            [Mock(choices=[]), chunk("こん"), chunk(None), chunk("にちは")]
+        )
+        
+        self.assertEqual(list(service.translate_text_stream("Hello")), ["こん", "にちは"])
+        self.assertEqual(service._client.chat.completions.create.call_args.kwargs["stream"], True)
+        self.assertEqual(list(service.translate_text_stream("Hello")), ["こんにちは"])
+        service._client.chat.completions.create.assert_called_once()
+        
+    def test_translate_articles_bounded_concurrency(self):
+        """Test that articles are translated concurrently under the limit"""
+        service = TranslationService(target_language="Japanese", max_concurrency=3)
+        in_flight = {"now": 0, "max": 0}
+        
+        async def fake_create(model, messages, temperature):
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            if messages[1]["content"] == "Broken":
+                raise RuntimeError("API error")
+            response = Mock()
+            response.choices = [Mock(message=Mock(content="JA:" + messages[1]["content"]))]
+            return response
+        
+        client = Mock()
+        client.close = AsyncMock()
+        client.chat.completions.create.side_effect = fake_create
+        articles = [{"id": i, "title": f"Title {i}", "body": f"<p>Body {i}</p>"} for i in range(10)]
+        articles.append({"id": 10, "title": "Broken", "body": "<p>Body</p>"})
+        
+        with patch('translation_service.AsyncOpenAI', return_value=client):
+            results = service.translate_articles(articles)
+        
+        self.assertEqual(in_flight["max"], 3)
+        self.assertEqual([r["id"] for r in results[:10]], list(range(10)))
+        self.assertEqual(results[4]["title"], "JA:Title 4")
+        self.assertEqual(results[4]["body"], "JA:<p>Body 4</p>")
+        self.assertIsInstance(results[10], RuntimeError)
+        client.close.assert_awaited_once()
+
+    def test_max_concurrency_caps_every_thread(self):
+        """Test that max_concurrency bounds requests across threads and derived services"""
+        service = TranslationService(target_language="Japanese", max_concurrency=2)
+        service._client = Mock()
+        service.deployment = "gpt-4"
+        korean = service.for_language("Korean")
+        in_flight = {"now": 0, "max": 0}
+        lock = threading.Lock()
+
+        def fake_create(model, messages, temperature):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["now"])
+            time.sleep(0.01)
+            with lock:
+                in_flight["now"] -= 1
+            return Mock(choices=[Mock(message=Mock(content="訳"))])
+        service._client.chat.completions.create.side_effect = fake_create
+
+        threads = [threading.Thread(target=(service if i % 2 else korean).translate_text, args=(f"Text {i}",))
+                   for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(service._client.chat.completions.create.call_count, 8)
+        self.assertEqual(in_flight["max"], 2)
+
+    def test_translate_articles_from_concurrent_threads(self):
+        """Test that threads sharing a service each get their own async client and semaphore"""
+        service = TranslationService(target_language="Japanese", max_concurrency=1)
+
+        async def fake_create(model, messages, temperature):
+            await asyncio.sleep(0.01)
+            return Mock(choices=[Mock(message=Mock(content="JA:" + messages[1]["content"]))])
+
+        clients = []
+        def new_client(**kwargs):
+            client = Mock()
+            client.close = AsyncMock()
+            client.chat.completions.create.side_effect = fake_create
+            clients.append(client)
+            return client
+
+        results = {}
+        def run(name):
+            articles = [{"id": i, "title": f"{name} {i}", "body": "<p>Body</p>"} for i in range(3)]
+            results[name] = service.translate_articles(articles)
+
+        with patch('translation_service.AsyncOpenAI', side_effect=new_client) as async_openai:
+            threads = [threading.Thread(target=run, args=(name,)) for name in ("a", "b")]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(async_openai.call_count, 2)
+        for client in clients:
+            client.close.assert_awaited_once()
+        self.assertEqual(len(service._loop_state), 0)
+        for name in ("a", "b"):
+            self.assertEqual([r["title"] for r in results[name]], [f"JA:{name} {i}" for i in range(3)])
+
+    def test_translate_articles_multilang_closes_async_clients(self):
+        """Test that every language's async client is closed when the run ends"""
+        japanese = TranslationService(target_language="Japanese")
+        korean = japanese.for_language("Korean")
+
+        async def fake_create(model, messages, temperature):
+            return Mock(choices=[Mock(message=Mock(content="訳"))])
+
+        clients = []
+        def new_client(**kwargs):
+            client = Mock()
+            client.close = AsyncMock()
+            client.chat.completions.create.side_effect = fake_create
+            clients.append(client)
+            return client
+
+        articles = [{"id": 1, "title": "Title", "body": "<p>Body</p>"}]
+        with patch('translation_service.AsyncOpenAI', side_effect=new_client):
+            results = translate_articles_multilang({"ja": japanese, "ko": korean}, articles)
+
+        self.assertEqual(results["ko"][0]["title"], "訳")
+        self.assertEqual(len(clients), 2)
+        for client in clients:
+            client.close.assert_awaited_once()
+
+
+class TestTranslationCache(unittest.TestCase):
+    """Test cases for TranslationCache"""
+    
+    def test_key_depends_on_inputs(self):
+        """Test that cache keys change with language, model and glossary version"""
+        key = TranslationCache.make_key("Hello", "Japanese", "gpt-4", "v1")
+        self.assertEqual(key, TranslationCache.make_key("Hello", "Japanese", "gpt-4", "v1"))
+        self.assertNotEqual(key, TranslationCache.make_key("Hello", "Korean", "gpt-4", "v1"))
+        self.assertNotEqual(key, TranslationCache.make_key("Hello", "Japanese", "gpt-4o", "v1"))
+        self.assertNotEqual(key, TranslationCache.make_key("Hello", "Japanese", "gpt-4", "v2"))
+    
+    def test_lru_eviction(self):
+        """Test that least recently used entries are evicted when over budget"""
+        cache = TranslationCache(db_path=":memory:", max_size_mb=20 / (1024 * 1024))
+        cache.set("a", "0123456789")
+        cache.set("b", "0123456789")
+        cache.get("a")
+        cache.set("c", "0123456789")
+        
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertLessEqual(cache.stats()["size_bytes"], 20)
+
+    def test_hits_are_recorded_in_batches(self):
+        """Test that cache hits do not write to the database until a batch is full"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            cache = TranslationCache(db_path=path, touch_batch=2)
+            cache.set("a", "0123456789")
+            cache.set("a", "01234")
+            self.assertEqual(cache._total_size, 5)
+            stored = cache._conn.execute("SELECT last_access FROM translations").fetchone()[0]
+
+            cache.get("a")
+            self.assertEqual(cache._conn.execute("SELECT last_access FROM translations").fetchone()[0], stored)
+            cache.close()
+
+            reopened = TranslationCache(db_path=path)
+            self.assertGreater(reopened._conn.execute("SELECT last_access FROM translations").fetchone()[0], stored)
+            self.assertEqual(reopened._total_size, 5)
+            reopened.close()
+
+
 class TestZendeskClient(unittest.TestCase):
     """Test cases for ZendeskClient"""
     
@@ -84,7 +434,7 @@ class TestZendeskClient(unittest.TestCase):
         self.assertEqual(client.subdomain, "testsubdomain")
         self.assertEqual(client.base_url, "https://testsubdomain.zendesk.com/api/v2")
         
-    @patch('zendesk_client.requests.get')
+    @patch('zendesk_client.requests.Session.get')
     def test_get_articles_single_page(self, mock_get):
         """Test fetching articles with single page response"""
         # Mock response
@@ -106,7 +456,7 @@ class TestZendeskClient(unittest.TestCase):
         self.assertEqual(articles[0]["id"], 1)
         self.assertEqual(articles[1]["id"], 2)
         
-    @patch('zendesk_client.requests.get')
+    @patch('zendesk_client.requests.Session.get')
     def test_get_article_by_id(self, mock_get):
         """Test fetching a single article by ID"""
         # Mock response
@@ -128,6 +478,258 @@ class TestZendeskClient(unittest.TestCase):
         self.assertEqual(article["id"], 123)
         self.assertEqual(article["title"], "Test Article")
 
+    
+    @patch('zendesk_client.requests.Session.get')
+    def test_iter_articles_is_lazy(self, mock_get):
+        """Test that pages are fetched only as the iterator advances"""
+        first = Mock()
+        first.json.return_value = {"articles": [{"id": 1}, {"id": 2}],
+                                   "next_page": "https://test.zendesk.com/page2"}
+        second = Mock()
+        second.json.return_value = {"articles": [{"id": 3}], "next_page": None}
+        mock_get.side_effect = [first, second]
+        
+        client = ZendeskClient("test", "test@example.com", "token")
+        articles = client.iter_articles()
+        self.assertEqual(next(articles)["id"], 1)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual([a["id"] for a in articles], [2, 3])
+        self.assertEqual(mock_get.call_count, 2)
+    
+    @patch('zendesk_client.requests.Session.get')
+    def test_get_articles_prefetches_pages_in_order(self, mock_get):
+        """Test that pages after the first are fetched concurrently but returned in order"""
+        def get_page(url, auth=None, timeout=None, headers=None):
+            number = int(url.split("page=")[-1]) if "&page=" in url else 1
+            # Later pages answer first
+            time.sleep(0.01 * (5 - number))
+            response = Mock()
+            response.json.return_value = {
+                "articles": [{"id": number * 10 + i} for i in range(2)],
+                "page_count": 4,
+                "next_page": None
+            }
+            return response
+        mock_get.side_effect = get_page
+        
+        client = ZendeskClient("test", "test@example.com", "token", max_workers=3)
+        articles = client.get_articles()
+        
+        self.assertEqual([a["id"] for a in articles], [10, 11, 20, 21, 30, 31, 40, 41])
+        self.assertEqual(mock_get.call_count, 4)
+        self.assertIn("per_page=100", mock_get.call_args_list[0][0][0])
+    
+    @patch('zendesk_client.requests.Session.get')
+    def test_get_translation_locales(self, mock_get):
+        """Test bulk locale detection from per-locale listings"""
+        def get_page(url, auth=None, timeout=None, headers=None):
+            response = Mock()
+            articles = {
+                "/ja/": [{"id": 1}, {"id": 3}, {"id": 4, "draft": True}],
+                "/ko/": [{"id": 3}]
+            }
+            locale = next(key for key in articles if key in url)
+            response.json.return_value = {"articles": articles[locale], "next_page": None}
+            return response
+        mock_get.side_effect = get_page
+        
+        client = ZendeskClient("test", "test@example.com", "token")
+        with patch('zendesk_client.PER_ARTICLE_LOOKUP_MAX', 0):
+            available = client.get_translation_locales(["ja", "ko"], [1, 2, 3, 4])
+        
+        self.assertEqual(available, {"1": {"ja"}, "2": set(), "3": {"ja", "ko"}, "4": set()})
+        self.assertEqual(mock_get.call_count, 2)
+    
+    @patch('zendesk_client.requests.Session.get')
+    def test_get_translation_locales_of_a_few_articles(self, mock_get):
+        """Test that a few articles are checked per article and listings stop once all are found"""
+        translations = {
+            "1": [{"locale": "en-us"}, {"locale": "ja"}, {"locale": "ko", "draft": True}],
+            "2": [{"locale": "en-us"}]
+        }
+        def get_page(url, auth=None, timeout=None, headers=None):
+            response = Mock()
+            article_id = url.split("/articles/")[1].split("/")[0]
+            if article_id not in translations:
+                response.status_code = 404
+                response.raise_for_status.side_effect = requests.exceptions.HTTPError(response=response)
+            response.json.return_value = {"translations": translations.get(article_id, []), "next_page": None}
+            return response
+        mock_get.side_effect = get_page
+        
+        client = ZendeskClient("test", "test@example.com", "token")
+        available = client.get_translation_locales(["ja", "ko"], [1, 2, 3])
+        
+        self.assertEqual(available, {"1": {"ja"}, "2": set(), "3": set()})
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertTrue(all("/translations.json" in call[0][0] for call in mock_get.call_args_list))
+        
+        # Larger sets use the listings, which stop paging once every wanted article was seen
+        listing = Mock()
+        listing.json.return_value = {"articles": [{"id": 1}, {"id": 2}],
+                                     "next_page": "https://test.zendesk.com/next"}
+        mock_get.reset_mock(side_effect=True)
+        mock_get.return_value = listing
+        with patch('zendesk_client.PER_ARTICLE_LOOKUP_MAX', 1):
+            available = client.get_translation_locales(["ja"], [1, 2])
+        
+        self.assertEqual(available, {"1": {"ja"}, "2": {"ja"}})
+        self.assertEqual(mock_get.call_count, 1)
+    
+    @patch('zendesk_client.requests.Session.get')
+    def test_get_updated_articles(self, mock_get):
+        """Test incremental sync pages forward and keeps the newest version per article"""
+        first = Mock()
+        first.json.return_value = {
+            "articles": [
+                {"id": 1, "locale": "en-us", "title": "Old"},
+                {"id": 2, "locale": "ja", "title": "記事"}
+            ],
+            "next_page": "https://test.zendesk.com/next",
+            "end_time": 1700000100
+        }
+        second = Mock()
+        second.json.return_value = {
+            "articles": [{"id": 1, "locale": "en-us", "title": "New"}],
+            "next_page": "https://test.zendesk.com/next2",
+            "end_time": 1700000200
+        }
+        last = Mock()
+        last.json.return_value = {"articles": [], "next_page": None, "end_time": 1700000200}
+        mock_get.side_effect = [first, second, last]
+        
+        client = ZendeskClient("test", "test@example.com", "token")
+        articles, end_time = client.get_updated_articles(1700000000, locale="en-us")
+        
+        self.assertEqual(articles, [{"id": 1, "locale": "en-us", "title": "New"}])
+        self.assertEqual(end_time, 1700000200)
+        self.assertIn("incremental/articles.json?start_time=1700000000", mock_get.call_args_list[0][0][0])
+
+
+
+class FakeZendeskHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Help Center translations API"""
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    
+    def _reply(self, status, payload=None):
+        body = json.dumps(payload or {}).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _read(self):
+        return json.loads(self.rfile.read(int(self.headers["Content-Length"])))["translation"]
+    
+    def do_GET(self):
+        # /api/v2/help_center/articles/<id>/translations/<locale>.json
+        parts = self.path.split("/")
+        with self.server.lock:
+            translation = self.server.translations.get((parts[5], parts[7].split(".")[0]))
+        if translation is None:
+            return self._reply(404, {"error": "RecordNotFound"})
+        self._reply(200, {"translation": translation})
+    
+    def do_PUT(self):
+        # /api/v2/help_center/articles/<id>/translations/<locale>.json
+        parts = self.path.split("/")
+        key = (parts[5], parts[7].split(".")[0])
+        translation = self._read()
+        with self.server.lock:
+            self.server.requests += 1
+            if key not in self.server.translations:
+                return self._reply(404, {"error": "RecordNotFound"})
+            self.server.translations[key] = dict(self.server.translations[key], **translation)
+        self._reply(200, {"translation": translation})
+    
+    def do_POST(self):
+        # /api/v2/help_center/articles/<id>/translations.json
+        parts = self.path.split("/")
+        translation = self._read()
+        key = (parts[5], translation["locale"])
+        with self.server.lock:
+            self.server.requests += 1
+            if self.server.requests == 1:
+                return self._reply(429)
+            if parts[5] == "404":
+                return self._reply(404, {"error": "RecordNotFound"})
+            if translation["locale"] == "xx":
+                return self._reply(400, {"error": "InvalidLocale"})
+            if key in self.server.translations:
+                return self._reply(400, {"error": "TranslationExists"})
+            self.server.translations[key] = translation
+            if parts[5] == "lost" and not self.server.dropped:
+                # Created, but the connection drops before the response is sent
+                self.server.dropped = True
+                self.close_connection = True
+                return
+        self._reply(201, {"translation": translation})
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestZendeskPublisher(unittest.TestCase):
+    """Test publishing translations against a local stand-in server"""
+    
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeZendeskHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = 0
+        self.server.dropped = False
+        self.server.translations = {("2", "ja"): {"title": "古い", "body": "<p>古い</p>", "draft": False}}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.client = ZendeskClient(
+            "test", "test@example.com", "token",
+            scheduler=RateLimitScheduler({"zendesk": 6000}, base_delay=0.01),
+            api_url=f"http://127.0.0.1:{self.server.server_address[1]}/api/v2"
+        )
+    
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def test_publish_translations(self):
+        """Test create/skip, rate-limit retry, failures, the result log and opt-in overwrite"""
+        translations = [
+            {"article_id": article_id, "locale": "ja", "title": f"タイトル{article_id}", "body": "<p>本文</p>"}
+            for article_id in ("1", "2", "404")
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "publish_log.jsonl")
+            results = self.client.publish_translations(translations, max_workers=3, result_log=log_path)
+            with open(log_path, encoding='utf-8') as f:
+                logged = [json.loads(line) for line in f]
+        
+        self.assertEqual([r["status"] for r in results], ["created", "skipped", "failed"])
+        self.assertEqual(len(logged), 3)
+        self.assertEqual(self.client.scheduler.stats()["retries"], 1)
+        # The existing (human) translation is left alone
+        self.assertEqual(self.server.translations[("2", "ja")]["title"], "古い")
+        self.assertTrue(self.server.translations[("1", "ja")]["draft"])
+        
+        # Overwriting updates in place, without creating duplicates or unpublishing
+        again = self.client.publish_translations(translations[:2], overwrite=True)
+        self.assertEqual([r["status"] for r in again], ["updated", "updated"])
+        self.assertEqual(len(self.server.translations), 2)
+        self.assertEqual(self.server.translations[("2", "ja")]["title"], "タイトル2")
+        self.assertFalse(self.server.translations[("2", "ja")]["draft"])
+    
+    def test_rejected_create_is_not_reported_as_existing(self):
+        """Test that other client errors fail and a create whose response was lost counts as created"""
+        invalid = self.client.publish_translation("1", "xx", "タイトル", "<p>本文</p>")
+        self.assertEqual(invalid["status"], "failed")
+        self.assertIn("400", invalid["error"])
+        
+        lost = self.client.publish_translation("lost", "ja", "タイトル", "<p>本文</p>")
+        self.assertEqual(lost["status"], "created")
+        self.assertTrue(self.server.dropped)
+        self.assertEqual(self.server.translations[("lost", "ja")]["title"], "タイトル")
+
 
 class TestIntegration(unittest.TestCase):
     """Integration tests"""
@@ -139,6 +741,40 @@ class TestIntegration(unittest.TestCase):
         self.assertTrue(os.path.exists(".env.example"))
         self.assertTrue(os.path.exists("requirements.txt"))
         
+    def test_fan_out_targets_without_glossary_get_none(self):
+        """Test that a target without glossary_file does not inherit the default language's glossary"""
+        import main
+        translator = TranslationService(target_language="Japanese",
+                                        glossary=[{"source": "knowledge base", "target": "ナレッジベース"}])
+        translators = main.build_target_translators(translator, [
+            {"locale": "ja", "language": "Japanese"},
+            {"locale": "ko", "language": "Korean"}
+        ])
+        self.assertEqual(len(translators["ja"].glossary), 1)
+        self.assertEqual(translators["ko"].glossary, [])
+        self.assertNotIn("ナレッジベース", translators["ko"]._build_system_prompt("knowledge base"))
+        
+    def test_main_closes_caches_when_run_fails(self):
+        """Test that main() closes the translation and HTTP caches even if processing raises"""
+        import main
+        translation_cache = Mock()
+        http_cache = Mock()
+        with tempfile.TemporaryDirectory() as tmp:
+            config = {"output": {"directory": tmp}, "translation": {}}
+            with patch.object(main, 'load_config', return_value=config), \
+                 patch.object(main, 'load_dotenv'), \
+                 patch.object(main, 'load_translation_cache', return_value=translation_cache), \
+                 patch.object(main, 'load_http_cache', return_value=http_cache), \
+                 patch.object(main, 'get_zendesk_client', return_value=None), \
+                 patch.object(main, 'ArticleTranslationService') as article_service, \
+                 patch.dict(os.environ, {"ARTICLE_IDS": "1"}):
+                article_service.return_value.process_articles.side_effect = RuntimeError("boom")
+                with self.assertRaises(RuntimeError):
+                    main.main([])
+        
+        translation_cache.close.assert_called_once()
+        http_cache.close.assert_called_once()
+        
     def test_main_module_imports(self):
         """Test that main module can be imported"""
         try:
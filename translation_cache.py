@@ -0,0 +1,180 @@
+"""
+Translation Cache
+Persistent, content-addressed cache of translations backed by SQLite
+"""
+import hashlib
+import sqlite3
+import threading
+import time
+import logging
+from pathlib import Path
+from typing import Optional, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationCache:
+    """On-disk translation cache with size-based LRU eviction"""
+
+    def __init__(self, db_path: str = ".cache/translations.db", max_size_mb: float = 256,
+                 touch_batch: int = 100):
+        """
+        Initialize translation cache
+
+        Args:
+            db_path: Path to the SQLite database file (":memory:" for a throwaway cache)
+            max_size_mb: Maximum total size of cached translations in megabytes
+            touch_batch: Number of cache hits whose access times are kept in
+                memory before being written in one transaction
+        """
+        self.db_path = db_path
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.touch_batch = max(1, touch_batch)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> last access time of hits not yet written to the database
+        self._touched: Dict[str, float] = {}
+
+        if db_path != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, "
+            "value TEXT NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translations_last_access "
+            "ON translations (last_access)"
+        )
+        self._conn.commit()
+        # Running total of the cached sizes, so stores do not have to sum the table
+        self._total_size = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM translations"
+        ).fetchone()[0]
+
+    @staticmethod
+    def make_key(text: str, target_language: str, model: str, glossary_version: str) -> str:
+        """
+        Build a content-addressed cache key
+
+        Args:
+            text: Source text
+            target_language: Target language of the translation
+            model: Model or deployment name used for the translation
+            glossary_version: Version identifier of the glossary in effect
+
+        Returns:
+            Hex digest identifying the translation
+        """
+        digest = hashlib.sha256()
+        for part in (target_language, model, glossary_version, text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached translation and mark it as recently used
+
+        Args:
+            key: Cache key from make_key()
+
+        Returns:
+            Cached translation, or None on a miss
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touched[key] = time.time()
+            if len(self._touched) >= self.touch_batch:
+                self._write_touches()
+                self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, value: str):
+        """
+        Store a translation, evicting least recently used entries if over budget
+
+        Args:
+            key: Cache key from make_key()
+            value: Translated text
+        """
+        size = len(value.encode('utf-8'))
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, value, size, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            self._touched.pop(key, None)
+            self._total_size += size - (previous[0] if previous else 0)
+            if self._total_size > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _write_touches(self):
+        """Write the buffered access times of cache hits"""
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE translations SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits in max_bytes"""
+        # Eviction order has to see the hits still buffered in memory
+        self._write_touches()
+        evicted = []
+        cursor = self._conn.execute(
+            "SELECT key, size FROM translations ORDER BY last_access ASC"
+        )
+        while self._total_size > self.max_bytes:
+            rows = cursor.fetchmany(100)
+            if not rows:
+                break
+            for key, size in rows:
+                if self._total_size <= self.max_bytes:
+                    break
+                evicted.append(key)
+                self._total_size -= size
+        cursor.close()
+        self._conn.executemany("DELETE FROM translations WHERE key = ?", [(key,) for key in evicted])
+        logger.debug(f"Evicted {len(evicted)} cached translations")
+
+    def stats(self) -> Dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hit/miss counters, entry count and total size
+        """
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM translations"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": entries,
+            "size_bytes": size
+        }
+
+    def close(self):
+        """Write buffered access times and close the underlying database connection"""
+        with self._lock:
+            self._write_touches()
+            self._conn.commit()
+            self._conn.close()
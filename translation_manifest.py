@@ -0,0 +1,112 @@
+"""
+Translation Manifest
+Records the inputs every translated output file was produced from, so
+unchanged articles are not sent to the model again
+"""
+import os
+import hashlib
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from json_store import JsonFileStore
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationManifest(JsonFileStore):
+    """
+    JSON file mapping '<article ID>/<locale>' to the source hash, glossary
+    version and model an output file was translated with
+    """
+
+    unreadable_message = "Translating every article."
+
+    def __init__(self, path: str = ".cache/manifest.json", flush_every: int = 50):
+        """
+        Initialize the manifest
+
+        Args:
+            path: Path to the JSON file
+            flush_every: Write the file after this many updates (and on flush())
+        """
+        super().__init__(path, flush_every)
+
+    @staticmethod
+    def source_hash(title: str, body: str) -> str:
+        """
+        Hash the source content of an article
+
+        Args:
+            title: Source title
+            body: Source markdown body
+
+        Returns:
+            Hex SHA-256 digest of the title and body
+        """
+        return hashlib.sha256(f"{title}\n{body}".encode('utf-8')).hexdigest()
+
+    def get(self, article_id: str, locale: str) -> Optional[Dict]:
+        """
+        Get the manifest entry of a translated output
+
+        Args:
+            article_id: Article ID
+            locale: Target locale
+
+        Returns:
+            Entry dictionary, or None if the article was never translated
+        """
+        with self._lock:
+            return self._data.get(f"{article_id}/{locale}")
+
+    def is_up_to_date(self, article_id: str, locale: str, source_hash: str,
+                      glossary_version: str, model: str,
+                      output_exists: Callable[[str], bool] = os.path.exists) -> bool:
+        """
+        Whether the output file was translated from the same inputs and still exists
+
+        Args:
+            article_id: Article ID
+            locale: Target locale
+            source_hash: Hash of the current source (see source_hash())
+            glossary_version: Version of the glossary that would be used now
+            model: Model or deployment that would be used now
+            output_exists: Check that the recorded output is still there
+                (default: the output path exists on disk)
+
+        Returns:
+            True if translating again would reproduce the existing output
+        """
+        entry = self.get(article_id, locale)
+        return (
+            entry is not None
+            and entry["source_hash"] == source_hash
+            and entry["glossary_version"] == glossary_version
+            and entry["model"] == model
+            and output_exists(entry["output_path"])
+        )
+
+    def record(self, article_id: str, locale: str, source_hash: str,
+               glossary_version: str, model: str, output_path: str):
+        """
+        Record the inputs an output file was translated from
+
+        Args:
+            article_id: Article ID
+            locale: Target locale
+            source_hash: Hash of the source that was translated
+            glossary_version: Version of the glossary used
+            model: Model or deployment used
+            output_path: Path of the written output file
+        """
+        with self._lock:
+            self._data[f"{article_id}/{locale}"] = {
+                "article_id": str(article_id),
+                "locale": locale,
+                "source_hash": source_hash,
+                "glossary_version": glossary_version,
+                "model": model,
+                "output_path": str(output_path),
+                "translated_at": datetime.now().isoformat()
+            }
+            self._updated()
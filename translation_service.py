@@ -3,9 +3,20 @@ Translation Service
 Handles translation using OpenAI or Azure OpenAI APIs
 """
 import os
-from typing import List, Dict, Optional
+import re
+import json
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional, Union, Iterator
 import logging
-from openai import OpenAI, AzureOpenAI
+from openai import OpenAI, AzureOpenAI, AsyncOpenAI, AsyncAzureOpenAI
+from translation_cache import TranslationCache
+from rate_limiter import RateLimitScheduler
+from chunker import bounded_segments, chunk_segments, estimate_tokens
+from glossary import CompiledGlossary
 
 logger = logging.getLogger(__name__)
 
@@ -15,28 +26,104 @@ class TranslationService:
     
     def __init__(self, 
                  target_language: str,
-                 glossary: Optional[List[Dict[str, str]]] = None,
+                 glossary: Optional[Union[List[Dict[str, str]], CompiledGlossary]] = None,
                  use_azure: bool = False,
                  model: str = "gpt-4",
-                 api_key: Optional[str] = None):
+                 api_key: Optional[str] = None,
+                 cache: Optional[TranslationCache] = None,
+                 max_concurrency: int = 8,
+                 max_chunk_tokens: int = 2000,
+                 max_batch_items: int = 40,
+                 scheduler: Optional[RateLimitScheduler] = None):
         """
         Initialize translation service
         
         Args:
             target_language: Target language for translation
-            glossary: List of term dictionaries with 'source' and 'target' keys
+            glossary: List of term dictionaries with 'source' and 'target' keys,
+                or a CompiledGlossary shared between services
             use_azure: Whether to use Azure OpenAI instead of standard OpenAI
             model: Model name to use (for standard OpenAI) or deployment name (for Azure)
             api_key: Optional API key (for testing or explicit configuration)
+            cache: Optional persistent cache consulted before calling the API
+            max_concurrency: Maximum number of in-flight requests of this service
+                (per event loop for the async methods)
+            max_chunk_tokens: Token budget per request when splitting large documents
+            max_batch_items: Maximum number of short strings packed into one request
+            scheduler: Optional shared rate-limit scheduler ('llm_requests' and
+                'llm_tokens' buckets); retries 429s, 5xx and connection errors with backoff
         """
+        if not isinstance(glossary, CompiledGlossary):
+            glossary = CompiledGlossary(glossary)
         self.target_language = target_language
-        self.glossary = glossary or []
+        self.compiled_glossary = glossary
+        self.glossary = glossary.terms
         self.model = model
         self.use_azure = use_azure
         self._api_key = api_key
         self._client = None
+        # Async client and concurrency limiter of each event loop the service runs on
+        self._loop_state = weakref.WeakKeyDictionary()
+        self._loop_lock = threading.Lock()
         self.deployment = None
+        self.cache = cache
+        self.max_concurrency = max(1, max_concurrency)
+        # Caps in-flight requests across every thread using this service (and
+        # the services derived from it with for_language())
+        self._request_slots = threading.BoundedSemaphore(self.max_concurrency)
+        self.max_chunk_tokens = max_chunk_tokens
+        self.max_batch_items = max(1, max_batch_items)
+        self.scheduler = scheduler
+        # Let the scheduler own retries (429, 5xx, connection errors) instead of the SDK's built-in backoff
+        self._client_options = {"max_retries": 0} if scheduler is not None else {}
+        self.glossary_version = glossary.version
         
+        # The prompt only varies by glossary section, so build the fixed parts once
+        self._prompt_prefix = (
+            f"You are a professional translator. Translate the following text to {self.target_language}. "
+            "Preserve all HTML formatting, tags, and structure exactly as they appear in the original text. "
+            "Only translate the content within the tags, not the tags themselves.\n\n"
+        )
+        self._prompt_suffix = "Maintain the original formatting and structure. Return only the translated text."
+        self._full_prompt = self._prompt_prefix + glossary.prompt_section() + self._prompt_suffix
+        
+    def for_language(self, target_language: str,
+                     glossary: Optional[Union[List[Dict[str, str]], CompiledGlossary]] = None
+                     ) -> "TranslationService":
+        """
+        Create a service for another target language sharing this one's resources
+        
+        The new service shares the API clients, cache, rate-limit scheduler and
+        limits, including the max_concurrency cap on in-flight requests. Cache
+        entries stay separate per language because the target language is
+        part of every cache key. The glossary is not shared: terms written for
+        this language must not reach another language's prompts, so pass
+        self.compiled_glossary explicitly to reuse it.
+        
+        Args:
+            target_language: Target language of the new service
+            glossary: Glossary for that language (default: no glossary)
+            
+        Returns:
+            TranslationService instance
+        """
+        service = TranslationService(
+            target_language=target_language,
+            glossary=glossary if glossary is not None else CompiledGlossary(),
+            use_azure=self.use_azure,
+            model=self.model,
+            api_key=self._api_key,
+            cache=self.cache,
+            max_concurrency=self.max_concurrency,
+            max_chunk_tokens=self.max_chunk_tokens,
+            max_batch_items=self.max_batch_items,
+            scheduler=self.scheduler
+        )
+        service._client = self._client
+        service.deployment = self.deployment
+        service._request_slots = self._request_slots
+        return service
+    
     @property
     def client(self):
         """Lazy initialization of OpenAI client"""
@@ -45,36 +132,110 @@ class TranslationService:
                 self._client = AzureOpenAI(
                     api_key=self._api_key or os.getenv("AZURE_OPENAI_API_KEY"),
                     api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2023-05-15"),
-                    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
+                    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                    **self._client_options
                 )
                 self.deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", self.model)
             else:
-                self._client = OpenAI(api_key=self._api_key or os.getenv("OPENAI_API_KEY"))
+                self._client = OpenAI(api_key=self._api_key or os.getenv("OPENAI_API_KEY"),
+                                      **self._client_options)
                 self.deployment = self.model
         return self._client
+    
+    def _get_loop_state(self) -> Dict:
+        """
+        Get the async client and semaphore of the running event loop
+
+        Each loop gets its own pair, so services shared between threads (each
+        running its own asyncio.run()) never use a client or semaphore bound
+        to another thread's loop.
+
+        Returns:
+            Dictionary with 'client' (None until first used) and 'semaphore'
+        """
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            state = self._loop_state.get(loop)
+            if state is None:
+                state = {"client": None, "semaphore": asyncio.Semaphore(self.max_concurrency)}
+                self._loop_state[loop] = state
+        return state
+
+    @property
+    def async_client(self):
+        """Lazy initialization of the async OpenAI client for the running event loop"""
+        state = self._get_loop_state()
+        if state["client"] is None:
+            if self.use_azure:
+                state["client"] = AsyncAzureOpenAI(
+                    api_key=self._api_key or os.getenv("AZURE_OPENAI_API_KEY"),
+                    api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2023-05-15"),
+                    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                    **self._client_options
+                )
+            else:
+                state["client"] = AsyncOpenAI(api_key=self._api_key or os.getenv("OPENAI_API_KEY"),
+                                              **self._client_options)
+            self.deployment = self.model_name
+        return state["client"]
+    
+    async def aclose(self):
+        """
+        Close the async client of the running event loop
+        
+        Await this before the coroutine passed to asyncio.run() returns, so
+        the client's connection pool is released with the loop. A later call
+        on the same loop creates a new client.
+        """
+        loop = asyncio.get_running_loop()
+        with self._loop_lock:
+            state = self._loop_state.pop(loop, None)
+        if state is not None and state["client"] is not None:
+            await state["client"].close()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrency limiter for the running event loop"""
+        return self._get_loop_state()["semaphore"]
+
+    @property
+    def model_name(self) -> str:
+        """Model (OpenAI) or deployment name (Azure), resolved without creating the client"""
+        if self.deployment:
+            return self.deployment
+        if self.use_azure:
+            return os.getenv("AZURE_OPENAI_DEPLOYMENT", self.model)
+        return self.model
             
-    def _build_system_prompt(self) -> str:
+    def _build_system_prompt(self, text: Optional[str] = None) -> str:
         """
         Build the system prompt including glossary/translation memory
         
+        Args:
+            text: Optional source text; when given, only glossary terms that
+                occur in it are included in the prompt
+        
         Returns:
             System prompt string
         """
-        prompt = f"You are a professional translator. Translate the following text to {self.target_language}. "
-        prompt += "Preserve all HTML formatting, tags, and structure exactly as they appear in the original text. "
-        prompt += "Only translate the content within the tags, not the tags themselves.\n\n"
+        if text is None:
+            return self._full_prompt
+        return self._prompt_prefix + self.compiled_glossary.prompt_section(text) + self._prompt_suffix
+    
+    def _cache_key(self, text: str) -> Optional[str]:
+        """
+        Build the cache key for a text, or None if caching is disabled
         
-        if self.glossary:
-            prompt += "Use the following glossary for consistent terminology:\n"
-            for term in self.glossary:
-                source = term.get("source", "")
-                target = term.get("target", "")
-                if source and target:
-                    prompt += f"- '{source}' should be translated as '{target}'\n"
-            prompt += "\n"
+        Args:
+            text: Source text
             
-        prompt += "Maintain the original formatting and structure. Return only the translated text."
-        return prompt
+        Returns:
+            Cache key string or None
+        """
+        if self.cache is None:
+            return None
+        return TranslationCache.make_key(
+            text, self.target_language, self.model_name, self.glossary_version
+        )
     
     def translate_text(self, text: str) -> str:
         """
@@ -88,27 +249,398 @@ class TranslationService:
         """
         if not text or not text.strip():
             return text
+        
+        cache_key = self._cache_key(text)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Translation cache hit")
+                return cached
+        
+        return self._request_translation(text, cache_key)
+    
+    def _build_messages(self, text: str) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a translation request
+        
+        Args:
+            text: Text to translate
             
-        system_prompt = self._build_system_prompt()
+        Returns:
+            List of chat messages
+        """
+        return [
+            {"role": "system", "content": self._build_system_prompt(text)},
+            {"role": "user", "content": text}
+        ]
+    
+    @staticmethod
+    def _rate_amounts(messages: List[Dict[str, str]]) -> Dict[str, float]:
+        """
+        Estimate the rate-limit cost of a request
         
-        try:
-            response = self.client.chat.completions.create(
+        Token usage is counted as the prompt plus an output of about the
+        same size as the text being translated.
+        """
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+        return {"llm_requests": 1, "llm_tokens": prompt_tokens + estimate_tokens(messages[-1]["content"])}
+    
+    def _create_completion(self, messages: List[Dict[str, str]]):
+        """
+        Send a chat completion request, through the rate-limit scheduler if configured
+        
+        At most max_concurrency requests of the service are in flight at once,
+        however many threads translate with it.
+        
+        Args:
+            messages: Chat messages
+            
+        Returns:
+            API response
+        """
+        def send():
+            return self.client.chat.completions.create(
                 model=self.deployment,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": text}
-                ],
+                messages=messages,
                 temperature=0.3  # Lower temperature for more consistent translations
             )
+        with self._request_slots:
+            if self.scheduler is None:
+                return send()
+            return self.scheduler.call(send, self._rate_amounts(messages))
+    
+    async def _acreate_completion(self, messages: List[Dict[str, str]]):
+        """
+        Send a chat completion request through the async client
+        
+        Args:
+            messages: Chat messages
+            
+        Returns:
+            API response
+        """
+        client = self.async_client
+        
+        def send():
+            return client.chat.completions.create(
+                model=self.deployment,
+                messages=messages,
+                temperature=0.3
+            )
+        if self.scheduler is None:
+            return await send()
+        return await self.scheduler.acall(send, self._rate_amounts(messages))
+    
+    def _request_translation(self, text: str, cache_key: Optional[str] = None) -> str:
+        """
+        Send a translation request to the API and store the result in the cache
+        
+        Args:
+            text: Text to translate
+            cache_key: Cache key to store the result under, if caching is enabled
+            
+        Returns:
+            Translated text
+        """
+        try:
+            response = self._create_completion(self._build_messages(text))
             
             translated = response.choices[0].message.content
             logger.debug(f"Translated text (first 100 chars): {translated[:100]}...")
+            if cache_key is not None and translated:
+                self.cache.set(cache_key, translated)
             return translated
             
         except Exception as e:
             logger.error(f"Error translating text: {e}")
             raise
     
+    def split_document(self, text: str, content_format: str = "html") -> List[Dict]:
+        """
+        Split a document into segments that fit this service's token budget
+        
+        The result can be passed to translate_document() of several services
+        (e.g. one per target language) so the document is parsed only once.
+        
+        Args:
+            text: Document text
+            content_format: Either 'html' or 'markdown'
+            
+        Returns:
+            List of segment dictionaries
+        """
+        return bounded_segments(text, content_format, self.max_chunk_tokens)
+    
+    def translate_document(self, text: str, content_format: str = "html",
+                           segments: Optional[List[Dict]] = None) -> str:
+        """
+        Translate a document segment by segment using the translation memory
+        
+        The document is split into block-level segments. Segments already in
+        the translation memory are reused and only new or changed segments are
+        sent to the model, packed into as few requests as the item and token
+        limits allow. Without a cache the document is sent in one request,
+        or split into chunks under max_chunk_tokens if it is too large for one.
+        Independent requests are sent in parallel.
+        
+        Args:
+            text: Document text
+            content_format: Either 'html' or 'markdown'
+            segments: Optional result of split_document() for this text
+            
+        Returns:
+            Translated document
+        """
+        if not text or not text.strip():
+            return text
+        
+        if segments is None:
+            segments = self.split_document(text, content_format)
+        
+        if self.cache is None:
+            parts = chunk_segments(segments, self.max_chunk_tokens)
+            chunks = list(dict.fromkeys(p["text"] for p in parts if p["translatable"]))
+            if len(chunks) <= 1:
+                return self.translate_text(text)
+            logger.info(f"Translating document in {len(chunks)} chunks...")
+            translations = dict(zip(chunks, self._request_many(chunks)))
+            return self._join_translated(parts, translations)
+        
+        translations, missing = self._lookup_segments(segments)
+        translations.update(zip(missing, self._request_packed(missing)))
+        
+        return self._join_translated(segments, translations)
+    
+    def _request_packed(self, sources: List[str]) -> List[str]:
+        """
+        Translate texts in packed requests under the item and token limits
+        
+        Each translation is cached on its own, so later documents reuse them
+        segment by segment. Groups are sent in parallel.
+        
+        Args:
+            sources: Texts to translate
+            
+        Returns:
+            Translations in input order
+        """
+        groups = self._plan_batches(sources)
+        if len(groups) > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(groups))) as executor:
+                results = list(executor.map(self._request_batch, groups))
+        else:
+            results = [self._request_batch(group) for group in groups]
+        return [translated for group in results for translated in group]
+    
+    def _request_many(self, sources: List[str]) -> List[str]:
+        """
+        Translate several independent texts in parallel threads
+        
+        Args:
+            sources: Texts to translate
+            
+        Returns:
+            Translations in input order
+        """
+        if len(sources) <= 1:
+            return [self._request_translation(source, self._cache_key(source)) for source in sources]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(sources))) as executor:
+            return list(executor.map(
+                lambda source: self._request_translation(source, self._cache_key(source)),
+                sources
+            ))
+    
+    def _lookup_segments(self, segments: List[Dict]):
+        """
+        Look up a document's segments in the translation memory
+        
+        Args:
+            segments: Segments from split_document()
+            
+        Returns:
+            Tuple of (translations by source text, sources still missing)
+        """
+        translations = {}
+        for segment in segments:
+            source = segment["text"]
+            if segment["translatable"] and source not in translations:
+                translations[source] = self.cache.get(self._cache_key(source))
+        
+        missing = [source for source, translated in translations.items() if translated is None]
+        logger.info(f"Translation memory: {len(translations) - len(missing)}/{len(translations)} "
+                    f"segments reused, {len(missing)} to translate")
+        return translations, missing
+    
+    @staticmethod
+    def _join_translated(segments: List[Dict], translations: Dict[str, str]) -> str:
+        """Reassemble a document from passthrough segments and translations"""
+        return "".join(
+            translations[s["text"]] if s["translatable"] else s["text"]
+            for s in segments
+        )
+    
+    def _plan_batches(self, sources: List[str]) -> List[List[str]]:
+        """
+        Group texts into packed requests under the item and token limits
+        
+        Args:
+            sources: Texts to translate
+            
+        Returns:
+            List of groups of texts, one group per request
+        """
+        groups = []
+        current = []
+        current_tokens = 0
+        for source in sources:
+            tokens = estimate_tokens(source)
+            if current and (len(current) >= self.max_batch_items
+                            or current_tokens + tokens > self.max_chunk_tokens):
+                groups.append(current)
+                current = []
+                current_tokens = 0
+            current.append(source)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+        return groups
+    
+    def _build_batch_messages(self, sources: List[str]) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a packed request of several texts
+        
+        Args:
+            sources: Texts to translate
+            
+        Returns:
+            List of chat messages
+        """
+        system_prompt = (
+            f"You are a professional translator. Translate the text of every item to {self.target_language}. "
+            "Preserve all HTML formatting, tags, and structure exactly as they appear in the original text.\n\n"
+            + self.compiled_glossary.prompt_section("\n".join(sources))
+            + 'The input is a JSON object of the form {"items": [{"id": "...", "text": "..."}]}. '
+            'Respond with only a JSON object of the form {"items": [{"id": "...", "translation": "..."}]} '
+            "containing every id exactly once."
+        )
+        payload = {"items": [{"id": str(i), "text": source} for i, source in enumerate(sources)]}
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": json.dumps(payload, ensure_ascii=False)}
+        ]
+    
+    @staticmethod
+    def _parse_batch_response(content: str, count: int) -> Dict[int, str]:
+        """
+        Map a packed response back to item positions
+        
+        Args:
+            content: Raw response content
+            count: Number of items in the request
+            
+        Returns:
+            Dictionary of item index to translation; malformed or missing
+            items are left out
+        """
+        content = re.sub(r"^\s*```(?:json)?\s*|\s*```\s*$", "", content or "")
+        try:
+            items = json.loads(content).get("items", [])
+        except (ValueError, AttributeError):
+            return {}
+        
+        results = {}
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict) or not isinstance(item.get("translation"), str):
+                continue
+            try:
+                index = int(item.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if 0 <= index < count:
+                results[index] = item["translation"]
+        return results
+    
+    def _request_batch(self, sources: List[str]) -> List[str]:
+        """
+        Translate a group of texts in one packed request
+        
+        Items missing from a malformed response are translated one by one.
+        
+        Args:
+            sources: Texts to translate
+            
+        Returns:
+            Translations in input order
+        """
+        if len(sources) == 1:
+            return [self._request_translation(sources[0], self._cache_key(sources[0]))]
+        
+        try:
+            response = self._create_completion(self._build_batch_messages(sources))
+            parsed = self._parse_batch_response(response.choices[0].message.content, len(sources))
+        except Exception as e:
+            logger.warning(f"Packed translation request failed: {e}")
+            parsed = {}
+        
+        return self._finish_batch(sources, parsed, lambda source: self._request_translation(
+            source, self._cache_key(source)
+        ))
+    
+    def _finish_batch(self, sources: List[str], parsed: Dict[int, str], fallback) -> List:
+        """Cache packed results and fall back to per-item calls for missing ones"""
+        if len(parsed) < len(sources):
+            logger.warning(f"Packed response covered {len(parsed)}/{len(sources)} items, "
+                           f"translating the rest individually")
+        results = []
+        for index, source in enumerate(sources):
+            if index in parsed:
+                cache_key = self._cache_key(source)
+                if cache_key is not None and parsed[index]:
+                    self.cache.set(cache_key, parsed[index])
+                results.append(parsed[index])
+            else:
+                results.append(fallback(source))
+        return results
+    
+    def _lookup_batch(self, texts: List[str]):
+        """
+        Look up a list of texts in the cache
+        
+        Returns:
+            Tuple of (translations by source text, unique sources still missing)
+        """
+        translations = {}
+        for text in texts:
+            if text in translations:
+                continue
+            if not text or not text.strip():
+                translations[text] = text
+                continue
+            cache_key = self._cache_key(text)
+            translations[text] = self.cache.get(cache_key) if cache_key is not None else None
+        missing = [text for text, translated in translations.items() if translated is None]
+        return translations, missing
+    
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        """
+        Translate many short strings (titles, labels) with few requests
+        
+        Texts are packed into structured JSON requests of up to
+        max_batch_items items and mapped back by id. If a response is
+        malformed, the affected items fall back to one request each.
+        
+        Args:
+            texts: Texts to translate
+            
+        Returns:
+            Translations in input order
+        """
+        translations, missing = self._lookup_batch(texts)
+        if missing:
+            logger.info(f"Translating {len(missing)} short texts in packed requests...")
+        translations.update(zip(missing, self._request_packed(missing)))
+        return [translations[text] for text in texts]
+    
     def translate_article(self, article: Dict) -> Dict:
         """
         Translate an article's title and body
@@ -129,6 +661,390 @@ class TranslationService:
         # Translate body
         if article.get("body"):
             logger.info(f"Translating body (length: {len(article['body'])} chars)...")
-            translated_article["body"] = self.translate_text(article["body"])
+            translated_article["body"] = self.translate_document(article["body"], "html")
             
         return translated_article
+    
+    def translate_text_stream(self, text: str) -> Iterator[str]:
+        """
+        Translate a text string, yielding the translation as it is generated
+        
+        Cached translations are yielded in one piece. The complete translation
+        is stored in the cache once the stream finishes.
+        
+        Args:
+            text: Text to translate
+            
+        Yields:
+            Pieces of translated text
+        """
+        if not text or not text.strip():
+            if text:
+                yield text
+            return
+        
+        cache_key = self._cache_key(text)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        messages = self._build_messages(text)
+        
+        def send():
+            return self.client.chat.completions.create(
+                model=self.deployment,
+                messages=messages,
+                temperature=0.3,
+                stream=True
+            )
+        
+        try:
+            # The request stays in flight until the stream is consumed
+            with self._request_slots:
+                if self.scheduler is None:
+                    stream = send()
+                else:
+                    stream = self.scheduler.call(send, self._rate_amounts(messages))
+                
+                pieces = []
+                for chunk in stream:
+                    # Azure sends chunks without choices (e.g. content filter results)
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        pieces.append(delta)
+                        yield delta
+        except Exception as e:
+            logger.error(f"Error translating text: {e}")
+            raise
+        
+        translated = "".join(pieces)
+        if cache_key is not None and translated:
+            self.cache.set(cache_key, translated)
+    
+    def translate_document_stream(self, text: str, content_format: str = "html") -> Iterator[str]:
+        """
+        Translate a document, yielding output in document order as it arrives
+        
+        Segments found in the translation memory are yielded immediately and
+        the rest arrive one packed request at a time; without a cache the
+        document is streamed from the model chunk by chunk. Either way the
+        first text arrives long before the whole document is done.
+        
+        Args:
+            text: Document text
+            content_format: Either 'html' or 'markdown'
+            
+        Yields:
+            Pieces of the translated document
+        """
+        if not text or not text.strip():
+            if text:
+                yield text
+            return
+        
+        parts = self.split_document(text, content_format)
+        if self.cache is None:
+            for part in chunk_segments(parts, self.max_chunk_tokens):
+                if part["translatable"]:
+                    yield from self.translate_text_stream(part["text"])
+                else:
+                    yield part["text"]
+            return
+        
+        # Missing segments are packed like in translate_document(); output is
+        # yielded up to the first segment whose group is still outstanding
+        translations, missing = self._lookup_segments(parts)
+        position = 0
+        for group in [[]] + self._plan_batches(missing):
+            if group:
+                translations.update(zip(group, self._request_batch(group)))
+            while position < len(parts) and (not parts[position]["translatable"]
+                                             or translations[parts[position]["text"]] is not None):
+                part = parts[position]
+                yield translations[part["text"]] if part["translatable"] else part["text"]
+                position += 1
+    
+    def translate_article_stream(self, article: Dict, content_format: str = "html") -> Iterator[Dict]:
+        """
+        Translate an article's title and body, yielding progress events
+        
+        Args:
+            article: Article dictionary with 'title' and 'body' fields
+            content_format: Format of the body, either 'html' or 'markdown'
+            
+        Yields:
+            Events of the form {"field": "title" or "body", "delta": text}
+        """
+        for field, pieces in (
+            ("title", self.translate_text_stream(article.get("title") or "")),
+            ("body", self.translate_document_stream(article.get("body") or "", content_format))
+        ):
+            for delta in pieces:
+                yield {"field": field, "delta": delta}
+    
+    async def atranslate_text(self, text: str) -> str:
+        """
+        Translate a single text string without blocking the event loop
+        
+        Args:
+            text: Text to translate
+            
+        Returns:
+            Translated text
+        """
+        if not text or not text.strip():
+            return text
+        
+        cache_key = self._cache_key(text)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.debug("Translation cache hit")
+                return cached
+        
+        return await self._arequest_translation(text, cache_key)
+    
+    async def _arequest_translation(self, text: str, cache_key: Optional[str] = None) -> str:
+        """
+        Send a translation request through the async client, bounded by max_concurrency
+        
+        Args:
+            text: Text to translate
+            cache_key: Cache key to store the result under, if caching is enabled
+            
+        Returns:
+            Translated text
+        """
+        async with self._get_semaphore():
+            try:
+                response = await self._acreate_completion(self._build_messages(text))
+            except Exception as e:
+                logger.error(f"Error translating text: {e}")
+                raise
+        
+        translated = response.choices[0].message.content
+        logger.debug(f"Translated text (first 100 chars): {translated[:100]}...")
+        if cache_key is not None and translated:
+            self.cache.set(cache_key, translated)
+        return translated
+    
+    async def atranslate_document(self, text: str, content_format: str = "html") -> str:
+        """
+        Translate a document, sending its missing segments or chunks concurrently
+        
+        Args:
+            text: Document text
+            content_format: Either 'html' or 'markdown'
+            
+        Returns:
+            Translated document
+        """
+        if not text or not text.strip():
+            return text
+        
+        segments = self.split_document(text, content_format)
+        if self.cache is None:
+            parts = chunk_segments(segments, self.max_chunk_tokens)
+            chunks = list(dict.fromkeys(p["text"] for p in parts if p["translatable"]))
+            if len(chunks) <= 1:
+                return await self.atranslate_text(text)
+            results = await asyncio.gather(*(self._arequest_translation(chunk) for chunk in chunks))
+            return self._join_translated(parts, dict(zip(chunks, results)))
+        
+        translations, missing = self._lookup_segments(segments)
+        translations.update(zip(missing, await self._arequest_packed(missing)))
+        
+        return self._join_translated(segments, translations)
+    
+    async def _arequest_packed(self, sources: List[str]) -> List[str]:
+        """
+        Translate texts in packed requests through the async client
+        
+        Args:
+            sources: Texts to translate
+            
+        Returns:
+            Translations in input order
+        """
+        results = await asyncio.gather(*(self._arequest_batch(group) for group in self._plan_batches(sources)))
+        return [translated for group in results for translated in group]
+    
+    async def _arequest_batch(self, sources: List[str]) -> List[str]:
+        """
+        Translate a group of texts in one packed request through the async client
+        
+        Args:
+            sources: Texts to translate
+            
+        Returns:
+            Translations in input order
+        """
+        if len(sources) == 1:
+            return [await self._arequest_translation(sources[0], self._cache_key(sources[0]))]
+        
+        try:
+            async with self._get_semaphore():
+                response = await self._acreate_completion(self._build_batch_messages(sources))
+            parsed = self._parse_batch_response(response.choices[0].message.content, len(sources))
+        except Exception as e:
+            logger.warning(f"Packed translation request failed: {e}")
+            parsed = {}
+        
+        missing = [source for index, source in enumerate(sources) if index not in parsed]
+        fallback = dict(zip(missing, await asyncio.gather(*(
+            self._arequest_translation(source, self._cache_key(source)) for source in missing
+        ))))
+        return self._finish_batch(sources, parsed, fallback.__getitem__)
+    
+    async def atranslate_batch(self, texts: List[str]) -> List[str]:
+        """
+        Translate many short strings with few requests without blocking the event loop
+        
+        Args:
+            texts: Texts to translate
+            
+        Returns:
+            Translations in input order
+        """
+        translations, missing = self._lookup_batch(texts)
+        if missing:
+            logger.info(f"Translating {len(missing)} short texts in packed requests...")
+        translations.update(zip(missing, await self._arequest_packed(missing)))
+        return [translations[text] for text in texts]
+    
+    async def atranslate_article(self, article: Dict, content_format: str = "html",
+                                 translated_title: Optional[str] = None) -> Dict:
+        """
+        Translate an article's title and body concurrently
+        
+        Args:
+            article: Article dictionary with 'title' and 'body' fields
+            content_format: Format of the body, either 'html' or 'markdown'
+            translated_title: Title translation obtained elsewhere (e.g. from
+                a packed request), in which case the title is not re-sent
+            
+        Returns:
+            Dictionary with translated title and body
+        """
+        translated_article = article.copy()
+        if translated_title is not None:
+            title_task = asyncio.sleep(0, result=translated_title)
+        else:
+            title_task = self.atranslate_text(article.get("title") or "")
+        title, body = await asyncio.gather(
+            title_task,
+            self.atranslate_document(article.get("body") or "", content_format)
+        )
+        if article.get("title"):
+            translated_article["title"] = title
+        if article.get("body"):
+            translated_article["body"] = body
+        return translated_article
+    
+    async def atranslate_articles(self, articles: List[Dict],
+                                  content_format: str = "html",
+                                  on_result: Optional[Callable[[int, Union[Dict, Exception]], None]] = None
+                                  ) -> List[Union[Dict, Exception]]:
+        """
+        Translate many articles concurrently
+        
+        Titles are packed into a few structured requests, then bodies are
+        translated with requests from all articles sharing the
+        max_concurrency limit. A failure in one article does not cancel the
+        others.
+        
+        Args:
+            articles: List of article dictionaries
+            content_format: Format of the article bodies
+            on_result: Optional callback receiving the index and the result of
+                each article as soon as that article is done (e.g. to
+                checkpoint progress)
+            
+        Returns:
+            List in input order, holding the translated article or the
+            exception raised while translating it
+        """
+        logger.info(f"Translating {len(articles)} articles "
+                    f"(max {self.max_concurrency} concurrent requests)...")
+        try:
+            titles = await self.atranslate_batch([article.get("title") or "" for article in articles])
+        except Exception as e:
+            logger.warning(f"Packed title translation failed, translating titles per article: {e}")
+            titles = [None] * len(articles)
+        
+        async def translate(index, article, title):
+            try:
+                result = await self.atranslate_article(article, content_format, title)
+            except Exception as e:
+                result = e
+            if on_result is not None:
+                on_result(index, result)
+            return result
+        
+        return await asyncio.gather(
+            *(translate(index, article, title)
+              for index, (article, title) in enumerate(zip(articles, titles)))
+        )
+    
+    def translate_articles(self, articles: List[Dict],
+                           content_format: str = "html",
+                           on_result: Optional[Callable[[int, Union[Dict, Exception]], None]] = None
+                           ) -> List[Union[Dict, Exception]]:
+        """
+        Translate many articles concurrently from synchronous code
+        
+        Args:
+            articles: List of article dictionaries
+            content_format: Format of the article bodies
+            on_result: Optional callback receiving the index and the result of
+                each article as soon as it is done
+            
+        Returns:
+            List in input order, holding the translated article or the
+            exception raised while translating it
+        """
+        async def run():
+            try:
+                return await self.atranslate_articles(articles, content_format, on_result)
+            finally:
+                await self.aclose()
+        
+        return asyncio.run(run())
+
+
+def translate_articles_multilang(translators: Dict[str, TranslationService],
+                                 articles: List[Dict],
+                                 content_format: str = "html",
+                                 on_result: Optional[Callable[[str, int, Union[Dict, Exception]], None]] = None
+                                 ) -> Dict[str, List[Union[Dict, Exception]]]:
+    """
+    Translate the same articles into several languages concurrently
+    
+    Args:
+        translators: Mapping of a language or locale key to its translation service
+        articles: List of article dictionaries, fetched once for all languages
+        content_format: Format of the article bodies
+        on_result: Optional callback receiving the key, the article index and
+            the result as soon as one article is done in one language
+        
+    Returns:
+        Mapping of each key to its results, as returned by atranslate_articles()
+    """
+    async def run():
+        try:
+            results = await asyncio.gather(*(
+                translator.atranslate_articles(
+                    articles, content_format,
+                    None if on_result is None else functools.partial(on_result, key)
+                )
+                for key, translator in translators.items()
+            ))
+        finally:
+            await asyncio.gather(*(translator.aclose() for translator in translators.values()))
+        return dict(zip(translators, results))
+    
+    return asyncio.run(run())
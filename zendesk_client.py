@@ -1,18 +1,41 @@
 """
 Zendesk API Client
-Handles fetching articles from Zendesk Help Center
+Handles fetching articles from Zendesk Help Center and publishing translations back
 """
+import json
+import time
+import threading
 import requests
-from typing import List, Dict, Optional
+from datetime import datetime
+from pathlib import Path
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List, Dict, Optional, Set, Tuple
 import logging
+from rate_limiter import RateLimitScheduler
+from http_session import create_session, DEFAULT_TIMEOUT
+from http_cache import HttpCache
 
 logger = logging.getLogger(__name__)
 
+# Largest page size accepted by the Help Center articles endpoint
+PER_PAGE = 100
+
+# Up to this many articles, translations are looked up per article instead of
+# listing every article of each locale
+PER_ARTICLE_LOOKUP_MAX = 10
+
 
 class ZendeskClient:
     """Client for interacting with Zendesk Help Center API"""
     
-    def __init__(self, subdomain: str, email: str, api_token: str):
+    def __init__(self, subdomain: str, email: str, api_token: str,
+                 scheduler: Optional[RateLimitScheduler] = None,
+                 session: Optional[requests.Session] = None,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 max_workers: int = 4,
+                 http_cache: Optional[HttpCache] = None,
+                 api_url: Optional[str] = None):
         """
         Initialize Zendesk client
         
@@ -20,11 +43,137 @@ class ZendeskClient:
             subdomain: Zendesk subdomain
             email: Zendesk account email
             api_token: Zendesk API token
+            scheduler: Optional shared rate-limit scheduler ('zendesk' bucket);
+                retries 429s honouring Retry-After
+            session: Optional shared pooled session (default: a new one from create_session())
+            timeout: (connect, read) timeouts in seconds
+            max_workers: Listing pages fetched concurrently once the page count is known
+            http_cache: Optional ETag/Last-Modified cache for single-article fetches
+            api_url: Override of the API base URL (e.g. a local stand-in server)
         """
         self.subdomain = subdomain
-        self.base_url = f"https://{subdomain}.zendesk.com/api/v2"
+        self.base_url = (api_url or f"https://{subdomain}.zendesk.com/api/v2").rstrip('/')
         self.auth = (f"{email}/token", api_token)
+        self.scheduler = scheduler
+        self.session = session or create_session()
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.http_cache = http_cache
+    
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        Perform an authenticated GET request, under the rate limits if configured
+        
+        Args:
+            url: Request URL
+            headers: Optional extra request headers
+            
+        Returns:
+            Successful (or 304 Not Modified) response
+        """
+        def send():
+            response = self.session.get(url, auth=self.auth, timeout=self.timeout, headers=headers)
+            response.raise_for_status()
+            return response
+        if self.scheduler is None:
+            return send()
+        return self.scheduler.call(send, {"zendesk": 1})
+        
+    def _send(self, method: str, url: str, payload: Dict,
+              attempts: Optional[List] = None) -> requests.Response:
+        """
+        Perform an authenticated write request, under the rate limits if configured
+        
+        Args:
+            method: HTTP method ('PUT' or 'POST')
+            url: Request URL
+            payload: JSON request body
+            attempts: Optional list one entry is appended to per attempt sent
+            
+        Returns:
+            Successful response
+        """
+        def send():
+            if attempts is not None:
+                attempts.append(method)
+            response = self.session.request(method, url, auth=self.auth, timeout=self.timeout, json=payload)
+            response.raise_for_status()
+            return response
+        if self.scheduler is None:
+            return send()
+        return self.scheduler.call(send, {"zendesk": 1})
+    
+    def _get_json(self, url: str) -> Dict:
+        """Fetch a listing page and decode it, logging request errors"""
+        try:
+            return self._get(url).json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error fetching articles: {e}")
+            raise
+    
+    def iter_article_pages(self, locale: str = "en-us") -> Iterator[List[Dict]]:
+        """
+        Yield the articles of a locale one page at a time
         
+        Each page is yielded as soon as it is fetched, so callers can start
+        on the first articles before pagination finishes. When the first
+        response reports the page count, the following pages are prefetched
+        concurrently (at most max_workers at a time, a bounded window ahead
+        of the caller) and still yielded in page order.
+        
+        Args:
+            locale: The locale to fetch articles for (default: en-us)
+            
+        Yields:
+            Lists of article dictionaries, one per page
+        """
+        url = f"{self.base_url}/help_center/{locale}/articles.json?per_page={PER_PAGE}"
+        data = self._get_json(url)
+        page = data.get("articles", [])
+        total = len(page)
+        logger.info(f"Fetched {len(page)} articles. Total: {total}")
+        yield page
+        
+        page_count = data.get("page_count")
+        if isinstance(page_count, int) and page_count > 1 and self.max_workers > 1:
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            pending = deque()
+            next_number = 2
+            try:
+                while pending or next_number <= page_count:
+                    while next_number <= page_count and len(pending) < self.max_workers * 2:
+                        pending.append(executor.submit(self._get_json, f"{url}&page={next_number}"))
+                        next_number += 1
+                    page = pending.popleft().result().get("articles", [])
+                    total += len(page)
+                    logger.info(f"Fetched {len(page)} articles. Total: {total}")
+                    yield page
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+            return
+        
+        url = data.get("next_page")
+        while url:
+            data = self._get_json(url)
+            page = data.get("articles", [])
+            url = data.get("next_page")
+            total += len(page)
+            logger.info(f"Fetched {len(page)} articles. Total: {total}")
+            yield page
+    
+    def iter_articles(self, locale: str = "en-us") -> Iterator[Dict]:
+        """
+        Yield every article of a locale, fetching pages lazily
+        
+        Args:
+            locale: The locale to fetch articles for (default: en-us)
+            
+        Yields:
+            Article dictionaries
+        """
+        for page in self.iter_article_pages(locale):
+            yield from page
+    
     def get_articles(self, locale: str = "en-us") -> List[Dict]:
         """
         Fetch all articles from Zendesk Help Center
@@ -35,30 +184,126 @@ class ZendeskClient:
         Returns:
             List of article dictionaries
         """
-        articles = []
-        url = f"{self.base_url}/help_center/{locale}/articles.json"
+        return list(self.iter_articles(locale))
+    
+    def get_translation_locales(self, locales: Iterable[str],
+                                article_ids: Optional[Iterable] = None) -> Dict[str, Set[str]]:
+        """
+        Find which of the given locales each article is published in
         
+        Lists each locale once (100 articles per request) instead of
+        requesting every article separately, so checking a whole help center
+        costs a few requests per locale. A listing stops once every wanted
+        article has been seen, and for at most PER_ARTICLE_LOOKUP_MAX wanted
+        articles the translations of each article are requested instead.
+        
+        Args:
+            locales: Locales to check (e.g. ['ja', 'ko'])
+            article_ids: Articles to report on (default: every article found)
+            
+        Returns:
+            Mapping of article ID (as a string) to the set of locales it has a
+            published translation in; articles with none are absent or empty
+        """
+        locales = list(locales)
+        wanted = {str(article_id) for article_id in article_ids} if article_ids is not None else None
+        available = {article_id: set() for article_id in wanted} if wanted is not None else {}
+        
+        if wanted is not None and len(wanted) <= PER_ARTICLE_LOOKUP_MAX:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(wanted)))) as executor:
+                for article_id, published in zip(wanted, executor.map(self.get_published_locales, wanted)):
+                    available[article_id] = published & set(locales)
+        else:
+            for locale in locales:
+                seen = set()
+                for article in self.iter_articles(locale):
+                    article_id = str(article.get("id"))
+                    if wanted is not None:
+                        if article_id not in wanted:
+                            continue
+                        seen.add(article_id)
+                    if not article.get("draft"):
+                        available.setdefault(article_id, set()).add(locale)
+                    if wanted is not None and len(seen) == len(wanted):
+                        break
+        
+        logger.info(f"Checked translations in {', '.join(locales)} for {len(available)} article(s)")
+        return available
+    
+    def get_published_locales(self, article_id) -> Set[str]:
+        """
+        List the locales an article has a published translation in
+        
+        Args:
+            article_id: The article ID
+            
+        Returns:
+            Set of locales (empty if the article does not exist)
+        """
+        url = f"{self.base_url}/help_center/articles/{article_id}/translations.json"
+        locales = set()
         while url:
             try:
-                response = requests.get(url, auth=self.auth)
-                response.raise_for_status()
-                data = response.json()
-                
-                articles.extend(data.get("articles", []))
-                url = data.get("next_page")
-                
-                logger.info(f"Fetched {len(data.get('articles', []))} articles. Total: {len(articles)}")
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error fetching articles: {e}")
+                data = self._get(url).json()
+            except requests.exceptions.HTTPError as e:
+                if e.response is not None and e.response.status_code == 404:
+                    return set()
                 raise
-                
-        return articles
+            locales.update(translation["locale"] for translation in data.get("translations", [])
+                           if not translation.get("draft"))
+            url = data.get("next_page")
+        return locales
+    
+    def get_updated_articles(self, start_time: int,
+                             locale: Optional[str] = None) -> Tuple[List[Dict], int]:
+        """
+        Fetch only the articles updated since a point in time
+        
+        Uses the Help Center incremental export, which pages forward in time
+        from start_time. The returned end time is the cursor for the next sync.
+        
+        Args:
+            start_time: Unix timestamp of the previous sync
+            locale: Only return articles in this locale (default: all locales)
+            
+        Returns:
+            Tuple of (updated article dictionaries, end time for the next sync)
+        """
+        # The export rejects start times less than a minute old
+        start_time = max(0, min(int(start_time), int(time.time()) - 60))
+        url = f"{self.base_url}/help_center/incremental/articles.json?start_time={start_time}"
+        updated = {}
+        end_time = start_time
+        
+        while url:
+            response = self._get(url)
+            data = response.json()
+            
+            page = data.get("articles", [])
+            for article in page:
+                if locale is None or article.get("locale") == locale:
+                    # A later page holds the newer version of the article
+                    updated.pop(article["id"], None)
+                    updated[article["id"]] = article
+            
+            next_end_time = data.get("end_time") or end_time
+            # The stream ends on an empty page, a missing next page or a cursor that stops moving
+            if not page or not data.get("next_page") or next_end_time <= end_time:
+                end_time = max(end_time, next_end_time)
+                break
+            end_time = next_end_time
+            url = data["next_page"]
+        
+        logger.info(f"Found {len(updated)} article(s) updated since {start_time}")
+        return list(updated.values()), end_time
     
     def get_article(self, article_id: int, locale: str = "en-us") -> Optional[Dict]:
         """
         Fetch a single article by ID
         
+        With an HTTP cache, the request is conditional and an unchanged
+        article (304) is served from the cache.
+        
         Args:
             article_id: The article ID
             locale: The locale to fetch the article for
@@ -69,11 +314,159 @@ class ZendeskClient:
         url = f"{self.base_url}/help_center/{locale}/articles/{article_id}.json"
         
         try:
-            response = requests.get(url, auth=self.auth)
-            response.raise_for_status()
-            data = response.json()
-            return data.get("article")
+            headers = self.http_cache.conditional_headers(url) if self.http_cache else None
+            response = self._get(url, headers)
+            if response.status_code == 304 and self.http_cache is not None:
+                cached = self.http_cache.get(url)
+                if cached is not None:
+                    return cached
+                response = self._get(url)
+            article = response.json().get("article")
+            if self.http_cache is not None and article is not None:
+                self.http_cache.set(url, response, article)
+            return article
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching article {article_id}: {e}")
             return None
+    
+    def _get_translation(self, article_id, locale: str) -> Optional[Dict]:
+        """
+        Fetch an article's translation in one locale
+        
+        Returns:
+            Translation dictionary, or None if the article has no translation in the locale
+        """
+        url = f"{self.base_url}/help_center/articles/{article_id}/translations/{locale}.json"
+        try:
+            return self._get(url).json().get("translation")
+        except requests.exceptions.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+    
+    def _create_or_update_translation(self, article_id, locale: str, title: str, body: str,
+                                      draft: bool, overwrite: bool, retrying: bool = False) -> str:
+        """
+        Create a translation, or update an existing one only when overwrite is set; safe to repeat
+        
+        A rejected create only counts as "exists" when the translation is
+        really there; other client errors (e.g. an invalid locale) are raised.
+        When an earlier attempt may have reached the server (its response was
+        lost), a translation identical to this one is reported as created. Updates leave
+        the draft flag alone, so a published translation stays published.
+        """
+        create_url = f"{self.base_url}/help_center/articles/{article_id}/translations.json"
+        update_url = f"{self.base_url}/help_center/articles/{article_id}/translations/{locale}.json"
+        attempts = []
+        try:
+            self._send("POST", create_url,
+                       {"translation": {"locale": locale, "title": title, "body": body, "draft": draft}},
+                       attempts)
+            return "created"
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code not in (400, 409, 422):
+                raise
+            existing = self._get_translation(article_id, locale)
+            if existing is None:
+                raise
+        if ((retrying or len(attempts) > 1)
+                and existing.get("title") == title and existing.get("body") == body):
+            return "created"
+        if not overwrite:
+            return "skipped"
+        self._send("PUT", update_url, {"translation": {"title": title, "body": body}})
+        return "updated"
+    
+    def publish_translation(self, article_id, locale: str, title: str, body: str,
+                            draft: bool = True, overwrite: bool = False, retries: int = 3) -> Dict:
+        """
+        Create one article translation, or update it if asked to
+        
+        A translation that exists already (e.g. a human translation, or one
+        created by an earlier attempt) is left untouched unless overwrite is
+        set, so repeating a publish never creates a duplicate. Connection
+        errors and timeouts are retried with backoff; rate-limited responses
+        are retried by the scheduler.
+        
+        Args:
+            article_id: The article ID
+            locale: Translation locale (e.g. 'ja')
+            title: Translated title
+            body: Translated body (HTML)
+            draft: Create a new translation as a draft (existing translations
+                keep their draft state)
+            overwrite: Update the translation if the locale exists already
+            retries: Retries after connection errors or timeouts
+            
+        Returns:
+            Result dictionary with article_id, locale, status ('created',
+            'updated', 'skipped' or 'failed'), attempts and error if any
+        """
+        result = {"article_id": article_id, "locale": locale}
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result["status"] = self._create_or_update_translation(
+                    article_id, locale, title, body, draft, overwrite, retrying=attempt > 1)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt > retries:
+                    result.update({"status": "failed", "error": str(e)})
+                    break
+                delay = self.scheduler.backoff_delay(attempt - 1) if self.scheduler else 2 ** (attempt - 1)
+                logger.warning(f"Error publishing article {article_id} ({locale}): {e}, "
+                               f"retrying in {delay:.1f}s")
+                time.sleep(delay)
+            except requests.exceptions.RequestException as e:
+                result.update({"status": "failed", "error": str(e)})
+                break
+        
+        result["attempts"] = attempt
+        result["published_at"] = datetime.now().isoformat()
+        if result["status"] == "failed":
+            logger.error(f"Failed to publish article {article_id} ({locale}): {result['error']}")
+        else:
+            logger.info(f"Published article {article_id} ({locale}): {result['status']}")
+        return result
+    
+    def publish_translations(self, translations: Iterable[Dict], draft: bool = True,
+                             max_workers: int = 4, result_log: Optional[str] = None,
+                             overwrite: bool = False) -> List[Dict]:
+        """
+        Create (or with overwrite, update) many article translations concurrently
+        
+        Args:
+            translations: Dictionaries with article_id, locale, title and body
+            draft: Create new translations as drafts
+            max_workers: Maximum translations published at once
+            result_log: Optional JSON Lines file each result is appended to
+                as soon as it is known
+            overwrite: Update translations whose locale exists already
+            
+        Returns:
+            Result dictionaries from publish_translation(), in input order
+        """
+        log_lock = threading.Lock()
+        
+        def publish(translation):
+            result = self.publish_translation(
+                translation["article_id"], translation["locale"],
+                translation["title"], translation["body"], draft=draft, overwrite=overwrite
+            )
+            if result_log:
+                with log_lock:
+                    Path(result_log).parent.mkdir(parents=True, exist_ok=True)
+                    with open(result_log, 'a', encoding='utf-8') as f:
+                        f.write(json.dumps(result, ensure_ascii=False) + "\n")
+            return result
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(publish, translations))
+        
+        failed = sum(1 for result in results if result["status"] == "failed")
+        skipped = sum(1 for result in results if result["status"] == "skipped")
+        logger.info(f"Published {len(results) - failed - skipped}/{len(results)} translation(s), "
+                    f"{skipped} skipped because they exist already")
+        return results
@@ -3,31 +3,115 @@ Zendesk Web Scraper
 Handles fetching articles by scraping Zendesk Help Center web pages
 """
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 import html2text
-from typing import Optional, Dict
+from typing import Iterator, List, Optional, Dict, Tuple
+from xml.etree import ElementTree
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
+from rate_limiter import RateLimitScheduler, RETRY_STATUS_CODES
+from http_session import create_session, DEFAULT_TIMEOUT
+from http_cache import HttpCache
+from page_archive import PageArchive
 
 logger = logging.getLogger(__name__)
 
+try:
+    import lxml  # noqa: F401  (optional, much faster than html.parser)
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Bump whenever _parse_article() output changes, so cached results are re-parsed
+PARSER_VERSION = "1"
+
+
+class _ArticleStrainer(SoupStrainer):
+    """
+    Parse-time filter that keeps only top-level elements accepted by a predicate
+
+    Everything inside a kept element is kept, everything else (navigation,
+    scripts, footers) is never turned into tree objects.
+    """
+
+    def __init__(self, keep):
+        super().__init__()
+        self._keep = keep
+
+    # beautifulsoup4 >= 4.13
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self._keep(name, attrs or {})
+
+    def allow_string_creation(self, string):
+        return False
+
+    # beautifulsoup4 < 4.13
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        return markup_name if self._keep(markup_name, dict(markup_attrs)) else None
+
+    def search(self, markup):
+        return None
+
 
 class ZendeskScraper:
     """Scraper for fetching articles from Zendesk Help Center web pages"""
     
-    def __init__(self, base_url: str = "https://support.pendo.io"):
+    def __init__(self, base_url: str = "https://support.pendo.io",
+                 scheduler: Optional[RateLimitScheduler] = None,
+                 session: Optional[requests.Session] = None,
+                 timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 http_cache: Optional[HttpCache] = None,
+                 archive: Optional[PageArchive] = None,
+                 offline: bool = False):
         """
         Initialize Zendesk scraper
         
         Args:
             base_url: Base URL of the Zendesk Help Center (default: https://support.pendo.io)
+            scheduler: Optional shared rate-limit scheduler ('zendesk_web' bucket);
+                retries 429s honouring Retry-After
+            session: Optional shared pooled session (default: a new one from create_session())
+            timeout: (connect, read) timeouts in seconds
+            http_cache: Optional ETag/Last-Modified cache; unchanged pages (304)
+                are served from it without being parsed again
+            archive: Optional raw page archive every fetched page is appended to
+            offline: Read pages from the archive instead of the network
+                (requires archive)
         """
+        if offline and archive is None:
+            raise ValueError("Offline mode requires a page archive")
         self.base_url = base_url.rstrip('/')
+        self.scheduler = scheduler
+        self.session = session or create_session()
+        self.timeout = timeout
+        self.http_cache = http_cache
+        self.archive = archive
+        self.offline = offline
         self.html_converter = html2text.HTML2Text()
         self.html_converter.ignore_links = False
         self.html_converter.ignore_images = False
         self.html_converter.body_width = 0  # Don't wrap text
         
+        # Selectors are compiled once and parsing is limited to the regions they can match
+        self._title_class = re.compile(r'article.*title|title')
+        self._body_class = re.compile(r'article.*body|article-body')
+        self._strainer = _ArticleStrainer(self._is_article_region)
+        # Results cached by another parser or converter release are parsed again
+        self.parser_version = (f"{PARSER_VERSION}/{HTML_PARSER}/"
+                               f"html2text-{'.'.join(map(str, html2text.__version__))}")
+        
+    def _is_article_region(self, name: str, attrs: Dict) -> bool:
+        """Whether a top-level element can hold the article title or body"""
+        if name in ('h1', 'article'):
+            return True
+        if name != 'div':
+            return False
+        classes = attrs.get('class') or ''
+        if isinstance(classes, list):
+            classes = ' '.join(classes)
+        return bool(self._body_class.search(classes)) or 'article-content' in classes.split()
+        
     def _get_article_url(self, article_id: str, locale: str = "en-us") -> str:
         """
         Construct the article URL
@@ -41,6 +125,91 @@ class ZendeskScraper:
         """
         return f"{self.base_url}/hc/{locale}/articles/{article_id}"
     
+    def _fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """
+        Fetch a page, under the rate limits if configured
+        
+        A 404 is returned as a response so callers can treat it as "not found";
+        rate-limited responses are retried before any error is raised.
+        
+        Args:
+            url: Page URL
+            headers: Optional extra request headers
+            
+        Returns:
+            Response object
+        """
+        if self.offline:
+            return self._read_archived(url)
+        
+        def send():
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+            if response.status_code in RETRY_STATUS_CODES:
+                response.raise_for_status()
+            return response
+        if self.scheduler is None:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        else:
+            response = self.scheduler.call(send, {"zendesk_web": 1})
+        if self.archive is not None and response.status_code in (200, 404):
+            self.archive.add(url, response.status_code, response.content)
+        return response
+    
+    def _read_archived(self, url: str) -> requests.Response:
+        """Build a response from the archived copy of a page (404 if it was never archived)"""
+        response = requests.Response()
+        response.url = url
+        response.encoding = 'utf-8'
+        archived = self.archive.get(url)
+        if archived is None:
+            logger.info(f"{url} is not in the page archive")
+            response.status_code = 404
+            response._content = b""
+        else:
+            response.status_code, response._content = archived
+        return response
+    
+    def _parse_article(self, content: bytes) -> Optional[Dict]:
+        """
+        Extract the article title and body from a page
+        
+        Args:
+            content: Raw HTML of the page
+            
+        Returns:
+            Dictionary with title and body in markdown, or None if no body was found
+        """
+        # Parse only the title and article-body regions
+        soup = BeautifulSoup(content, HTML_PARSER, parse_only=self._strainer)
+        
+        # Extract article title
+        title_element = soup.find('h1', class_=self._title_class)
+        if not title_element:
+            # Try alternative selectors
+            title_element = soup.find('h1')
+        
+        title = title_element.get_text(strip=True) if title_element else "Untitled"
+        
+        # Extract article body
+        # Try common Zendesk article body class names
+        body_element = soup.find('div', class_=self._body_class)
+        if not body_element:
+            # Try alternative selectors
+            body_element = soup.find('article')
+            if not body_element:
+                body_element = soup.find('div', class_='article-content')
+        
+        if not body_element:
+            return None
+        
+        # Convert HTML to Markdown
+        body_markdown = self.html_converter.handle(str(body_element))
+        
+        return {
+            "title": title,
+            "body": body_markdown.strip()
+        }
+    
     def _scrape_article_content(self, url: str) -> Optional[Dict]:
         """
         Scrape article content from a URL
@@ -52,7 +221,20 @@ class ZendeskScraper:
             Dictionary with title and body in markdown, or None if not found
         """
         try:
-            response = requests.get(url, timeout=30)
+            # Offline runs re-parse every archived page
+            use_cache = self.http_cache is not None and not self.offline
+            # A 304 has no body to archive, so fetch pages missing from the archive in full
+            conditional = use_cache and (self.archive is None or url in self.archive)
+            headers = self.http_cache.conditional_headers(url, self.parser_version) if conditional else None
+            response = self._fetch(url, headers)
+            
+            # Unchanged since the last fetch: reuse the parsed result
+            if response.status_code == 304 and use_cache:
+                cached = self.http_cache.get(url, self.parser_version)
+                if cached is not None:
+                    logger.info(f"Article not modified at {url}")
+                    return cached
+                response = self._fetch(url)
             
             # Check if article exists
             if response.status_code == 404:
@@ -61,40 +243,16 @@ class ZendeskScraper:
                 
             response.raise_for_status()
             
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract article title
-            title_element = soup.find('h1', class_=re.compile(r'article.*title|title'))
-            if not title_element:
-                # Try alternative selectors
-                title_element = soup.find('h1')
-            
-            title = title_element.get_text(strip=True) if title_element else "Untitled"
-            
-            # Extract article body
-            # Try common Zendesk article body class names
-            body_element = soup.find('div', class_=re.compile(r'article.*body|article-body'))
-            if not body_element:
-                # Try alternative selectors
-                body_element = soup.find('article')
-                if not body_element:
-                    body_element = soup.find('div', class_='article-content')
-            
-            if not body_element:
+            article = self._parse_article(response.content)
+            if article is None:
                 logger.warning(f"Could not find article body at {url}")
                 return None
             
-            # Convert HTML to Markdown
-            body_html = str(body_element)
-            body_markdown = self.html_converter.handle(body_html)
-            
-            logger.info(f"Successfully scraped article: {title[:50]}...")
+            logger.info(f"Successfully scraped article: {article['title'][:50]}...")
             
-            return {
-                "title": title,
-                "body": body_markdown.strip()
-            }
+            if use_cache:
+                self.http_cache.set(url, response, article, self.parser_version)
+            return article
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching article from {url}: {e}")
@@ -135,11 +293,147 @@ class ZendeskScraper:
         Returns:
             Dictionary with 'english' and 'japanese' keys, where japanese may be None
         """
-        english_article = self.get_article(article_id, locale="en-us")
-        japanese_article = self.get_article(article_id, locale="ja")
+        # Both pages are fetched at the same time
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            english_future = executor.submit(self.get_article, article_id, "en-us")
+            japanese_future = executor.submit(self.get_article, article_id, "ja")
+            english_article = english_future.result()
+            japanese_article = japanese_future.result()
         
         return {
             "id": article_id,
             "english": english_article,
             "japanese": japanese_article
         }
+    
+    def _fetch_text(self, url: str) -> Optional[str]:
+        """Fetch a discovery page, returning None when it is missing or fails"""
+        try:
+            response = self._fetch(url)
+            if response.status_code != 200:
+                return None
+            return response.text
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Error fetching {url}: {e}")
+            return None
+    
+    def _parse_sitemap(self, xml_text: str) -> Tuple[List[str], List[Tuple[str, Optional[str]]]]:
+        """
+        Parse a sitemap or sitemap index
+        
+        Returns:
+            Tuple of (child sitemap URLs, (page URL, lastmod) entries)
+        """
+        try:
+            root = ElementTree.fromstring(xml_text.encode('utf-8'))
+        except ElementTree.ParseError as e:
+            logger.warning(f"Could not parse sitemap: {e}")
+            return [], []
+        
+        def child_text(element, name):
+            for child in element:
+                if child.tag.rsplit('}', 1)[-1] == name:
+                    return (child.text or '').strip() or None
+            return None
+        
+        children, entries = [], []
+        for element in root:
+            kind = element.tag.rsplit('}', 1)[-1]
+            loc = child_text(element, 'loc')
+            if not loc:
+                continue
+            if kind == 'sitemap':
+                children.append(loc)
+            elif kind == 'url':
+                entries.append((loc, child_text(element, 'lastmod')))
+        return children, entries
+    
+    @staticmethod
+    def _match_articles(entries: List[Tuple[str, Optional[str]]], article_url) -> Iterator[Tuple[str, Optional[str]]]:
+        """Yield (article ID, lastmod) for the sitemap entries that are article pages"""
+        for loc, lastmod in entries:
+            match = article_url.search(loc)
+            if match:
+                yield match.group(1), lastmod
+    
+    def _discover_from_sitemap(self, locale: str, max_workers: int) -> Iterator[Tuple[str, Optional[str]]]:
+        """Yield (article ID, lastmod) pairs listed in the help center sitemap"""
+        xml_text = self._fetch_text(f"{self.base_url}/hc/sitemap.xml")
+        if not xml_text:
+            return
+        article_url = re.compile(rf"/hc/{re.escape(locale)}/articles/(\d+)")
+        
+        children, entries = self._parse_sitemap(xml_text)
+        yield from self._match_articles(entries, article_url)
+        if children:
+            # Child sitemaps are fetched concurrently and read in order
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for text in executor.map(self._fetch_text, children):
+                    if text:
+                        yield from self._match_articles(self._parse_sitemap(text)[1], article_url)
+    
+    def _section_article_ids(self, section_url: str, article_link) -> List[str]:
+        """Collect the article IDs of every page of a section"""
+        article_ids = []
+        page = 1
+        while True:
+            html = self._fetch_text(section_url if page == 1 else f"{section_url}?page={page}")
+            if not html:
+                break
+            article_ids.extend(article_link.findall(html))
+            page += 1
+            if not re.search(rf"[?&]page={page}\b", html):
+                break
+        return article_ids
+    
+    def _discover_from_sections(self, locale: str, max_workers: int) -> Iterator[str]:
+        """Yield article IDs by walking the categories and sections of the help center"""
+        prefix = f"/hc/{re.escape(locale)}"
+        home = self._fetch_text(f"{self.base_url}/hc/{locale}") or ""
+        category_ids = list(dict.fromkeys(re.findall(rf"{prefix}/categories/(\d+)", home)))
+        section_ids = list(dict.fromkeys(re.findall(rf"{prefix}/sections/(\d+)", home)))
+        article_link = re.compile(rf"{prefix}/articles/(\d+)")
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            category_urls = [f"{self.base_url}/hc/{locale}/categories/{cid}" for cid in category_ids]
+            for html in executor.map(self._fetch_text, category_urls):
+                for section_id in re.findall(rf"{prefix}/sections/(\d+)", html or ""):
+                    if section_id not in section_ids:
+                        section_ids.append(section_id)
+            
+            section_urls = [f"{self.base_url}/hc/{locale}/sections/{sid}" for sid in section_ids]
+            for article_ids in executor.map(lambda url: self._section_article_ids(url, article_link),
+                                            section_urls):
+                yield from article_ids
+    
+    def discover_articles(self, locale: str = "en-us",
+                          max_workers: int = 4) -> Iterator[Tuple[str, Optional[str]]]:
+        """
+        Enumerate every article of the help center
+        
+        Reads the help center sitemap (following a sitemap index into its
+        child sitemaps) and falls back to walking categories and sections
+        when the sitemap lists no articles. Pages are fetched concurrently
+        and IDs are yielded as they are found, each only once.
+        
+        Args:
+            locale: Locale of the article URLs to collect (default: en-us)
+            max_workers: Discovery pages fetched at once
+            
+        Yields:
+            Tuples of (article ID, last-modified timestamp or None when unknown)
+        """
+        seen = set()
+        for article_id, lastmod in self._discover_from_sitemap(locale, max_workers):
+            if article_id not in seen:
+                seen.add(article_id)
+                yield article_id, lastmod
+        
+        if not seen:
+            logger.info("No articles in the sitemap, walking categories and sections")
+            for article_id in self._discover_from_sections(locale, max_workers):
+                if article_id not in seen:
+                    seen.add(article_id)
+                    yield article_id, None
+        
+        logger.info(f"Discovered {len(seen)} article(s) in {locale}")